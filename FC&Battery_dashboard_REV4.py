@@ -2,48 +2,29 @@ import streamlit as st
 from kpi_calculator import *
 import matplotlib.pyplot as plt
 import pandas as pd
-from io import BytesIO
-from fpdf import FPDF
-import os
 import plotly.graph_objects as go
+from rerun_profiler import start_profiler
+from scenario_registry import default_registry
+from load_model import MAX_BATTERY_CURRENT_A, analyze_load
+from year_simulation import DEFAULT_YEAR, simulate_year
+from temperature_model import daily_temperature_kpis, load_temperatures, synthetic_temperatures
 
 st.set_page_config(page_title="Camping System KPI Dashboard", layout="wide")
+# Section timings, enabled with FC_PROFILE=1 or ?profile=1
+with start_profiler(__file__) as prof:
 
-st.markdown("""
+    st.markdown("""
     <div style="display: flex; align-items: center; gap: 10px;">
         <h2 style="margin: 0; font-size: 2em;">🔋Camping Truck System Dashboard</h2>
         <img src="https://raw.githubusercontent.com/Victor1492Alvarez/Fuel_Cell-Battery_kpi-dashboard/main/dashboard_logo.png" width="140" style="margin-left: 8px;" />
     </div>
 """, unsafe_allow_html=True)
 
-def clean_text(text):
-    return text.encode('latin1', errors='ignore').decode('latin1')
-
-summer_appliances = [
-    {"name": "Fridge", "power": 45, "hours": 24},
-    {"name": "Lights", "power": 10, "hours": 2},
-    {"name": "Laptop", "power": 60, "hours": 2},
-    {"name": "Water Pump", "power": 50, "hours": 0.5},
-    {"name": "Extractor Bonnet", "power": 20, "hours": 1},
-    {"name": "Microwave", "power": 450, "hours": 0.08},
-    {"name": "Kettle", "power": 300, "hours": 0.08},
-    {"name": "Phone Charger", "power": 5, "hours": 2}
-]
-
-winter_appliances = [
-    {"name": "Fridge", "power": 45, "hours": 24},
-    {"name": "Lights", "power": 10, "hours": 9},
-    {"name": "Laptop", "power": 60, "hours": 3},
-    {"name": "Water Pump", "power": 50, "hours": 0.5},
-    {"name": "Extractor Bonnet", "power": 20, "hours": 1},
-    {"name": "Microwave", "power": 450, "hours": 0.08},
-    {"name": "Kettle", "power": 300, "hours": 0.08},
-    {"name": "Phone Charger", "power": 5, "hours": 2},
-    {"name": "Diesel Heating Controller", "power": 40, "hours": 10}
-]
-
-with st.expander("ℹ️ Click here to learn how this simulation works"):
-    st.markdown("""
+    def clean_text(text):
+        return text.encode('latin1', errors='ignore').decode('latin1')
+
+    with st.expander("ℹ️ Click here to learn how this simulation works"):
+        st.markdown("""
      Welcome to our Interactive KPI Dashboard!
     This tool calculates key performance indicators (KPIs) for a hybrid energy system combining:
     - A **Direct Methanol Fuel Cell (EFOY Pro 2800)**
@@ -57,66 +38,75 @@ with st.expander("ℹ️ Click here to learn how this simulation works"):
     All values are simulated for educational purposes (Task No. 2).
     """)
 
-st.sidebar.header("☞ Click to customize your devices")
-season = st.sidebar.radio("Select Season", ["🌞 Summer", "❄️ Winter"], horizontal=True)
-default_appliances = summer_appliances if season.startswith("🌞") else winter_appliances
-
-custom_appliances = []
-for app in default_appliances:
-    hours = st.sidebar.slider(f"{app['name']} Usage (hours/day)", 0.0, 24.0, float(app['hours']), 0.25)
-    custom_appliances.append({"name": app['name'], "power": app['power'], "hours": hours})
-
-methanol_available = st.sidebar.selectbox("Methanol Tank Setup", [("1 × M10 (10L)", 10), ("2 × M10 (20L)", 20), ("1 × M5 (5L)", 5)], index=1)
-selected_tank_liters = methanol_available[1]
-peak_power = st.sidebar.slider("⚡ Peak Load (W)", 0, 3000, 997)
-
-daily_demand_wh = calculate_daily_energy_demand(custom_appliances)
-methanol_per_day = calculate_methanol_consumption(daily_demand_wh)
-autonomy_days = calculate_tank_autonomy(selected_tank_liters, methanol_per_day)
-battery_autonomy_hours = battery_discharge_time(daily_demand_wh)
-peak_coverage_pct = peak_load_coverage(peak_power)
-
-battery_energy = min(BATTERY_CAPACITY_WH, daily_demand_wh)
-fuel_cell_energy = max(0, daily_demand_wh - BATTERY_CAPACITY_WH)
-global_efficiency = global_system_efficiency(battery_energy, fuel_cell_energy, methanol_per_day)
-
-st.markdown("### 📊 Key Performance Indicators")
-k1, k2, k3 = st.columns(3)
-k1.metric("🔋 Daily Energy Demand", f"{daily_demand_wh:.0f} Wh")
-k2.metric("🧪 Methanol Needed/Day", f"{methanol_per_day:.2f} L")
-k3.metric("🛢️ Tank Autonomy", f"{autonomy_days:.1f} days")
-k4, k5, k6 = st.columns(3)
-k4.metric("⚡ Battery-Only Runtime", f"{battery_autonomy_hours:.1f} h")
-k5.metric("🌱 System Efficiency", f"{global_efficiency * 100:.1f}%")
-k6.metric("🚀 Peak Load Coverage", f"{peak_coverage_pct:.1f}%")
-
-col1, col2 = st.columns(2)
-
-col1, col2 = st.columns(2)
-
-with col1:
-    fig, ax = plt.subplots(figsize=(4.2, 4.2))
-    bars_battery = ax.bar("Daily Energy", battery_energy, label="Battery", color="#2196F3")
-    bars_fc = ax.bar("Daily Energy", fuel_cell_energy, bottom=battery_energy, label="Fuel Cell", color="#4CAF50")
+    st.sidebar.header("☞ Click to customize your devices")
+    season = st.sidebar.radio("Select Season", ["🌞 Summer", "❄️ Winter"], horizontal=True)
+    default_appliances = default_registry().profile("Summer" if season.startswith("🌞") else "Winter")
+
+    custom_appliances = []
+    for app in default_appliances:
+        hours = st.sidebar.slider(f"{app['name']} Usage (hours/day)", 0.0, 24.0, float(app['hours']), 0.25)
+        custom_appliances.append({"name": app['name'], "power": app['power'], "hours": hours})
+
+    methanol_available = st.sidebar.selectbox("Methanol Tank Setup", [("1 × M10 (10L)", 10), ("2 × M10 (20L)", 20), ("1 × M5 (5L)", 5)], index=1)
+    selected_tank_liters = methanol_available[1]
+    # Coincident peak of the appliance schedules (time windows / duty cycles from the scenario)
+    load = analyze_load([dict(app, hours=custom["hours"]) for app, custom in zip(default_appliances, custom_appliances)], days=1)
+    computed_peak = min(3000, int(round(load["peak_w"])))
+    # A stable key keeps a manual override across reruns; until the user moves the slider it follows the computed peak
+    if st.session_state.get("peak_load_w", computed_peak) == st.session_state.get("computed_peak_w", computed_peak):
+        st.session_state["peak_load_w"] = computed_peak
+    st.session_state["computed_peak_w"] = computed_peak
+    peak_power = st.sidebar.slider("⚡ Peak Load (W)", 0, 3000, key="peak_load_w",
+                                   help="Follows the coincident peak of the appliance schedules until changed")
+
+    daily_demand_wh = calculate_daily_energy_demand(custom_appliances)
+    methanol_per_day = calculate_methanol_consumption(daily_demand_wh)
+    autonomy_days = calculate_tank_autonomy(selected_tank_liters, methanol_per_day)
+    battery_autonomy_hours = battery_discharge_time(daily_demand_wh)
+    peak_coverage_pct = peak_load_coverage(peak_power)
+
+    battery_energy = min(BATTERY_CAPACITY_WH, daily_demand_wh)
+    fuel_cell_energy = max(0, daily_demand_wh - BATTERY_CAPACITY_WH)
+    global_efficiency = global_system_efficiency(battery_energy, fuel_cell_energy, methanol_per_day)
+    prof.lap("Sidebar inputs & KPI math")
+
+    st.markdown("### 📊 Key Performance Indicators")
+    k1, k2, k3 = st.columns(3)
+    k1.metric("🔋 Daily Energy Demand", f"{daily_demand_wh:.0f} Wh")
+    k2.metric("🧪 Methanol Needed/Day", f"{methanol_per_day:.2f} L")
+    k3.metric("🛢️ Tank Autonomy", f"{autonomy_days:.1f} days")
+    k4, k5, k6 = st.columns(3)
+    k4.metric("⚡ Battery-Only Runtime", f"{battery_autonomy_hours:.1f} h")
+    k5.metric("🌱 System Efficiency", f"{global_efficiency * 100:.1f}%")
+    k6.metric("🚀 Peak Load Coverage", f"{peak_coverage_pct:.1f}%")
+
+    col1, col2 = st.columns(2)
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        fig, ax = plt.subplots(figsize=(4.2, 4.2))
+        bars_battery = ax.bar("Daily Energy", battery_energy, label="Battery", color="#2196F3")
+        bars_fc = ax.bar("Daily Energy", fuel_cell_energy, bottom=battery_energy, label="Fuel Cell", color="#4CAF50")
     
-    # Etiquetas en texto blanco y negrita
-    for bar in bars_battery:
-        height = bar.get_height()
-        ax.text(bar.get_x() + bar.get_width()/2, height / 2, f"{height:1.0f} Wh",
-                ha='center', va='center', color='white', fontweight='bold')
-    for bar in bars_fc:
-        height = bar.get_height()
-        bottom = bar.get_y()
-        ax.text(bar.get_x() + bar.get_width()/2, bottom + height / 2, f"{height:1.0f} Wh",
-                ha='center', va='center', color='white', fontweight='bold')
-
-    ax.set_ylabel("Energy (Wh)")
-    ax.set_title("Battery vs Fuel Cell Contribution")
-    ax.legend()
-    st.pyplot(fig)
-
-    with st.expander("📘 How to interpret the Energy Contribution Chart"):
-        st.markdown("""
+        # Etiquetas en texto blanco y negrita
+        for bar in bars_battery:
+            height = bar.get_height()
+            ax.text(bar.get_x() + bar.get_width()/2, height / 2, f"{height:1.0f} Wh",
+                    ha='center', va='center', color='white', fontweight='bold')
+        for bar in bars_fc:
+            height = bar.get_height()
+            bottom = bar.get_y()
+            ax.text(bar.get_x() + bar.get_width()/2, bottom + height / 2, f"{height:1.0f} Wh",
+                    ha='center', va='center', color='white', fontweight='bold')
+
+        ax.set_ylabel("Energy (Wh)")
+        ax.set_title("Battery vs Fuel Cell Contribution")
+        ax.legend()
+        st.pyplot(fig)
+
+        with st.expander("📘 How to interpret the Energy Contribution Chart"):
+            st.markdown("""
         This bar chart shows how your daily energy demand is covered:
         - **Blue section**: Energy supplied by the **Battery** (max 1344 Wh)
         - **Green section**: Remaining demand covered by the **Fuel Cell**
@@ -125,60 +115,129 @@ with col1:
         If both bars appear, the fuel cell steps in to meet the remaining need.
         """)
 
-with col2:
-    fig_gauge = go.Figure(go.Indicator(
-        mode="gauge+number",
-        value=global_efficiency * 100,
-        title={
-            'text': "Global Efficiency (%)",
-            'font': {'size': 20,'color': "black"}
-        },
-        gauge={
-            'axis': {'range': [0, 100], 'tickwidth': 1},
-            'bar': {'color': "black"},
-            'steps': [
-                {'range': [0, 20], 'color': "#EF5350"},   # Red
-                {'range': [20, 50], 'color': "#FFEB3B"},  # Yellow
-                {'range': [50, 100], 'color': "#66BB6A"}  # Green
-            ],
-            'threshold': {
-                'line': {'color': "black", 'width': 4},
-                'thickness': 0.75,
-                'value': global_efficiency * 100
+    with col2:
+        fig_gauge = go.Figure(go.Indicator(
+            mode="gauge+number",
+            value=global_efficiency * 100,
+            title={
+                'text': "Global Efficiency (%)",
+                'font': {'size': 20,'color': "black"}
+            },
+            gauge={
+                'axis': {'range': [0, 100], 'tickwidth': 1},
+                'bar': {'color': "black"},
+                'steps': [
+                    {'range': [0, 20], 'color': "#EF5350"},   # Red
+                    {'range': [20, 50], 'color': "#FFEB3B"},  # Yellow
+                    {'range': [50, 100], 'color': "#66BB6A"}  # Green
+                ],
+                'threshold': {
+                    'line': {'color': "black", 'width': 4},
+                    'thickness': 0.75,
+                    'value': global_efficiency * 100
+                }
             }
-        }
-    ))
+        ))
 
-    fig_gauge.update_layout(
-        height=325,
-        margin=dict(t=50, b=30, l=0, r=0)
-    )
+        fig_gauge.update_layout(
+            height=325,
+            margin=dict(t=50, b=30, l=0, r=0)
+        )
 
-    st.plotly_chart(fig_gauge, use_container_width=True)
+        st.plotly_chart(fig_gauge, use_container_width=True)
 
-    with st.expander("📘 How to interpret the Global Efficiency Gauge"):
-        st.markdown("""
+        with st.expander("📘 How to interpret the Global Efficiency Gauge"):
+            st.markdown("""
         **Gauge Zones Explained**  
         - 🔴 < 20% (Red): Indicates poor efficiency. The fuel cell might be oversized, or methanol usage may be higher than necessary.  
         - 🟡 20–50% (Yellow): Acceptable range. Indicates the system is working within a normal operational window.  
         - 🟢 > 50% (Green): Very efficient use. Often suggests battery-only operation or the energy needs were underestimated.
         """)
 
-summary_df = pd.DataFrame(custom_appliances)
-summary_df["Energy (Wh)"] = summary_df["power"] * summary_df["hours"]
-st.dataframe(summary_df.style.format({"power": "{:.0f} W", "hours": "{:.2f} h", "Energy (Wh)": "{:.0f}"}))
-
-st.markdown("### ⚙️ System Constants")
-constants = {
-    "Battery Capacity": f"{BATTERY_CAPACITY_WH:.0f} Wh",
-    "Fuel Cell Max Output": "125 W",
-    "Battery Max Discharge": "100 A (1280 W)",
-    "Methanol Consumption Rate": "0.9 L/kWh"
-}
-st.table(constants)
-
-with st.expander("📘 What are the KPI Formulas about?"):
-    st.markdown("""
+    prof.lap("Charts")
+
+    with st.expander("⚡ Coincident Peak Load & Load-Duration Curve"):
+        peak_time = f"{load['peak_minute'] // 60:02d}:{load['peak_minute'] % 60:02d}"
+        p1, p2, p3 = st.columns(3)
+        p1.metric("Coincident Peak", f"{load['peak_w']:.0f} W", f"at {peak_time}", delta_color="off")
+        p2.metric("Peak Battery Current", f"{load['peak_current_a']:.0f} A")
+        p3.metric(f"Share of {MAX_BATTERY_CURRENT_A:.0f} A Limit", f"{load['peak_current_share'] * 100:.0f}%")
+        st.caption("Running at the peak: " + ", ".join(load["peak_devices"]))
+        minutes = len(load["duration_w"])
+        fig_load = go.Figure()
+        fig_load.add_trace(go.Scatter(x=[m / 60 for m in range(minutes)], y=load["load_w"], name="Load over the day"))
+        fig_load.add_trace(go.Scatter(x=[m / 60 for m in range(minutes)], y=load["duration_w"], name="Load-duration curve"))
+        fig_load.update_layout(height=300, margin=dict(t=30, b=30, l=0, r=0),
+                               xaxis_title="Hour of day / hours at or above load", yaxis_title="Load (W)")
+        st.plotly_chart(fig_load, use_container_width=True)
+
+    with st.expander("📅 Year-long Trip & Methanol Purchase Plan"):
+        st.caption("Summer and winter profiles chained over the calendar (the season selected above with your hours, "
+                   "the other with its defaults), blending in spring and autumn.")
+        days_per_week = st.slider("Days on the road per week", 1, 7, 7)
+        registry = default_registry()
+        own = [dict(app, hours=custom["hours"]) for app, custom in zip(default_appliances, custom_appliances)]
+        summer, winter = (own, registry.profile("Winter")) if season.startswith("🌞") else (registry.profile("Summer"), own)
+        year = simulate_year(summer, winter, selected_tank_liters, days_per_week)
+        y1, y2, y3 = st.columns(3)
+        y1.metric("🧪 Methanol per Year", f"{year['total_methanol_l']:.0f} L")
+        y2.metric(f"🛢️ Tanks of {selected_tank_liters} L", f"{year['tanks_needed']}")
+        y3.metric("🔄 Refills", f"{year['refills']}")
+        monthly = year["monthly"]
+        fig_year = go.Figure()
+        fig_year.add_trace(go.Bar(x=monthly["month"], y=monthly["methanol_l"], name="Methanol (L)"))
+        fig_year.add_trace(go.Scatter(x=monthly["month"], y=monthly["tanks_to_buy"], name="Tanks to buy",
+                                      yaxis="y2", mode="lines+markers"))
+        fig_year.update_layout(height=300, margin=dict(t=30, b=30, l=0, r=0), yaxis_title="Methanol (L)",
+                               yaxis2=dict(title="Tanks", overlaying="y", side="right"))
+        st.plotly_chart(fig_year, use_container_width=True)
+        st.dataframe(monthly.style.format({"demand_kwh": "{:.1f}", "methanol_l": "{:.1f}", "liters_to_buy": "{:.0f}"}))
+    prof.lap("Year simulation")
+
+    with st.expander("🌡️ Ambient Temperature: Heating & Efficiency"):
+        st.caption("Heater run time from hourly temperatures instead of fixed hours, with the battery efficiency "
+                   "and the methanol consumption derated in the cold (your devices of the selected season).")
+        temperature_file = st.file_uploader("Hourly temperatures (CSV with timestamp, temperature_c)", type=["csv"])
+        if temperature_file is not None:
+            temperatures = load_temperatures(temperature_file)
+        else:
+            mean_temperature = st.slider("Annual mean temperature (°C)", -5, 20, 8)
+            temperatures = synthetic_temperatures(mean_c=mean_temperature)
+        climate = daily_temperature_kpis(temperatures, own, selected_tank_liters)
+        t1, t2, t3 = st.columns(3)
+        t1.metric("🔥 Heater Hours per Day", f"{climate['heater_hours'].mean():.1f} h")
+        t2.metric("🧪 Methanol per Year", f"{climate['methanol_per_day'].sum() * 365 / climate['methanol_per_day'].size:.0f} L")
+        t3.metric("🔋 Mean Battery Efficiency", f"{climate['battery_efficiency'].mean() * 100:.0f}%")
+        days = pd.date_range(f"{DEFAULT_YEAR}-01-01", periods=climate["heater_hours"].size, freq="D")
+        climate_monthly = pd.DataFrame({"month": days.strftime("%b"), "heater_hours": climate["heater_hours"],
+                                        "methanol_l": climate["methanol_per_day"]})
+        climate_monthly = climate_monthly.groupby("month", sort=False).agg(
+            heater_hours=("heater_hours", "mean"), methanol_l=("methanol_l", "sum")).reset_index()
+        fig_climate = go.Figure()
+        fig_climate.add_trace(go.Bar(x=climate_monthly["month"], y=climate_monthly["methanol_l"], name="Methanol (L)"))
+        fig_climate.add_trace(go.Scatter(x=climate_monthly["month"], y=climate_monthly["heater_hours"],
+                                         name="Heater hours per day", yaxis="y2", mode="lines+markers"))
+        fig_climate.update_layout(height=300, margin=dict(t=30, b=30, l=0, r=0), yaxis_title="Methanol (L)",
+                                  yaxis2=dict(title="Heater hours", overlaying="y", side="right"))
+        st.plotly_chart(fig_climate, use_container_width=True)
+    prof.lap("Temperature model")
+
+    summary_df = pd.DataFrame(custom_appliances)
+    summary_df["Energy (Wh)"] = summary_df["power"] * summary_df["hours"]
+    st.dataframe(summary_df.style.format({"power": "{:.0f} W", "hours": "{:.2f} h", "Energy (Wh)": "{:.0f}"}))
+    prof.lap("Summary DataFrame")
+
+    st.markdown("### ⚙️ System Constants")
+    constants = {
+        "Battery Capacity": f"{BATTERY_CAPACITY_WH:.0f} Wh",
+        "Fuel Cell Max Output": "125 W",
+        "Battery Max Discharge": "100 A (1280 W)",
+        "Methanol Consumption Rate": "0.9 L/kWh"
+    }
+    st.table(constants)
+
+    with st.expander("📘 What are the KPI Formulas about?"):
+        st.markdown("""
     <small>
     - Daily Energy Demand = Σ(Power × Hours) of all devices<br>
     - Methanol Needed/Day = Energy (kWh) × 0.9 L/kWh<br>
@@ -189,37 +248,42 @@ with st.expander("📘 What are the KPI Formulas about?"):
     </small>
     """, unsafe_allow_html=True)
 
-if st.button("📤 Generate PDF Report"):
-    fig.savefig("temp_chart.png", dpi=300, bbox_inches="tight")
-    fig_gauge.write_image("temp_gauge.png", scale=4)
-
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_auto_page_break(auto=False, margin=5)
-    pdf.set_font("Arial", size=10)
-
-    # Header
-    pdf.set_xy(10, 10)
-    pdf.set_font("Arial", 'B', 16)
-    pdf.cell(0, 10, clean_text("Key Performance Indicators Report - Summary"), ln=True)
-
-    try:
-        logo_width = 40
-        logo_height = 40
-        pdf.image("dashboard_logo.png", x=165, y=4,w=logo_width, h=logo_height)
-    except:
-        pass
-
-    pdf.set_font("Arial", size=9)
-    pdf.ln(12)
-    pdf.multi_cell(0, 5, clean_text("This is the result of your simulation. Values are generated for educational and academic purposes only."))
-
-    # KPIs
-    pdf.set_font("Arial", 'B', 10)
-    pdf.ln(4)
-    pdf.cell(0, 6, "Key Performance Indicators", ln=True)
-    pdf.set_font("Arial", size=9)
-    kpi_text = f"""
+    if st.button("📤 Generate PDF Report"):
+        # PDF-only dependencies are imported here so they do not slow down every rerun
+        from fpdf import FPDF
+        from io import BytesIO
+        import os
+
+        fig.savefig("temp_chart.png", dpi=300, bbox_inches="tight")
+        fig_gauge.write_image("temp_gauge.png", scale=4)
+
+        pdf = FPDF()
+        pdf.add_page()
+        pdf.set_auto_page_break(auto=False, margin=5)
+        pdf.set_font("Arial", size=10)
+
+        # Header
+        pdf.set_xy(10, 10)
+        pdf.set_font("Arial", 'B', 16)
+        pdf.cell(0, 10, clean_text("Key Performance Indicators Report - Summary"), ln=True)
+
+        try:
+            logo_width = 40
+            logo_height = 40
+            pdf.image("dashboard_logo.png", x=165, y=4,w=logo_width, h=logo_height)
+        except:
+            pass
+
+        pdf.set_font("Arial", size=9)
+        pdf.ln(12)
+        pdf.multi_cell(0, 5, clean_text("This is the result of your simulation. Values are generated for educational and academic purposes only."))
+
+        # KPIs
+        pdf.set_font("Arial", 'B', 10)
+        pdf.ln(4)
+        pdf.cell(0, 6, "Key Performance Indicators", ln=True)
+        pdf.set_font("Arial", size=9)
+        kpi_text = f"""
 - Energy Demand: {daily_demand_wh:.0f} Wh
 - Methanol/day: {methanol_per_day:.2f} L
 - Tank Autonomy: {autonomy_days:.1f} days
@@ -227,50 +291,53 @@ if st.button("📤 Generate PDF Report"):
 - Global Efficiency: {global_efficiency*100:.1f}%
 - Peak Coverage: {peak_coverage_pct:.1f}%
 """
-    pdf.multi_cell(0, 5, clean_text(kpi_text))
-
-    # Energy Summary based on Devices
-    pdf.ln(2)
-    pdf.set_font("Arial", 'B', 10)
-    pdf.cell(0, 6, "Energy Summary based on Devices", ln=True)
-    pdf.set_font("Arial", size=9)
-    for _, row in summary_df.iterrows():
-        appliance_text = f"- {row['name']}: {row['power']} W × {row['hours']:.2f} h = {row['Energy (Wh)']:.0f} Wh"
-        pdf.multi_cell(0, 5, clean_text(appliance_text))
-
-    # Constants
-    pdf.ln(2)
-    pdf.set_font("Arial", 'B', 10)
-    pdf.cell(0, 6, "System Constants", ln=True)
-    pdf.set_font("Arial", size=9)
-    for k, v in constants.items():
-        pdf.cell(0, 5, clean_text(f"- {k}: {v}"), ln=True)
-
-    # Gráficos
-    pdf.ln(3)
-    pdf.image("temp_chart.png", x=6, y=172, w=85,h=75)
-    pdf.image("temp_gauge.png", x=90, y=185, w=125, h=60)
-
-    # Gauge interpretation
-    pdf.set_xy(10, 250)
-    pdf.set_font("Arial", size=10)
-    interpretation = """
+        pdf.multi_cell(0, 5, clean_text(kpi_text))
+
+        # Energy Summary based on Devices
+        pdf.ln(2)
+        pdf.set_font("Arial", 'B', 10)
+        pdf.cell(0, 6, "Energy Summary based on Devices", ln=True)
+        pdf.set_font("Arial", size=9)
+        for _, row in summary_df.iterrows():
+            appliance_text = f"- {row['name']}: {row['power']} W × {row['hours']:.2f} h = {row['Energy (Wh)']:.0f} Wh"
+            pdf.multi_cell(0, 5, clean_text(appliance_text))
+
+        # Constants
+        pdf.ln(2)
+        pdf.set_font("Arial", 'B', 10)
+        pdf.cell(0, 6, "System Constants", ln=True)
+        pdf.set_font("Arial", size=9)
+        for k, v in constants.items():
+            pdf.cell(0, 5, clean_text(f"- {k}: {v}"), ln=True)
+
+        # Gráficos
+        pdf.ln(3)
+        pdf.image("temp_chart.png", x=6, y=172, w=85,h=75)
+        pdf.image("temp_gauge.png", x=90, y=185, w=125, h=60)
+
+        # Gauge interpretation
+        pdf.set_xy(10, 250)
+        pdf.set_font("Arial", size=10)
+        interpretation = """
 Gauge Interpretation:
 - Red (<20%): Potential inefficient methanol use or consumption overestimation.
 - Yellow (20%--50%): Normal operation.
 - Green (>50%): Battery-only use.
 """
-    pdf.multi_cell(0, 4, clean_text(interpretation))
+        pdf.multi_cell(0, 4, clean_text(interpretation))
+
+        # Footer
+        pdf.set_y(-20)
+        pdf.set_font("Arial", 'I', 8)
+        pdf.multi_cell(0, 5, clean_text("Thank you for using our app.\nServus! And enjoy your camping days in the Alps!"))
 
-    # Footer
-    pdf.set_y(-20)
-    pdf.set_font("Arial", 'I', 8)
-    pdf.multi_cell(0, 5, clean_text("Thank you for using our app.\nServus! And enjoy your camping days in the Alps!"))
+        pdf_output = BytesIO()
+        pdf_bytes = pdf.output(dest='S').encode('latin1')
+        pdf_output.write(pdf_bytes)
+        st.download_button("📩 Download PDF", data=pdf_output.getvalue(), file_name="efoy_kpi_report.pdf", mime="application/pdf")
 
-    pdf_output = BytesIO()
-    pdf_bytes = pdf.output(dest='S').encode('latin1')
-    pdf_output.write(pdf_bytes)
-    st.download_button("📩 Download PDF", data=pdf_output.getvalue(), file_name="efoy_kpi_report.pdf", mime="application/pdf")
+        os.remove("temp_chart.png")
+        os.remove("temp_gauge.png")
+    prof.lap("PDF report")
 
-    os.remove("temp_chart.png")
-    os.remove("temp_gauge.png")
+    prof.finish()
@@ -6,6 +6,7 @@ from kpi_calculator import fuel_cell_efficiency
 from io import BytesIO
 from fpdf import FPDF
 import os
+from scenario_registry import default_registry
 
 st.markdown("""
     <div style="display: flex; align-items: center; gap: 10px;">
@@ -18,29 +19,6 @@ def clean_text(text):
     return ''.join(c for c in text if ord(c) < 128)
 
 # --- Profiles ---
-summer_appliances = [
-    {"name": "Fridge", "power": 45, "hours": 24},
-    {"name": "Lights", "power": 10, "hours": 2},
-    {"name": "Laptop", "power": 60, "hours": 2},
-    {"name": "Water Pump", "power": 50, "hours": 0.5},
-    {"name": "Extractor Bonnet", "power": 20, "hours": 1},
-    {"name": "Microwave", "power": 450, "hours": 0.08},
-    {"name": "Kettle", "power": 300, "hours": 0.08},
-    {"name": "Phone Charger", "power": 5, "hours": 2}
-]
-
-winter_appliances = [
-    {"name": "Fridge", "power": 45, "hours": 24},
-    {"name": "Lights", "power": 10, "hours": 9},
-    {"name": "Laptop", "power": 60, "hours": 3},
-    {"name": "Water Pump", "power": 50, "hours": 0.5},
-    {"name": "Extractor Bonnet", "power": 20, "hours": 1},
-    {"name": "Microwave", "power": 450, "hours": 0.08},
-    {"name": "Kettle", "power": 300, "hours": 0.08},
-    {"name": "Phone Charger", "power": 5, "hours": 2},
-    {"name": "Diesel Heating Controller", "power": 40, "hours": 10}
-]
-
 with st.expander("ℹ️ Click here to learn how this simulation works"):
     st.markdown("""
     Welcome to our Interactive KPI Dashboard!
@@ -58,7 +36,7 @@ with st.expander("ℹ️ Click here to learn how this simulation works"):
 
 st.sidebar.header("☞ Click to customize your devices")
 season = st.sidebar.radio("Select Season", ["🌞 Summer", "❄️ Winter"], horizontal=True)
-default_appliances = summer_appliances if season.startswith("🌞") else winter_appliances
+default_appliances = default_registry().profile("Summer" if season.startswith("🌞") else "Winter")
 
 custom_appliances = []
 for app in default_appliances:
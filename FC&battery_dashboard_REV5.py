@@ -1,30 +1,40 @@
 # FC_Battery_Dashboard_REV6.py (Updated Full Version with Tank Selection, Expanders, PDF)
-import tempfile
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-from io import BytesIO
-from fpdf import FPDF
-from datetime import datetime
-import requests
-import os
 from kpi_calculator_version2 import *
+from soc_simulation import simulate_appliances
+from battery_degradation import END_OF_LIFE_CAPACITY, count_cycles
+from dispatch import DEFAULT_STEP_MIN, SOC_MIN, compare_with_hysteresis
+from result_cache import default_cache, stable_hash
+from gauge_render import render_png_async
+from report_pipeline import appliance_summary, build_gauges, constants_table, render_report
+from kpi_graph import KpiGraph
+from sizing_optimizer import OBJECTIVES, load_catalog, optimize
+from monte_carlo import run_monte_carlo
+from sensitivity import rank_parameters, tornado
+from rerun_profiler import start_profiler
+from scenario_registry import default_registry
+from telemetry import compare_kpis, ingest, source_key
+from telemetry_store import TelemetryStore, range_kpis
+from downsample import downsample_range
+import numpy as np
 import plotly.graph_objects as go
 
-# Cache cleaning
-st.cache_data.clear()
-st.cache_resource.clear()
+# Results, figures and reports are reused across reruns as long as the inputs repeat
+cache = default_cache()
 
 st.set_page_config(page_title="DMFC&Battery System Dashboard", layout="wide")
-st.title("🔋 Camping Truck KPI Dashboard")
+# Section timings, enabled with FC_PROFILE=1 or ?profile=1
+with start_profiler(__file__) as prof:
+    st.title("🔋 Camping Truck KPI Dashboard")
 
-col1, col2 = st.columns([4, 1])
-with col1:
-    st.subheader("DMFC & Battery System Performance Analyzer")
+    col1, col2 = st.columns([4, 1])
+    with col1:
+        st.subheader("DMFC & Battery System Performance Analyzer")
 
-# 🔹 Help Section 1: App Introduction
-with st.expander("ℹ️ About This App"):
-    st.markdown("""
+    # 🔹 Help Section 1: App Introduction
+    with st.expander("ℹ️ About This App"):
+        st.markdown("""
     This dashboard simulates the performance of a hybrid energy supply system using a **direct methanol fuel cell EFOY Pro 2800 (DMFC)** and an EFOY Li 105 Lithium Battery from the company SFC Energy AG.
 
     🔍 Objective: Estimate energy needs and analyze autonomy, methanol consumption and system efficiency under three typical camping scenarios: Base, Moderate, and Peak Load.
@@ -34,62 +44,33 @@ with st.expander("ℹ️ About This App"):
     🛠️ Tip: Use the sidebar at the left to explore different usage patterns by adjusting the operating hours of each device and tanks!.
     """)
 
-# Sidebar - Scenario Selection
-st.sidebar.header("Adjust Scenarios and Methanol Storage")
-scenario = st.sidebar.selectbox("Select Load Scenario", ["Base 500 W", "Moderate 750 W", "Peak 1000 W"])
-
-# Sidebar - Methanol Tank Size Selection
-tank_option = st.sidebar.selectbox("Select Methanol Tank", ["T5 - 5 L", "T10 - 10 L", "T20 - 20 L"])
-tank_liters = int(tank_option.split('-')[1].strip().split(' ')[0])
-
-# Define appliances by scenario
-if scenario == "Base 500 W":
-    appliances = [
-        {"name": "Laptop (230 V)", "power": 95, "hours": 4},
-        {"name": "Led Lighting (12 V)", "power": 15, "hours": 6},
-        {"name": "Cool box (12 V)", "power": 60, "hours": 8},
-        {"name": "Smartphone (2 chargers)", "power": 25, "hours": 2},
-        {"name": "Electric kettle (12 V)", "power": 300, "hours": 0.5},
-        {"name": "Radio (12 V)", "power": 5, "hours": 3},
-    ]
-elif scenario == "Moderate 750 W":
-    appliances = [
-        {"name": "Laptop (230 V)", "power": 95, "hours": 4},
-        {"name": "Led Lighting (12 V)", "power": 15, "hours": 6},
-        {"name": "Cool box (12 V)", "power": 60, "hours": 8},
-        {"name": "Bed warmer (12 V)", "power": 240, "hours": 3},
-        {"name": "Smartphone (3 chargers)", "power": 35, "hours": 2},
-        {"name": "Electric kettle (12 V)", "power": 300, "hours": 0.5},
-        {"name": "Radio (12 V)", "power": 5, "hours": 3},
-    ]
-else:
-    appliances = [
-        {"name": "Laptop (230 V)", "power": 95, "hours": 4},
-        {"name": "Led Lighting (12 V)", "power": 15, "hours": 6},
-        {"name": "Cool box (12 V)", "power": 60, "hours": 8},
-        {"name": "Fan Heater (12 V)", "power": 490, "hours": 2},
-        {"name": "Smartphone (3 chargers)", "power": 35, "hours": 2},
-        {"name": "Electric kettle (12 V)", "power": 300, "hours": 0.5},
-        {"name": "Radio (12 V)", "power": 5, "hours": 3},
-    ]
-
-custom_appliances = []
-st.sidebar.header("Adjust Operating Hours")
-for app in appliances:
-    h = st.sidebar.slider(f"{app['name']} Hours", 0.0, 24.0, float(app['hours']), 0.5)
-    custom_appliances.append({"name": app['name'], "power": app['power'], "hours": h})
-
-# 🔹 Help Section 2: System Constants
-with st.expander("System Constants (SFC Energy AG References)"):
-    constants_df = pd.DataFrame({
-        "Parameter": ["Battery Capacity", "Battery Voltage", "Battery Energy", "Fuel Cell Output", "Fuel Cell Efficiency", "Methanol Energy Density", "Methanol Consumption"],
-        "Value": [f"{BATTERY_CAPACITY_AH} Ah", f"{BATTERY_VOLTAGE} V", f"{BATTERY_CAPACITY_WH} Wh", f"{FUEL_CELL_OUTPUT_W} W", f"{FUEL_CELL_EFFICIENCY*100:.1f}%", f"{METHANOL_ENERGY_DENSITY:.2f} kWh/L", f"{METHANOL_CONSUMPTION_PER_KWH} L/kWh"]
-    })
-    st.table(constants_df)
-
-# 🔹 Help Section 3: KPI Formula Descriptions
-with st.expander("What are the KPI Calculations about?"):
-    st.markdown("""
+    # Sidebar - Scenario Selection
+    st.sidebar.header("Adjust Scenarios and Methanol Storage")
+    scenarios = default_registry()
+    scenario = st.sidebar.selectbox("Select Load Scenario", scenarios.group("load"))
+
+    # Sidebar - Methanol Tank Size Selection
+    tank_option = st.sidebar.selectbox("Select Methanol Tank", ["T5 - 5 L", "T10 - 10 L", "T20 - 20 L"])
+    tank_liters = int(tank_option.split('-')[1].strip().split(' ')[0])
+
+    # Appliances of the selected scenario
+    appliances = scenarios.profile(scenario)
+
+    custom_appliances = []
+    st.sidebar.header("Adjust Operating Hours")
+    for app in appliances:
+        h = st.sidebar.slider(f"{app['name']} Hours", 0.0, 24.0, float(app['hours']), 0.5)
+        custom_appliances.append({"name": app['name'], "power": app['power'], "hours": h})
+    prof.lap("Sidebar inputs")
+
+    # 🔹 Help Section 2: System Constants
+    with st.expander("System Constants (SFC Energy AG References)"):
+        constants_df = pd.DataFrame(constants_table(), columns=["Parameter", "Value"])
+        st.table(constants_df)
+
+    # 🔹 Help Section 3: KPI Formula Descriptions
+    with st.expander("What are the KPI Calculations about?"):
+        st.markdown("""
     1. Daily Energy Demand [Wh] = Σ(Power × Hours) for each device.  
     2. Methanol Consumption [L] = (Daily Energy / 1000) × 0.9 L/kWh.  
     3. Tank Autonomy [days] = Methanol Available / Daily Consumption.  
@@ -98,187 +79,254 @@ with st.expander("What are the KPI Calculations about?"):
     6. System Efficiency [%] = Electrical Energy delivered to system / Methanol Energy.
     """)
 
-# 🧾 Main Calculations
-daily_demand_wh = calculate_daily_energy_demand(custom_appliances)
-methanol_per_day = calculate_methanol_consumption(daily_demand_wh)
-autonomy_days = calculate_tank_autonomy(tank_liters, methanol_per_day)
-battery_hours = battery_discharge_time(daily_demand_wh)
-battery_energy_wh = min(BATTERY_CAPACITY_WH, daily_demand_wh)
-fuel_cell_energy_wh = max(0, daily_demand_wh - BATTERY_CAPACITY_WH)
-efficiency_pct = global_system_efficiency(battery_energy_wh, fuel_cell_energy_wh, methanol_per_day)
-battery_deficit = max(0, daily_demand_wh - BATTERY_CAPACITY_WH)
-charge_time = battery_charge_time_needed(battery_deficit)
-
-# KPIs
-k1, k2, k3 = st.columns(3)
-k1.metric("🔋 Daily Energy Demand", f"{daily_demand_wh:.0f} Wh")
-k2.metric("🧪 Methanol Needed/Day", f"{methanol_per_day:.2f} L")
-k3.metric("📂 Tank Autonomy", f"{autonomy_days:.1f} days")
-k4, k5, k6 = st.columns(3)
-k4.metric("🔋 Battery Autonomy", f"{battery_hours:.1f} h")
-k5.metric("🌱 System Efficiency", f"{efficiency_pct*100:.1f}%")
-k6.metric("⚡ Battery Charge Time", f"{charge_time:.1f} h")
-
-# Appliance Summary
-st.markdown("Equipments Energy Summary")
-df = pd.DataFrame(custom_appliances)
-df['Energy (Wh)'] = df['power'] * df['hours']
-df['Battery Capacity Used (Ah)'] = df['Energy (Wh)'] / BATTERY_VOLTAGE
-
-total_row = pd.DataFrame({
-    "name": ["**TOTAL**"],
-    "power": [df['power'].sum()],
-    "hours": ["-"],
-    "Energy (Wh)": [df['Energy (Wh)'].sum()],
-    "Battery Capacity Used (Ah)": [df['Battery Capacity Used (Ah)'].sum()]
-})
-
-df = pd.concat([df, total_row], ignore_index=True)
-st.dataframe(df.rename(columns={"name": "Device", "power": "Power (W)", "hours": "Hours"}))
-
-# 🔹 Help Section 4: Gauges Descriptions
-with st.expander("📊 How to interpret the chart gauges"):
-    st.markdown("""
+    # 🧾 Main Calculations
+    inputs_key = stable_hash(custom_appliances, tank_liters)
+    # The graph lives across reruns and only recomputes the KPIs whose inputs changed
+    kpi_graph = st.session_state.setdefault("kpi_graph", KpiGraph())
+    kpis = kpi_graph.update(custom_appliances, tank_liters)
+    daily_demand_wh = kpis["daily_demand_wh"]
+    methanol_per_day = kpis["methanol_per_day"]
+    autonomy_days = kpis["autonomy_days"]
+    battery_hours = kpis["battery_hours"]
+    efficiency_pct = kpis["efficiency_pct"]
+    charge_time = kpis["charge_time"]
+
+    # KPIs
+    k1, k2, k3 = st.columns(3)
+    k1.metric("🔋 Daily Energy Demand", f"{daily_demand_wh:.0f} Wh")
+    k2.metric("🧪 Methanol Needed/Day", f"{methanol_per_day:.2f} L")
+    k3.metric("📂 Tank Autonomy", f"{autonomy_days:.1f} days")
+    k4, k5, k6 = st.columns(3)
+    k4.metric("🔋 Battery Autonomy", f"{battery_hours:.1f} h")
+    k5.metric("🌱 System Efficiency", f"{efficiency_pct*100:.1f}%")
+    k6.metric("⚡ Battery Charge Time", f"{charge_time:.1f} h")
+    prof.lap("KPI math")
+
+    # Appliance Summary
+    st.markdown("Equipments Energy Summary")
+    df = cache.get_or_compute(stable_hash("summary", custom_appliances), lambda: appliance_summary(custom_appliances))
+    st.dataframe(df.rename(columns={"name": "Device", "power": "Power (W)", "hours": "Hours"}))
+    prof.lap("Summary DataFrame")
+
+    # 🔹 Help Section 4: Gauges Descriptions
+    with st.expander("📊 How to interpret the chart gauges"):
+        st.markdown("""
                 The Battery Autonomy gauge estimates how long your system can run just on the battery power before requiring recharging. 
                 The System Efficiency gauge reflects how effectively methanol fuel is converted into usable electrical energy across the system.
                 This indicator considers both, the Battery and Fuel Cell efficiencies.
                 """)
-# 📊 Gauges
-fig_batt = go.Figure(go.Indicator(
-    mode="gauge+number",
-    value=battery_hours,
-    title={'text': "Battery Autonomy (h)",'font': {'size': 22,'color': "black"}},
-    gauge={
-        'axis': {'range': [0, 24]},
-        'bar': {'color': "black"},
-        'steps': [
-            {'range': [0, 2.4], 'color': "gray"},
-            {'range': [2.4, 7.2], 'color': "red"},
-            {'range': [7.2, 12], 'color': "orange"},
-            {'range': [12, 19.2], 'color': "yellow"},
-            {'range': [19.2, 24], 'color': "green"},
-        ]
-    }))
-fig_eff = go.Figure(go.Indicator(
-    mode="gauge+number",
-    value=efficiency_pct * 100,
-    title={'text': "System Efficiency (%)",'font': {'size': 22,'color': "black"}},
-    gauge={
-        'axis': {'range': [0, 100]},
-        'bar': {'color': "black"},
-        'steps': [
-            {'range': [0, 20], 'color': "red"},
-            {'range': [20, 50], 'color': "orange"},
-            {'range': [50, 80], 'color': "yellow"},
-            {'range': [80, 100], 'color': "green"},
-        ]
-    }))
-
-colg1, colg2 = st.columns(2)
-colg1.plotly_chart(fig_batt, use_container_width=True)
-colg2.plotly_chart(fig_eff, use_container_width=True)
-
-# Create safely temp files and save them for the PDF report
-tmp_batt = tempfile.NamedTemporaryFile(suffix=".png", delete=False)
-tmp_eff = tempfile.NamedTemporaryFile(suffix=".png", delete=False)
-
-fig_batt.write_image(tmp_batt.name)
-fig_eff.write_image(tmp_eff.name)
-
-
-# PDF Report
-st.markdown("### 📄 Export Report as PDF")
-if st.button("Generate PDF Performance Report"):
-    import os
-    #from PIL import Image --this line is commented on 24.06.2025 due to conflicts.
-    import io
-
-    # Descargar logo del dashboard
-    logo_url = "https://raw.githubusercontent.com/Victor1492Alvarez/Fuel_Cell-Battery_kpi-dashboard/main/dashboard_logo.PNG"
-    logo_path = "/tmp/dashboard_logo.png"
-    try:
-        response = requests.get(logo_url)
-        response.raise_for_status()
-        with open(logo_path, "wb") as f:
-            f.write(response.content)
-    except Exception as e:
-        st.error(f"❌ No se pudo descargar el logo del dashboard: {e}")
-        logo_path = None
-
-    # Descargar y convertir el wiring diagram a PNG válido
-    diagram_url = "https://raw.githubusercontent.com/Victor1492Alvarez/Fuel_Cell-Battery_kpi-dashboard/main/wiring_diagram_1.png"
-    diagram_path = "/tmp/wiring_diagram_1_converted.png"
-    diagram_downloaded = False
-    try:
-        response = requests.get(diagram_url)
-        response.raise_for_status()
-        with open(diagram_path, "wb") as f:
-            f.write(response.content)
-        diagram_downloaded = True
-    except Exception as e:
-        st.error(f"❌ Error al descargar el wiring diagram: {e}")
-    # Crear PDF
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_auto_page_break(auto=False, margin=5)
-    pdf.set_font("Arial", "B", 16)
-    pdf.cell(10, 10, "Fuel Cell & Battery System Performance Report", ln=0)
-    if logo_path and os.path.exists(logo_path):
-        try:
-            pdf.image(logo_path, x=166, y=5, w=40)
-        except Exception as e:
-            st.warning(f"⚠️ No se pudo insertar el logo: {e}")
-    pdf.ln(12)
-
-    pdf.set_font("Arial", "B", 11)
-    pdf.cell(200, 6, "System KPIs", ln=True)
-    pdf.set_font("Arial", size=10)
-    pdf.cell(200, 6, f"Daily Energy Demand: {daily_demand_wh:.0f} Wh", ln=True)
-    pdf.cell(200, 6, f"Methanol Needed/Day: {methanol_per_day:.2f} L", ln=True)
-    pdf.cell(200, 6, f"Tank Autonomy: {autonomy_days:.1f} days", ln=True)
-    pdf.cell(200, 6, f"Battery Autonomy: {battery_hours:.1f} h", ln=True)
-    pdf.cell(200, 6, f"System Efficiency: {efficiency_pct*100:.1f}%", ln=True)
-    pdf.cell(200, 6, f"Battery Charge Time: {charge_time:.1f} h", ln=True)
-
-    pdf.ln(4)
-    pdf.set_font("Arial", "B", 11)
-    pdf.cell(200, 6, "Equipments Energy Summary", ln=True)
-    pdf.set_font("Arial", size=10)
-    for _, row in df[:-1].iterrows():
-        pdf.cell(200, 6, f"{row['name']}: {row['power']}W x {row['hours']}h = {row['Energy (Wh)']:.0f}Wh | {row['Battery Capacity Used (Ah)']:.1f}Ah", ln=True)
-
-    pdf.ln(4)
-    pdf.set_font("Arial", "B", 11)
-    pdf.cell(200, 6, "System Constants", ln=True)
-    pdf.set_font("Arial", size=10)
-    for i, row in constants_df.iterrows():
-        pdf.cell(200, 6, f"{row['Parameter']}: {row['Value']}", ln=True)
-
-    pdf.ln(4)
-    pdf.image(tmp_batt.name, x=0, y=pdf.get_y(), w=110)
-    pdf.image(tmp_eff.name, x=103, y=pdf.get_y(), w=110)
-
-
-    pdf.ln(62)
-    pdf.set_font("Arial", size=8)
-    pdf.cell(200, 6, "The gauges show key metrics for system autonomy and energy conversion efficiency.", ln=True)
-
-    # Insertar wiring diagram convertido
-    if diagram_downloaded and os.path.exists(diagram_path):
+    # 📊 Gauges
+    fig_batt, fig_eff = cache.get_or_compute(stable_hash("gauges", battery_hours, efficiency_pct),
+                                             lambda: build_gauges(battery_hours, efficiency_pct))
+
+    colg1, colg2 = st.columns(2)
+    colg1.plotly_chart(fig_batt, use_container_width=True)
+    colg2.plotly_chart(fig_eff, use_container_width=True)
+    prof.lap("Gauge figures")
+
+    # 🔄 Minute-resolution SOC simulation
+    with st.expander("🔄 Battery State of Charge over the Day"):
+        sim_days = st.slider("Simulated days", 1, 31, 1)
+        sim_key = stable_hash("soc", inputs_key, sim_days)
+        sim = cache.get_or_compute(sim_key,
+                                   lambda: simulate_appliances(custom_appliances, days=sim_days, tank_liters=tank_liters))
+        s1, s2, s3 = st.columns(3)
+        s1.metric("⏱️ Fuel Cell Runtime", f"{sim['kpis']['fc_runtime_h']:.1f} h")
+        s2.metric("🔁 Fuel Cell Starts", f"{sim['kpis']['fc_starts']}")
+        s3.metric("🪫 Minimum SOC", f"{sim['kpis']['min_soc']*100:.0f}%")
+        visible_h = st.slider("Visible window (h)", 0.0, sim_days * 24.0, (0.0, sim_days * 24.0), 1.0)
+        # at most one point per pixel column reaches the browser, whatever the window
+        soc_h, soc_pct = downsample_range(sim_key, np.arange(sim['soc'].size) / 60, sim['soc'] * 100, *visible_h)
+        fig_soc = go.Figure()
+        fig_soc.add_trace(go.Scatter(x=soc_h, y=soc_pct, name="SOC (%)"))
+        fig_soc.update_layout(xaxis_title="Time (h)", yaxis_title="SOC (%)", height=300, margin=dict(t=20, b=30))
+        st.plotly_chart(fig_soc, use_container_width=True)
+        st.markdown("""
+                Appliances start at 18:00 and run their hours in one block. The fuel cell switches on below 30% SOC
+                and charges the battery back to 95% with its constant 125 W output.
+                """)
+        # rainflow cycle count of the simulated SOC, extrapolated to the years in service
+        cycles = count_cycles(sim['soc'])
+        wear = cycles.summary()
+        years_in_service = st.slider("Years in service", 0, 15, 5)
+        faded_wh = cycles.effective_capacity_wh(years_in_service)
+        d1, d2, d3 = st.columns(3)
+        d1.metric("🔁 Equivalent Full Cycles/Day", f"{wear['efc_per_day']:.2f}")
+        d2.metric(f"🔋 Capacity after {years_in_service} years", f"{faded_wh:.0f} Wh",
+                  f"{(faded_wh / BATTERY_CAPACITY_WH - 1) * 100:.1f}%")
+        d3.metric("🔋 Battery Autonomy (faded)", f"{battery_discharge_time(daily_demand_wh, faded_wh):.1f} h")
+        st.caption(f"At this usage the battery reaches {END_OF_LIFE_CAPACITY:.0%} of its capacity after "
+                   f"about {wear['remaining_years']:.1f} years (cycle ageing only).")
+    prof.lap("SOC simulation")
+
+    # ⚙️ Optimal fuel-cell schedule compared with the SOC hysteresis above
+    with st.expander("⚙️ Optimal Fuel-Cell Dispatch"):
+        # expander bodies run even when collapsed, so the planner only runs once asked for
+        if st.toggle("Compute the optimal schedule", key="run_dispatch"):
+            plan_days = st.slider("Planning horizon (days)", 1, 7, 7)
+            # both from the same SOC, each charged the methanol to recharge what it ends below it
+            dispatch = cache.get_or_compute(stable_hash("dispatch", inputs_key, plan_days),
+                                            lambda: compare_with_hysteresis(custom_appliances, plan_days,
+                                                                            tank_liters=tank_liters))
+            plan, rule = dispatch["plan"], dispatch["rule"]
+            d1, d2, d3 = st.columns(3)
+            d1.metric("🧪 Methanol (plan)", f"{plan['kpis']['methanol_adjusted_l']:.2f} L",
+                      f"{plan['kpis']['methanol_adjusted_l'] - rule['kpis']['methanol_adjusted_l']:+.2f} L vs hysteresis",
+                      delta_color="inverse")
+            d2.metric("🔁 Fuel Cell Starts", f"{plan['kpis']['fc_starts']}",
+                      f"{plan['kpis']['fc_starts'] - rule['kpis']['fc_starts']:+d}", delta_color="inverse")
+            d3.metric("⚠️ Unserved Energy", f"{plan['kpis']['unserved_wh']:.0f} Wh")
+            plan_h = np.arange(plan['soc'].size) * DEFAULT_STEP_MIN / 60
+            fig_plan = go.Figure()
+            fig_plan.add_trace(go.Scatter(x=plan_h, y=plan['soc'] * 100, name="SOC plan (%)"))
+            fig_plan.add_trace(go.Scatter(x=plan_h, y=rule['soc'] * 100, name="SOC hysteresis (%)", line=dict(dash="dot")))
+            fig_plan.add_trace(go.Scatter(x=plan_h, y=plan['fc_on'] * 100, name="Fuel cell on", fill="tozeroy",
+                                          line=dict(width=0), opacity=0.3))
+            fig_plan.update_layout(xaxis_title="Time (h)", yaxis_title="SOC (%)", height=300, margin=dict(t=20, b=30))
+            st.plotly_chart(fig_plan, use_container_width=True)
+            st.caption(f"5-minute dynamic-programming schedule minimizing methanol and starts with SOC kept above "
+                       f"{SOC_MIN:.0%}; energy below that floor counts as unserved. Both runs start at "
+                       f"{dispatch['initial_soc']:.0%} SOC, and methanol includes recharging any deficit at the end.")
+    prof.lap("Dispatch plan")
+
+    # 🧮 Battery / fuel cell / tank sizing for the current appliance profile
+    with st.expander("🧮 Component Sizing (Pareto front)"):
+        target_days = st.slider("Target tank autonomy (days)", 1, 30, 7)
+        objective = st.radio("Optimize for", OBJECTIVES, horizontal=True,
+                             format_func=lambda o: {"cost_eur": "Cost (€)", "weight_kg": "Weight (kg)"}[o])
+        # the catalog is part of the key, so editing component_catalog.json invalidates the stored fronts
+        catalog = load_catalog()
+        sizing = cache.get_or_compute(stable_hash("sizing", custom_appliances, target_days, objective, catalog),
+                                      lambda: optimize(custom_appliances, target_days, catalog, objective=objective))
+        if sizing["best"] is None:
+            st.warning("⚠️ No catalog configuration reaches this autonomy.")
+        else:
+            st.dataframe(sizing["front"].round(2), hide_index=True)
+            st.caption(f"{sizing['stats']['combinations']:,} combinations searched; configurations on the front are "
+                       "not beaten on both cost and weight by any other. Prices are indicative catalog values.")
+    prof.lap("Sizing optimizer")
+
+    # 🎲 Spread of autonomy and methanol use under uncertain usage and constants
+    with st.expander("🎲 Uncertainty (Monte Carlo)"):
+        # expander bodies run even when collapsed, so the sampling only runs once asked for
+        if st.toggle("Run the Monte Carlo analysis", key="run_monte_carlo"):
+            mc1, mc2, mc3 = st.columns(3)
+            hours_spread = mc1.slider("Usage spread (± % of hours, 1 sd)", 0, 100, 30, 5) / 100
+            mc_samples = mc2.select_slider("Samples", [10_000, 100_000, 1_000_000], 100_000)
+            mc_seed = mc3.number_input("Seed", 0, 2**31 - 1, 0)
+
+            def monte_carlo_summary():
+                mc = run_monte_carlo(custom_appliances, tank_liters, mc_samples, mc_seed, hours_rel_sd=hours_spread,
+                                     keep_samples=True)
+                autonomy = mc["values"]["autonomy_days"]
+                counts, edges = np.histogram(autonomy[np.isfinite(autonomy)], bins=50)
+                return {"percentiles": mc["percentiles"], "hist": (counts, edges)}
+
+            mc = cache.get_or_compute(stable_hash("montecarlo", custom_appliances, tank_liters, mc_samples, mc_seed, hours_spread),
+                                      monte_carlo_summary)
+            st.table(pd.DataFrame([
+                {"KPI": label, **{q.upper(): fmt.format(mc["percentiles"][key][q]) for q in ("p10", "p50", "p90")}}
+                for label, key, fmt in [("Tank Autonomy (days)", "autonomy_days", "{:.1f}"),
+                                        ("Methanol Needed/Day (L)", "methanol_per_day", "{:.2f}"),
+                                        ("Daily Energy Demand (Wh)", "daily_demand_wh", "{:.0f}")]
+            ]))
+            counts, edges = mc["hist"]
+            fig_mc = go.Figure(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, marker_color="#4CAF50"))
+            fig_mc.update_layout(xaxis_title="Tank autonomy (days)", yaxis_title="Samples", height=250, margin=dict(t=20, b=30))
+            st.plotly_chart(fig_mc, use_container_width=True)
+            st.caption("Appliance hours vary around the sidebar values; methanol consumption ~ N(0.9, 0.05) L/kWh and "
+                       "battery efficiency triangular(85%, 90%, 95%).")
+    prof.lap("Monte Carlo")
+
+    # 🌪️ Which inputs drive the KPIs
+    with st.expander("🌪️ Sensitivity Analysis"):
+        # expander bodies run even when collapsed, so the analysis only runs once asked for
+        if st.toggle("Run the sensitivity analysis", key="run_sensitivity"):
+            sens_kpi = st.selectbox("KPI", ["autonomy_days", "efficiency"],
+                                    format_func=lambda k: {"autonomy_days": "Tank Autonomy", "efficiency": "System Efficiency"}[k])
+            sens_key = stable_hash("sensitivity", custom_appliances, tank_liters, sens_kpi)
+            swings = cache.get_or_compute(sens_key + ":tornado", lambda: tornado(custom_appliances, tank_liters, sens_kpi))
+            ranking = cache.get_or_compute(sens_key + ":rank", lambda: rank_parameters(custom_appliances, tank_liters, sens_kpi))
+            top = swings.head(10).iloc[::-1]
+            base = top["base"].iloc[0]
+            fig_tornado = go.Figure()
+            fig_tornado.add_trace(go.Bar(y=top["parameter"], x=top["low"] - base, base=base, orientation="h",
+                                         name="Parameter at low bound", marker_color="#2196F3"))
+            fig_tornado.add_trace(go.Bar(y=top["parameter"], x=top["high"] - base, base=base, orientation="h",
+                                         name="Parameter at high bound", marker_color="#FF5722"))
+            fig_tornado.update_layout(barmode="overlay", height=380, margin=dict(t=20, b=30), xaxis_title=sens_kpi)
+            st.plotly_chart(fig_tornado, use_container_width=True)
+            st.dataframe(ranking.head(10).round(3), hide_index=True)
+            st.caption("Appliance hours/powers vary ±50 %, system constants and tank ±20 %. ST: total Sobol index "
+                       "(share of output variance incl. interactions), mu_star: Morris mean absolute effect.")
+    prof.lap("Sensitivity")
+
+    # 📈 Measured KPIs from a logged telemetry file or the imported telemetry store
+    telemetry_store = TelemetryStore()
+    vehicles = telemetry_store.vehicles()
+    vehicle = st.sidebar.selectbox("Logged vehicle", ["-"] + vehicles) if vehicles else "-"
+    telemetry_file = st.sidebar.file_uploader("Telemetry log (CSV/Parquet)", type=["csv", "parquet"])
+    if vehicle != "-":
+        st.markdown(f"### 📈 Measured vs Simulated KPIs ({vehicle})")
+        vehicle_log = telemetry_store.open(vehicle)
+        if len(vehicle_log):
+            first_day = pd.Timestamp(vehicle_log.meta["first_ns"]).date()
+            last_day = pd.Timestamp(vehicle_log.meta["last_ns"]).date()
+            window = st.sidebar.date_input("Log window", value=(max(first_day, last_day - pd.Timedelta(days=6)), last_day),
+                                           min_value=first_day, max_value=last_day)
+            if len(window) == 2:
+                measured_kpis = range_kpis(vehicle_log.range(window[0], window[1] + pd.Timedelta(days=1)), tank_liters)
+                st.table(compare_kpis(kpis, measured_kpis))
+                st.caption(f"{measured_kpis['covered_days']:.1f} logged days, "
+                           f"{measured_kpis['samples']:.0f} samples, {measured_kpis['gaps']:.0f} gaps")
+                with st.expander("Logged SOC and fuel-cell power"):
+                    view = vehicle_log.range(window[0], window[1] + pd.Timedelta(days=1))
+                    trace_key = stable_hash("telemetry", vehicle, len(vehicle_log), window)
+                    times = view["timestamp"].view("datetime64[ns]")
+                    fig_log = go.Figure()
+                    if "soc" in view:
+                        t_soc, soc = downsample_range(trace_key + ":soc", times, view["soc"])
+                        fig_log.add_trace(go.Scatter(x=t_soc, y=soc * 100, name="SOC (%)"))
+                    # min/max envelope keeps the short fuel-cell on/off spikes visible
+                    t_fc, fc = downsample_range(trace_key + ":fc", times, view["fc_power_w"], method="minmax")
+                    fig_log.add_trace(go.Scatter(x=t_fc, y=fc, name="Fuel cell (W)", yaxis="y2"))
+                    fig_log.update_layout(yaxis_title="SOC (%)", yaxis2=dict(title="Power (W)", overlaying="y", side="right"),
+                                          height=300, margin=dict(t=20, b=30))
+                    st.plotly_chart(fig_log, use_container_width=True)
+    elif telemetry_file is not None:
+        st.markdown("### 📈 Measured vs Simulated KPIs")
         try:
-            pdf.ln(10)
-            pdf.image(diagram_path, x=110, y=110, w=90)
-        except Exception as e:
-            st.warning(f"⚠️ No se pudo insertar el wiring diagram en el PDF: {e}")
-
-    pdf.ln(12)
-    pdf.set_font("Arial","B", size=8)
-    pdf.cell(200, 3, f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}. Values strictly estimated for academic purposes", ln=True)
-    pdf.cell(200, 3, "Coder: Victor Alvarez Melendez", ln=True)
-    pdf.cell(200, 3, "Master Student in Hydrogen Technology", ln=True)
-    pdf.cell(200, 3, "Technische Hochschule Rosenheim - Campus Burghausen", ln=True)
-    pdf.cell(200, 35, "Thanks for using our App. Servus and enjoy your camping days in the Alps!.", ln=True)
-
-    # Descargar PDF final
-    pdf_bytes = pdf.output(dest='S').encode('latin1')
-    st.download_button("📥 Download PDF Report", data=pdf_bytes, file_name="kpi_report.pdf", mime="application/pdf")
+            measured = cache.get_or_compute(stable_hash("telemetry", source_key(telemetry_file), tank_liters),
+                                            lambda: ingest(telemetry_file, tank_liters))
+        except (ValueError, KeyError) as e:
+            st.error(f"⚠️ Could not read the telemetry log: {e}")
+        else:
+            st.table(compare_kpis(kpis, measured["kpis"]))
+            st.caption(f"{measured['kpis']['covered_days']:.1f} logged days, "
+                       f"{measured['kpis']['samples']:.0f} samples, {measured['kpis']['gaps']:.0f} gaps")
+            with st.expander("Measured daily energy"):
+                st.bar_chart(measured["daily"][["battery_discharge_wh", "fc_wh"]])
+    prof.lap("Telemetry")
+
+    # PDF Report
+    st.markdown("### 📄 Export Report as PDF")
+    def build_pdf_report():
+        # Gauge images are only rendered for the report, in the background while the report is laid out
+        png_batt = render_png_async(fig_batt)
+        png_eff = render_png_async(fig_eff)
+        return render_report(kpis, custom_appliances, (png_batt.result(), png_eff.result()), warn=st.warning)
+
+    if st.button("Generate PDF Performance Report"):
+        # Descargar PDF final
+        # Built fresh on every click: the report carries its generation time and any asset warnings
+        pdf_bytes = build_pdf_report()
+        st.download_button("📥 Download PDF Report", data=pdf_bytes, file_name="kpi_report.pdf", mime="application/pdf")
+    prof.lap("PDF report")
+
+    # 🗃️ Cache statistics
+    with st.sidebar.expander("Cache statistics"):
+        st.json(cache.info())
+        st.caption("KPI recomputations this session")
+        st.json(kpi_graph.recomputed)
+
+    prof.finish()
@@ -0,0 +1,172 @@
+# battery_degradation.py
+# Cycle-based capacity fade of the Li 105 from SOC trajectories.
+# SOC samples are consumed chunk by chunk (simulated or logged, any length): each
+# chunk is reduced to its turning points with NumPy, and the turning points go
+# through a streaming four-point rainflow count. Only the unclosed residual of
+# turning points is kept between chunks, so years of minute data need no history.
+#
+# Every closed cycle of depth d (SOC swing) adds d equivalent full cycles and
+# 1 / N(d) damage, with N(d) = CYCLE_LIFE_FULL_DOD × d^-DOD_EXPONENT cycles to end of
+# life (Wöhler-type curve: shallow cycles wear much less than their depth suggests).
+# Capacity fades linearly with damage down to END_OF_LIFE_CAPACITY at damage 1;
+# the unclosed residual is counted as half cycles whenever a summary is taken.
+# Calendar ageing is not modelled.
+#
+#   counter = RainflowCounter(step_min=1.0)
+#   for soc in chunks: counter.update(soc)
+#   capacity_wh = counter.effective_capacity_wh(years=5)   # -> battery_discharge_time(..., capacity_wh)
+#
+# Usage: python battery_degradation.py soc.npy [--step-min 1]
+#        python battery_degradation.py --scenario Winter --days 365
+import argparse
+import json
+import sys
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from kpi_calculator_version2 import BATTERY_CAPACITY_WH
+from soc_simulation import MINUTES_PER_DAY
+
+CYCLE_LIFE_FULL_DOD = 3000.0   # cycles at 100 % depth of discharge until END_OF_LIFE_CAPACITY
+DOD_EXPONENT = 1.3
+END_OF_LIFE_CAPACITY = 0.80
+DEPTH_BINS = 20                # histogram of cycle depths in 5 % steps
+CHUNK_SAMPLES = 1_000_000
+
+
+def cycles_to_end_of_life(depth) -> np.ndarray:
+    """N(d): cycles of depth d (SOC fraction) the battery survives until END_OF_LIFE_CAPACITY."""
+    depth = np.maximum(np.asarray(depth, dtype=float), 1e-6)
+    return CYCLE_LIFE_FULL_DOD * depth ** -DOD_EXPONENT
+
+
+class RainflowCounter:
+    def __init__(self, step_min: float = 1.0, capacity_wh: float = BATTERY_CAPACITY_WH):
+        self.step_min = step_min
+        self.capacity_wh = capacity_wh
+        self.samples = 0
+        self.full_cycles = 0
+        self.equivalent_full_cycles = 0.0   # of the closed cycles
+        self.damage = 0.0                   # of the closed cycles
+        self.histogram = np.zeros(DEPTH_BINS)
+        self._residual: List[float] = []    # turning points not yet closed into a cycle
+        self._last: Optional[float] = None  # last sample seen
+        self._direction = 0.0               # sign of the last non-zero SOC change
+
+    def _reversals(self, soc: np.ndarray) -> np.ndarray:
+        x = soc if self._last is None else np.concatenate(([self._last], soc))
+        moves = np.flatnonzero(np.diff(x))
+        if not moves.size:
+            return np.zeros(0) if self._last is not None or not x.size else x[:1]
+        sign = np.sign(x[moves + 1] - x[moves])
+        previous = np.concatenate(([self._direction or sign[0]], sign[:-1]))
+        turning = x[moves[sign != previous]]
+        if self._last is None:
+            turning = np.concatenate((x[:1], turning))
+        self._direction = float(sign[-1])
+        return turning
+
+    def update(self, soc) -> None:
+        """Count the cycles in the next chunk of SOC samples (fractions 0..1)."""
+        soc = np.asarray(soc, dtype=float).ravel()
+        if not soc.size:
+            return
+        stack = self._residual
+        closed = []
+        for point in self._reversals(soc).tolist():
+            stack.append(point)
+            while len(stack) >= 4:
+                inner = abs(stack[-2] - stack[-3])
+                if inner <= abs(stack[-3] - stack[-4]) and inner <= abs(stack[-1] - stack[-2]):
+                    closed.append(inner)
+                    del stack[-3:-1]
+                else:
+                    break
+        if closed:
+            depth = np.asarray(closed)
+            self.full_cycles += depth.size
+            self.equivalent_full_cycles += float(depth.sum())
+            self.damage += float(np.sum(1.0 / cycles_to_end_of_life(depth)))
+            self.histogram += np.bincount(np.minimum((depth * DEPTH_BINS).astype(int), DEPTH_BINS - 1),
+                                          minlength=DEPTH_BINS)
+        self.samples += soc.size
+        self._last = float(soc[-1])
+
+    def _half_cycles(self) -> np.ndarray:
+        points = self._residual + ([self._last] if self._last is not None and
+                                   (not self._residual or self._residual[-1] != self._last) else [])
+        return np.abs(np.diff(points)) if len(points) > 1 else np.zeros(0)
+
+    @property
+    def days(self) -> float:
+        return self.samples * self.step_min / MINUTES_PER_DAY
+
+    def total_damage(self) -> float:
+        half = self._half_cycles()
+        return self.damage + float(np.sum(0.5 / cycles_to_end_of_life(half))) if half.size else self.damage
+
+    def capacity_fraction(self, years: float = 0.0) -> float:
+        """Remaining capacity share now, or `years` from now at the damage rate seen so far."""
+        damage = self.total_damage()
+        if years and self.days > 0:
+            damage *= 1 + years * 365.0 / self.days
+        return max(0.0, 1.0 - (1.0 - END_OF_LIFE_CAPACITY) * damage)
+
+    def effective_capacity_wh(self, years: float = 0.0) -> float:
+        return self.capacity_wh * self.capacity_fraction(years)
+
+    def summary(self) -> Dict:
+        half = self._half_cycles()
+        damage = self.total_damage()
+        rate = damage / self.days if self.days > 0 else 0.0
+        return {
+            "days": self.days,
+            "full_cycles": self.full_cycles,
+            "half_cycles": int(half.size),
+            "equivalent_full_cycles": self.equivalent_full_cycles + 0.5 * float(half.sum()),
+            "efc_per_day": (self.equivalent_full_cycles + 0.5 * float(half.sum())) / self.days if self.days else 0.0,
+            "damage": damage,
+            "capacity_fraction": self.capacity_fraction(),
+            "effective_capacity_wh": self.effective_capacity_wh(),
+            "remaining_years": (1.0 - damage) / rate / 365.0 if rate > 0 else float("inf"),
+            "depth_histogram": self.histogram.tolist(),
+        }
+
+
+def count_cycles(soc, step_min: float = 1.0, chunk_samples: int = CHUNK_SAMPLES) -> RainflowCounter:
+    """Run a RainflowCounter over a whole trajectory (array or np.load(..., mmap_mode='r'))."""
+    counter = RainflowCounter(step_min)
+    for start in range(0, len(soc), chunk_samples):
+        counter.update(soc[start:start + chunk_samples])
+    return counter
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Rainflow cycle count and capacity fade of SOC trajectories.")
+    parser.add_argument("soc", nargs="?", help=".npy file with SOC samples (fractions 0..1)")
+    parser.add_argument("--step-min", type=float, default=1.0)
+    parser.add_argument("--scenario", help="simulate synthetic days of this registry scenario instead")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.scenario:
+        from load_generator import generate_profiles, simulate_stream
+        from scenario_registry import default_registry
+
+        counter = RainflowCounter(args.step_min)
+        stream = generate_profiles(default_registry().profile(args.scenario), args.days,
+                                   step_min=args.step_min, seed=args.seed)
+        simulate_stream(stream, args.step_min, counter=counter)
+    elif args.soc:
+        counter = count_cycles(np.load(args.soc, mmap_mode="r"), args.step_min)
+    else:
+        parser.error("give a SOC .npy file or --scenario")
+    json.dump(counter.summary(), sys.stdout, indent=2)
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+# benchmarks.py
+# Headless benchmark suite for the KPI calculators and the dashboard render paths.
+# Every benchmark is timed timeit-style (enough loops for ~50 ms per run, best and
+# median of several runs). Results are written as JSON and compared against a
+# stored baseline; a benchmark that got slower than baseline × (1 + tolerance)
+# makes the run fail with exit code 1.
+#
+# Usage: python benchmarks.py                      # run, compare with benchmark_baseline.json
+#        python benchmarks.py --update-baseline    # store the current numbers as the baseline
+#        python benchmarks.py --only batch --output results.json
+# Baselines are machine specific: regenerate them on the machine that runs the check.
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(REPO_DIR, "benchmark_baseline.json")
+DEFAULT_TOLERANCE = 0.5  # 50 % slower than the baseline fails
+MIN_RUN_SECONDS = 0.05
+REPEATS = 5
+
+BENCH_APPLIANCES = [
+    {"name": "Laptop (230 V)", "power": 95, "hours": 4},
+    {"name": "Led Lighting (12 V)", "power": 15, "hours": 6},
+    {"name": "Cool box (12 V)", "power": 60, "hours": 8},
+    {"name": "Fan Heater (12 V)", "power": 490, "hours": 2},
+    {"name": "Smartphone (3 chargers)", "power": 35, "hours": 2},
+    {"name": "Electric kettle (12 V)", "power": 300, "hours": 0.5},
+    {"name": "Radio (12 V)", "power": 5, "hours": 3},
+]
+BATCH_SIZES = (1, 1_000, 100_000)
+
+
+def time_call(fn: Callable[[], object]) -> Dict:
+    """Per-call seconds of fn: best and median over REPEATS runs of an auto-sized loop."""
+    fn()  # warm-up (imports, caches)
+    loops = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - t0
+        if elapsed >= MIN_RUN_SECONDS or loops >= 1_000_000:
+            break
+        loops *= 10
+    runs = [elapsed / loops]
+    for _ in range(REPEATS - 1):
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        runs.append((time.perf_counter() - t0) / loops)
+    return {"best_s": min(runs), "median_s": statistics.median(runs), "loops": loops}
+
+
+def _scalar_benchmarks() -> List[Tuple[str, Callable[[], object]]]:
+    import kpi_calculator as v1
+    import kpi_calculator_version2 as v2
+
+    benches = []
+    for label, mod in (("kpi_calculator", v1), ("kpi_calculator_version2", v2)):
+        benches += [
+            (f"{label}.calculate_daily_energy_demand", lambda m=mod: m.calculate_daily_energy_demand(BENCH_APPLIANCES)),
+            (f"{label}.calculate_methanol_consumption", lambda m=mod: m.calculate_methanol_consumption(2165.0)),
+            (f"{label}.calculate_tank_autonomy", lambda m=mod: m.calculate_tank_autonomy(10, 1.95)),
+            (f"{label}.battery_discharge_time", lambda m=mod: m.battery_discharge_time(2165.0)),
+            (f"{label}.global_system_efficiency", lambda m=mod: m.global_system_efficiency(1344.0, 821.0, 1.95)),
+            (f"{label}.peak_load_coverage", lambda m=mod: m.peak_load_coverage(2997)),
+        ]
+    benches.append(("kpi_calculator_version2.battery_charge_time_needed",
+                    lambda: v2.battery_charge_time_needed(821.0)))
+    return benches
+
+
+def _batch_benchmarks() -> List[Tuple[str, Callable[[], object]]]:
+    import numpy as np
+
+    import kpi_calculator_version2 as v2
+    from kpi_batch import appliances_to_arrays, calculate_kpis_batch
+    from monte_carlo import run_monte_carlo
+    from report_pipeline import compute_kpis
+    from scenario_registry import default_registry
+    from temperature_model import daily_temperature_kpis, synthetic_temperatures
+
+    power, hours = appliances_to_arrays(BENCH_APPLIANCES)
+    rng = np.random.default_rng(0)
+    benches = []
+    for n in BATCH_SIZES:
+        h = rng.uniform(0, 24, size=(n, power.size))
+        tanks = rng.choice([5.0, 10.0, 20.0], size=n)
+        benches.append((f"kpi_batch.calculate_kpis_batch[{n}]",
+                        lambda h=h, t=tanks: calculate_kpis_batch(power, h, t)))
+    scenarios = [[dict(app, hours=float(x)) for app, x in zip(BENCH_APPLIANCES, row)]
+                 for row in rng.uniform(0, 24, size=(1_000, power.size))]
+    benches.append(("kpi_calculator_version2.scalar_loop[1000]",
+                    lambda: [compute_kpis(apps, 10) for apps in scenarios]))
+    benches.append(("kpi_calculator_version2.calculate_daily_energy_demand[1000]",
+                    lambda: [v2.calculate_daily_energy_demand(apps) for apps in scenarios]))
+    benches.append(("monte_carlo.run_monte_carlo[100000]", lambda: run_monte_carlo(BENCH_APPLIANCES, 10)))
+    fleet_temperatures = synthetic_temperatures()[None, :] + rng.normal(0, 3, size=(1_000, 1))
+    winter = default_registry().profile("Winter")
+    benches.append(("temperature_model.daily_temperature_kpis[1000 vehicles, 1 year]",
+                    lambda: daily_temperature_kpis(fleet_temperatures, winter)))
+    return benches
+
+
+def _render_benchmarks() -> List[Tuple[str, Callable[[], object]]]:
+    from report_pipeline import appliance_summary, build_gauges, compute_kpis, render_report
+
+    kpis = compute_kpis(BENCH_APPLIANCES, 10)
+    benches = [
+        ("dashboard.appliance_summary", lambda: appliance_summary(BENCH_APPLIANCES)),
+        ("dashboard.build_gauges", lambda: build_gauges(kpis["battery_hours"], kpis["efficiency_pct"])),
+    ]
+    try:
+        from gauge_render import render_png
+        fig_batt, fig_eff = build_gauges(kpis["battery_hours"], kpis["efficiency_pct"])
+        pngs = (render_png(fig_batt), render_png(fig_eff))
+    except Exception as e:  # kaleido/Chromium not available on this machine
+        print(f"skipping PDF benchmark: {e}", file=sys.stderr)
+    else:
+        benches.append(("report.render_report", lambda: render_report(kpis, BENCH_APPLIANCES, pngs)))
+    return benches
+
+
+def _simulation_benchmarks() -> List[Tuple[str, Callable[[], object]]]:
+    from dispatch import plan_appliances
+    from load_model import analyze_load
+    from scenario_registry import default_registry
+    from soc_simulation import simulate_appliances
+
+    registry = default_registry()
+    scheduled = [app for name in registry.names for app in registry.profile(name)][:20]
+    return [
+        ("soc_simulation.simulate_appliances[1 day]", lambda: simulate_appliances(BENCH_APPLIANCES, days=1)),
+        ("soc_simulation.simulate_appliances[31 days]", lambda: simulate_appliances(BENCH_APPLIANCES, days=31)),
+        ("dispatch.plan_appliances[7 days, 5 min]", lambda: plan_appliances(BENCH_APPLIANCES, days=7)),
+        ("load_model.analyze_load[20 devices, 7 days]", lambda: analyze_load(scheduled, days=7)),
+    ]
+
+
+SUITES = {
+    "scalar": _scalar_benchmarks,
+    "batch": _batch_benchmarks,
+    "render": _render_benchmarks,
+    "simulation": _simulation_benchmarks,
+}
+
+
+def run_benchmarks(only: Optional[List[str]] = None) -> Dict[str, Dict]:
+    results = {}
+    for suite, build in SUITES.items():
+        if only and suite not in only:
+            continue
+        for name, fn in build():
+            results[name] = time_call(fn)
+            print(f"{name:60s} {results[name]['median_s'] * 1e6:12.1f} µs", file=sys.stderr)
+    return results
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float) -> List[str]:
+    """Names of benchmarks whose median got slower than the baseline allows."""
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        limit = baseline[name]["median_s"] * (1 + tolerance)
+        if result["median_s"] > limit:
+            regressions.append(f"{name}: {result['median_s'] * 1e6:.1f} µs > "
+                               f"{limit * 1e6:.1f} µs (baseline {baseline[name]['median_s'] * 1e6:.1f} µs)")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the KPI calculators and dashboard render paths.")
+    parser.add_argument("--only", nargs="*", choices=list(SUITES), help="run only these suites")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, REPO_DIR)
+    results = run_benchmarks(args.only)
+    report = {"python": platform.python_version(), "machine": platform.machine(), "results": results}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f)["results"]
+        baseline.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(dict(report, results=baseline), f, indent=2, sort_keys=True)
+            f.write("\n")
+        return 0
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f)["results"], args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+# dispatch.py
+# Optimal on/off schedule for the fuel cell over a load profile.
+# soc_simulation switches the EFOY with a fixed SOC hysteresis; this planner instead
+# decides for every time step whether it should run, minimising
+#   methanol used + START_PENALTY_L per start + UNSERVED_PENALTY_L_PER_KWH per kWh not served
+# while the SOC stays within [soc_min, soc_max]. Ending below the initial SOC is
+# charged at the methanol it would take to recharge the difference, so the plan
+# cannot save fuel by simply emptying the battery.
+#
+# Dynamic programming over (time step, discretised SOC, fuel cell on/off): the value
+# function is computed backwards with NumPy over all SOC levels at once (linear
+# interpolation between levels), then the schedule is rolled forward from the
+# actual, continuous SOC. 7 days at 5-minute steps (2016 steps) take well under 1 s.
+# compare_with_hysteresis() runs the plan and the hysteresis rule from the same SOC
+# and adds the same recharge cost of any end-of-horizon deficit to both.
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from kpi_calculator_version2 import (
+    BATTERY_CAPACITY_WH,
+    BATTERY_EFFICIENCY,
+    FUEL_CELL_OUTPUT_W,
+    METHANOL_CONSUMPTION_PER_KWH,
+)
+from soc_simulation import FC_OFF_SOC, load_profile_from_appliances, simulate_soc, trajectory_kpis
+
+DEFAULT_STEP_MIN = 5.0
+SOC_MIN = 0.20
+SOC_MAX = FC_OFF_SOC
+SOC_LEVELS = 201
+START_PENALTY_L = 0.05           # methanol-equivalent cost of one start (warm-up, wear)
+UNSERVED_PENALTY_L_PER_KWH = 100.0
+_BLOCKED = 1e9                   # finite, so interpolation next to a blocked level stays well-defined
+
+
+def _step_options(level: np.ndarray, load_w: float, dt_h: float, capacity_wh: float, fc_w: float,
+                  efficiency: float, soc_min: float, soc_max: float, fc_cost_l: float):
+    """Next SOC and step cost for fuel cell off / on, from each SOC in `level`."""
+    options = []
+    for on in (False, True):
+        net_wh = ((fc_w if on else 0.0) - load_w) * dt_h
+        if net_wh > 0:
+            net_wh *= efficiency  # surplus is stored with battery losses
+        nxt = level + net_wh / capacity_wh
+        unserved_kwh = np.maximum(soc_min - nxt, 0.0) * capacity_wh / 1000
+        cost = unserved_kwh * UNSERVED_PENALTY_L_PER_KWH + (fc_cost_l if on else 0.0)
+        blocked = nxt > soc_max + 1e-9  # charging past the upper limit is not allowed
+        options.append((np.clip(nxt, soc_min, soc_max), cost, blocked, unserved_kwh))
+    return options
+
+
+def plan_dispatch(load_w: np.ndarray,
+                  step_min: float = DEFAULT_STEP_MIN,
+                  initial_soc: float = 1.0,
+                  battery_capacity_wh: float = BATTERY_CAPACITY_WH,
+                  fuel_cell_output_w: float = FUEL_CELL_OUTPUT_W,
+                  battery_efficiency: float = BATTERY_EFFICIENCY,
+                  soc_min: float = SOC_MIN,
+                  soc_max: float = SOC_MAX,
+                  start_penalty_l: float = START_PENALTY_L,
+                  soc_levels: int = SOC_LEVELS,
+                  tank_liters: Optional[float] = None) -> Dict:
+    """
+    Minimum-methanol fuel cell schedule for a load profile [W per step].
+
+    Returns the same dict as soc_simulation.simulate_soc ('soc', 'fc_on', 'load_w',
+    'unserved_wh', 'kpis'); kpis additionally has 'objective_l' (the minimised cost).
+    """
+    load_w = np.asarray(load_w, dtype=float)
+    n = load_w.size
+    dt_h = step_min / 60
+    fc_cost_l = fuel_cell_output_w * dt_h / 1000 * METHANOL_CONSUMPTION_PER_KWH
+    level = np.linspace(soc_min, soc_max, soc_levels)
+    start = float(np.clip(initial_soc, soc_min, soc_max))
+    recharge_l_per_soc = battery_capacity_wh / battery_efficiency / 1000 * METHANOL_CONSUMPTION_PER_KWH
+
+    # value[t, mode, level]: least cost from step t on, with the fuel cell in `mode` during step t - 1
+    value = np.empty((n + 1, 2, soc_levels))
+    value[n] = np.maximum(start - level, 0.0) * recharge_l_per_soc
+    for t in range(n - 1, -1, -1):
+        (nxt_off, cost_off, _, _), (nxt_on, cost_on, blocked_on, _) = _step_options(
+            level, load_w[t], dt_h, battery_capacity_wh, fuel_cell_output_w, battery_efficiency,
+            soc_min, soc_max, fc_cost_l)
+        stay_off = cost_off + np.interp(nxt_off, level, value[t + 1, 0])
+        run = np.where(blocked_on, _BLOCKED, cost_on + np.interp(nxt_on, level, value[t + 1, 1]))
+        value[t, 0] = np.minimum(stay_off, run + start_penalty_l)
+        value[t, 1] = np.minimum(stay_off, run)
+
+    # roll the schedule forward from the actual SOC
+    soc = np.empty(n)
+    fc_on = np.zeros(n, dtype=bool)
+    unserved_wh = np.zeros(n)
+    s, mode = np.array([start]), 0
+    for t in range(n):
+        options = _step_options(s, load_w[t], dt_h, battery_capacity_wh, fuel_cell_output_w,
+                                battery_efficiency, soc_min, soc_max, fc_cost_l)
+        totals = []
+        for on, (nxt, cost, blocked, _) in enumerate(options):
+            total = cost[0] + np.interp(nxt[0], level, value[t + 1, on]) + (start_penalty_l if on and not mode else 0.0)
+            totals.append(_BLOCKED if blocked[0] else total)
+        mode = int(totals[1] < totals[0])
+        nxt, _, _, unserved_kwh = options[mode]
+        fc_on[t] = bool(mode)
+        soc[t] = s[0] = nxt[0]
+        unserved_wh[t] = unserved_kwh[0] * 1000
+
+    kpis = trajectory_kpis(load_w, soc, fc_on, unserved_wh, step_min, fuel_cell_output_w, start, tank_liters)
+    kpis["objective_l"] = float(np.interp(start, level, value[0, 0]))
+    return {"soc": soc, "fc_on": fc_on, "load_w": load_w, "unserved_wh": unserved_wh, "kpis": kpis}
+
+
+def recharge_methanol_l(initial_soc: float, final_soc: float,
+                        battery_capacity_wh: float = BATTERY_CAPACITY_WH,
+                        battery_efficiency: float = BATTERY_EFFICIENCY) -> float:
+    """Methanol to bring the battery from final_soc back up to initial_soc (0 if it ended higher)."""
+    recharge_l_per_soc = battery_capacity_wh / battery_efficiency / 1000 * METHANOL_CONSUMPTION_PER_KWH
+    return max(initial_soc - final_soc, 0.0) * recharge_l_per_soc
+
+
+def compare_with_hysteresis(appliances: List[Dict], days: int = 7, step_min: float = DEFAULT_STEP_MIN,
+                            initial_soc: float = SOC_MAX, tank_liters: Optional[float] = None) -> Dict:
+    """
+    The optimal plan and the soc_simulation hysteresis over the same load, both from
+    initial_soc (clipped to [SOC_MIN, SOC_MAX]). Returns {'plan', 'rule', 'initial_soc'};
+    both kpis get 'methanol_adjusted_l': methanol used plus recharge_methanol_l of the
+    SOC deficit at the end, so the two are compared at the same terminal condition.
+    """
+    start = float(np.clip(initial_soc, SOC_MIN, SOC_MAX))
+    load_w = load_profile_from_appliances(appliances, days, step_min)
+    plan = plan_dispatch(load_w, step_min=step_min, initial_soc=start, tank_liters=tank_liters)
+    rule = simulate_soc(load_w, step_min=step_min, initial_soc=start, tank_liters=tank_liters)
+    for result in (plan, rule):
+        kpis = result["kpis"]
+        kpis["methanol_adjusted_l"] = kpis["methanol_total_l"] + recharge_methanol_l(start, kpis["final_soc"])
+    return {"plan": plan, "rule": rule, "initial_soc": start}
+
+
+def plan_appliances(appliances: List[Dict], days: int = 7, step_min: float = DEFAULT_STEP_MIN, **kwargs) -> Dict:
+    """Shortcut: build the load profile from an appliance list and plan the dispatch."""
+    return plan_dispatch(load_profile_from_appliances(appliances, days, step_min), step_min=step_min, **kwargs)
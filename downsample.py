@@ -0,0 +1,96 @@
+# downsample.py
+# Reduce long SOC/power traces to what a chart can actually show before they are
+# handed to st.plotly_chart. A chart W pixels wide cannot show more than ~W points
+# per trace, so sending a month of per-minute samples (or years of telemetry) only
+# costs serialisation and browser time.
+#   - lttb: largest-triangle-three-buckets, keeps the visual shape of smooth traces (SOC)
+#   - minmax: the min and max of every pixel column, keeps spikes of noisy traces (power)
+# downsample_range() cuts the visible window first and caches the result per
+# (trace, window, width), so moving a range slider back and forth stays fast.
+from typing import Optional, Tuple
+
+import numpy as np
+
+from result_cache import default_cache, stable_hash
+
+DEFAULT_WIDTH_PX = 1200
+METHODS = ("lttb", "minmax")
+
+
+def _as_float(x: np.ndarray) -> np.ndarray:
+    x = np.asarray(x)
+    if x.dtype.kind == "M":
+        x = x.astype("datetime64[ns]", copy=False).view("int64")
+    return x.astype(float, copy=False)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices of the n_out points LTTB keeps (first and last point always included)."""
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x, y = _as_float(x), np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)  # n_out - 2 buckets between the end points
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # the third triangle corner is the average of the next bucket (or the last point)
+        nxt_lo, nxt_hi = (hi, edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        cx, cy = x[nxt_lo:nxt_hi].mean(), y[nxt_lo:nxt_hi].mean()
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+def minmax_indices(y: np.ndarray, n_buckets: int) -> np.ndarray:
+    """Indices of the min and the max of each of n_buckets equal buckets, in order."""
+    n = len(y)
+    if 2 * n_buckets >= n:
+        return np.arange(n)
+    size = -(-n // n_buckets)
+    padded = np.asarray(y, dtype=float)
+    padded = np.concatenate([padded, np.full(size * n_buckets - n, padded[-1])]).reshape(n_buckets, size)
+    base = np.arange(n_buckets) * size
+    idx = np.concatenate([base + np.argmin(padded, axis=1), base + np.argmax(padded, axis=1), [0, n - 1]])
+    return np.unique(np.minimum(idx, n - 1))
+
+
+def downsample(x: np.ndarray, y: np.ndarray, width_px: int = DEFAULT_WIDTH_PX,
+               method: str = "lttb") -> Tuple[np.ndarray, np.ndarray]:
+    """(x, y) reduced to about one point (lttb) or two points (minmax) per pixel."""
+    if method == "lttb":
+        idx = lttb_indices(x, y, width_px)
+    elif method == "minmax":
+        idx = minmax_indices(y, width_px)
+    else:
+        raise ValueError(f"unknown downsampling method {method!r}, expected one of {METHODS}")
+    return np.asarray(x)[idx], np.asarray(y)[idx]
+
+
+def visible_slice(x: np.ndarray, start=None, end=None) -> slice:
+    """Index range of the sorted x values within [start, end]."""
+    lo = 0 if start is None else int(np.searchsorted(x, start, side="left"))
+    hi = len(x) if end is None else int(np.searchsorted(x, end, side="right"))
+    return slice(lo, hi)
+
+
+def downsample_range(trace_key: str, x: np.ndarray, y: np.ndarray, start=None, end=None,
+                     width_px: int = DEFAULT_WIDTH_PX, method: str = "lttb",
+                     cache=None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Downsampled points of the visible window [start, end] of a trace.
+
+    trace_key must identify the data (e.g. the cache key of the simulation it came
+    from); together with the window, width and method it keys the cached result.
+    """
+    cache = cache or default_cache()
+    key = stable_hash("downsample", trace_key, start, end, width_px, method)
+
+    def compute():
+        window = visible_slice(x, start, end)
+        return downsample(x[window], y[window], width_px, method)
+
+    return cache.get_or_compute(key, compute)
@@ -0,0 +1,78 @@
+# gauge_render.py
+# Off-thread PNG rendering of Plotly figures for the PDF reports.
+# kaleido starts a Chromium process per scope, so one scope is created per worker
+# thread and reused for every image. Rendered PNGs are memoized in the result cache,
+# keyed by the figure JSON (gauge value, range, steps, size), so a gauge that was
+# already drawn once is never sent to kaleido again.
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+from result_cache import default_cache, stable_hash
+
+RENDER_WORKERS = 1  # one kaleido process is enough for two gauges per report
+
+_local = threading.local()
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _scope():
+    # kaleido scopes are not thread safe, so every worker thread owns one
+    if getattr(_local, "scope", None) is None:
+        import plotly
+        from kaleido.scopes.plotly import PlotlyScope
+        # same bundled plotly.js plotly.io uses; no MathJax, the gauges have no LaTeX
+        plotlyjs = os.path.join(os.path.dirname(plotly.__file__), "package_data", "plotly.min.js")
+        _local.scope = PlotlyScope(plotlyjs=plotlyjs, mathjax=False)
+    return _local.scope
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=RENDER_WORKERS, thread_name_prefix="gauge-render")
+        return _pool
+
+
+def _render(fig_json: dict, width: Optional[int], height: Optional[int], scale: Optional[float]) -> bytes:
+    key = stable_hash("png", fig_json, width, height, scale)
+    return default_cache().get_or_compute(
+        key, lambda: _scope().transform(fig_json, format="png", width=width, height=height, scale=scale))
+
+
+def render_png_async(fig, width: Optional[int] = None, height: Optional[int] = None,
+                     scale: Optional[float] = None) -> Future:
+    """Start rendering a Plotly figure to PNG bytes on the worker pool."""
+    return _executor().submit(_render, fig.to_plotly_json(), width, height, scale)
+
+
+def render_png(fig, width: Optional[int] = None, height: Optional[int] = None,
+               scale: Optional[float] = None) -> bytes:
+    return render_png_async(fig, width, height, scale).result()
+
+
+@contextmanager
+def png_files(*images: bytes) -> Iterator[List[str]]:
+    """
+    Write PNG bytes to temporary files for APIs that only take paths (FPDF.image)
+    and remove them again when the block ends.
+    """
+    paths = []
+    try:
+        for data in images:
+            fd, path = tempfile.mkstemp(suffix=".png")
+            paths.append(path)
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+        yield paths
+    finally:
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,96 @@
+# kpi_batch.py
+# NumPy-backed batch versions of the kpi_calculator_version2 functions.
+# Every function takes arrays of scenarios and returns one value per scenario,
+# with the same special cases (inf / 0.0) as the scalar functions, element-wise.
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from kpi_calculator_version2 import (
+    BATTERY_CAPACITY_WH,
+    BATTERY_EFFICIENCY,
+    FUEL_CELL_OUTPUT_W,
+    METHANOL_CONSUMPTION_PER_KWH,
+    METHANOL_ENERGY_DENSITY,
+)
+
+
+def appliances_to_arrays(appliances: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+    """Split a list of appliance dicts into (power, hours) arrays."""
+    power = np.array([app['power'] for app in appliances], dtype=float)
+    hours = np.array([app['hours'] for app in appliances], dtype=float)
+    return power, hours
+
+
+def calculate_daily_energy_demand_batch(power, hours) -> np.ndarray:
+    """Σ(power × hours) over the last axis. Shapes broadcast: (devices,) or (scenarios, devices)."""
+    return np.sum(np.asarray(power, dtype=float) * np.asarray(hours, dtype=float), axis=-1)  # Wh
+
+
+def calculate_methanol_consumption_batch(energy_wh, consumption_per_kwh=METHANOL_CONSUMPTION_PER_KWH) -> np.ndarray:
+    return (np.asarray(energy_wh, dtype=float) / 1000) * consumption_per_kwh
+
+
+def calculate_tank_autonomy_batch(liters_available, daily_consumption_l) -> np.ndarray:
+    liters, daily = np.broadcast_arrays(np.asarray(liters_available, dtype=float),
+                                        np.asarray(daily_consumption_l, dtype=float))
+    out = np.full(liters.shape, np.inf)
+    np.divide(liters, daily, out=out, where=daily != 0)
+    return out
+
+
+def battery_discharge_time_batch(energy_wh, battery_capacity_wh=BATTERY_CAPACITY_WH) -> np.ndarray:
+    energy, capacity = np.broadcast_arrays(np.asarray(energy_wh, dtype=float),
+                                           np.asarray(battery_capacity_wh, dtype=float))
+    out = np.full(energy.shape, np.inf)
+    np.divide(capacity, energy, out=out, where=energy != 0)
+    np.multiply(out, 24, out=out, where=energy != 0)  # convert to hours assuming daily energy demand
+    return out
+
+
+def global_system_efficiency_batch(battery_energy_wh, fuel_cell_energy_wh, methanol_used_l,
+                                   battery_efficiency=BATTERY_EFFICIENCY) -> np.ndarray:
+    fc_energy, methanol = np.broadcast_arrays(np.asarray(fuel_cell_energy_wh, dtype=float),
+                                              np.asarray(methanol_used_l, dtype=float))
+    net_energy_kwh = (fc_energy / 1000) * battery_efficiency
+    chemical_energy_kwh = methanol * METHANOL_ENERGY_DENSITY
+    out = np.zeros(np.broadcast(net_energy_kwh, chemical_energy_kwh).shape)
+    np.divide(net_energy_kwh, chemical_energy_kwh, out=out, where=methanol != 0)
+    return out
+
+
+def battery_charge_time_needed_batch(energy_to_charge_wh, fuel_cell_output_w=FUEL_CELL_OUTPUT_W) -> np.ndarray:
+    return np.asarray(energy_to_charge_wh, dtype=float) / fuel_cell_output_w
+
+
+def calculate_kpis_batch(power, hours, tank_liters,
+                         battery_capacity_wh=BATTERY_CAPACITY_WH,
+                         consumption_per_kwh=METHANOL_CONSUMPTION_PER_KWH,
+                         battery_efficiency=BATTERY_EFFICIENCY,
+                         fuel_cell_output_w=FUEL_CELL_OUTPUT_W) -> Dict[str, np.ndarray]:
+    """
+    All dashboard KPIs for a batch of scenarios in one call.
+
+    power/hours are (scenarios, devices) matrices (or anything that broadcasts to
+    them), tank_liters is a scalar or one value per scenario. The optional
+    constants may also be per-scenario arrays.
+    """
+    daily_demand_wh = calculate_daily_energy_demand_batch(power, hours)
+    methanol_per_day = calculate_methanol_consumption_batch(daily_demand_wh, consumption_per_kwh)
+    autonomy_days = calculate_tank_autonomy_batch(tank_liters, methanol_per_day)
+    battery_hours = battery_discharge_time_batch(daily_demand_wh, battery_capacity_wh)
+    battery_energy_wh = np.minimum(battery_capacity_wh, daily_demand_wh)
+    fuel_cell_energy_wh = np.maximum(0, daily_demand_wh - battery_capacity_wh)
+    efficiency = global_system_efficiency_batch(battery_energy_wh, fuel_cell_energy_wh, methanol_per_day,
+                                                battery_efficiency)
+    charge_time = battery_charge_time_needed_batch(fuel_cell_energy_wh, fuel_cell_output_w)
+    return {
+        "daily_demand_wh": daily_demand_wh,
+        "methanol_per_day": methanol_per_day,
+        "autonomy_days": autonomy_days,
+        "battery_hours": battery_hours,
+        "battery_energy_wh": battery_energy_wh,
+        "fuel_cell_energy_wh": fuel_cell_energy_wh,
+        "efficiency": efficiency,
+        "charge_time": charge_time,
+    }
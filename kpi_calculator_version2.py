@@ -22,10 +22,11 @@ def calculate_tank_autonomy(liters_available: float, daily_consumption_l: float)
         return float('inf')
     return liters_available / daily_consumption_l
 
-def battery_discharge_time(energy_wh: float) -> float:
+def battery_discharge_time(energy_wh: float, battery_capacity_wh: float = BATTERY_CAPACITY_WH) -> float:
+    """battery_capacity_wh: e.g. the faded capacity from battery_degradation."""
     if energy_wh == 0:
         return float('inf')
-    return BATTERY_CAPACITY_WH / energy_wh * 24  # convert to hours assuming daily energy demand
+    return battery_capacity_wh / energy_wh * 24  # convert to hours assuming daily energy demand
 
 def fuel_cell_efficiency(useful_energy_kwh: float, methanol_used_l: float) -> float:
     if methanol_used_l == 0:
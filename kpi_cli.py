@@ -0,0 +1,159 @@
+# kpi_cli.py
+# Headless KPI computation and report export, without starting Streamlit.
+#
+# Input is one of
+#   - a scenario file: JSON list of {"name", "appliances", "tank_liters"} (as for report_pipeline)
+#   - an appliance file: JSON list of {"name", "power", "hours"} dicts, with --tank-liters
+#   - a grid: JSON {"profiles": ..., "tank_liters": [...], "hours": {...}} (as for scenario_sweep)
+#   - --scenario NAME (repeatable, or "all") from the scenario registry, with --tank-liters
+# Scenarios are computed with the kpi_calculator_version2 functions (report_pipeline.compute_kpis),
+# grids with their vectorized kpi_batch versions. The table is written as JSON, CSV or
+# Parquet (picked from the --output extension unless --format is given); --pdf also
+# renders the PDF reports. NumPy, pandas, Plotly and fpdf are only imported by the
+# paths that need them, so computing a JSON/CSV table starts in a few tens of ms.
+#
+# Usage: python kpi_cli.py scenarios.json [-o kpis.csv] [--pdf reports/] [--workers N]
+#        python kpi_cli.py appliances.json --tank-liters 10
+#        python kpi_cli.py --scenario "Peak 1000 W" --scenario Winter --tank-liters 20 -o kpis.parquet
+#        python kpi_cli.py sweep_grid_example.json -o grid.parquet
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+from typing import Dict, List, Optional
+
+from report_pipeline import compute_kpis
+
+FORMATS = ("json", "csv", "parquet")
+DEFAULT_TANK_LITERS = 10.0
+
+
+def load_input(path: str, tank_liters: Optional[float] = None):
+    """('grid', grid dict) or ('scenarios', [{'name', 'appliances', 'tank_liters'}]) for a JSON file."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        if "profiles" not in data:
+            raise ValueError(f"{path}: a grid needs a 'profiles' entry")
+        return "grid", data
+    if data and "appliances" not in data[0]:  # a bare appliance list
+        name = os.path.splitext(os.path.basename(path))[0]
+        data = [{"name": name, "appliances": data}]
+    scenarios = []
+    for scenario in data:
+        tank = scenario.get("tank_liters", tank_liters)
+        if tank is None:
+            raise ValueError(f"{path}: scenario {scenario['name']!r} has no tank_liters, pass --tank-liters")
+        scenarios.append(dict(scenario, tank_liters=tank))
+    return "scenarios", scenarios
+
+
+def registry_scenarios(names: List[str], tank_liters: float) -> List[Dict]:
+    from scenario_registry import default_registry
+
+    registry = default_registry()
+    if "all" in names:
+        names = registry.names
+    return [{"name": name, "appliances": registry.profile(name), "tank_liters": tank_liters} for name in names]
+
+
+def scenario_table(scenarios: List[Dict]) -> Dict[str, list]:
+    """One row per scenario: name, tank_liters and the dashboard KPIs, as columns."""
+    rows = [dict(name=s["name"], tank_liters=s["tank_liters"], **compute_kpis(s["appliances"], s["tank_liters"]))
+            for s in scenarios]
+    return {key: [row[key] for row in rows] for key in (rows[0] if rows else ["name", "tank_liters"])}
+
+
+def grid_table(grid: Dict) -> Dict[str, list]:
+    """Every grid scenario, columns as written by scenario_sweep."""
+    from scenario_sweep import compile_grid, evaluate_range
+
+    compiled = compile_grid(grid)
+    columns = evaluate_range(compiled, 0, compiled["size"])
+    columns["profile"] = [compiled["profile_names"][p] for p in columns["profile"]]
+    return {key: list(values) if isinstance(values, list) else values.tolist() for key, values in columns.items()}
+
+
+def _json_value(value):
+    """Infinite/NaN KPIs (e.g. autonomy with no demand) as null; bare Infinity is not JSON."""
+    return None if isinstance(value, float) and not math.isfinite(value) else value
+
+
+def write_table(columns: Dict[str, list], out: str, fmt: str) -> None:
+    """Write the columns to `out` ('-' for stdout) as json (list of records), csv or parquet."""
+    keys = list(columns)
+    n = len(columns[keys[0]]) if keys else 0
+    if fmt == "parquet":
+        import pandas as pd
+
+        target = sys.stdout.buffer if out == "-" else out
+        pd.DataFrame(columns).to_parquet(target, index=False)
+        return
+    f = sys.stdout if out == "-" else open(out, "w", encoding="utf-8", newline="")
+    try:
+        if fmt == "json":
+            json.dump([{k: _json_value(columns[k][i]) for k in keys} for i in range(n)], f, indent=2,
+                      allow_nan=False)
+            f.write("\n")
+        else:
+            writer = csv.writer(f)
+            writer.writerow(keys)
+            writer.writerows(zip(*(columns[k] for k in keys)))
+    finally:
+        if f is not sys.stdout:
+            f.close()
+
+
+def _format_for(out: str, fmt: Optional[str]) -> str:
+    if fmt:
+        return fmt
+    ext = os.path.splitext(out)[1].lstrip(".").lower()
+    return ext if ext in FORMATS else "json"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compute the dashboard KPIs and export tables or PDF reports.")
+    parser.add_argument("input", nargs="?", help="scenario file, appliance file or grid (JSON)")
+    parser.add_argument("--scenario", action="append", default=[],
+                        help="scenario from the registry (repeatable, 'all' for every profile)")
+    parser.add_argument("--tank-liters", type=float, default=None,
+                        help=f"tank size where the input has none (default for --scenario: {DEFAULT_TANK_LITERS:g})")
+    parser.add_argument("-o", "--output", default="-", help="output file, - for stdout (default)")
+    parser.add_argument("--format", choices=FORMATS, default=None, help="default: from the --output extension, else json")
+    parser.add_argument("--pdf", default=None, help="also render PDF reports into this directory or .zip file")
+    parser.add_argument("--workers", type=int, default=None, help="PDF worker processes (default: all cores)")
+    args = parser.parse_args(argv)
+
+    if not args.input and not args.scenario:
+        parser.error("give an input file or at least one --scenario")
+    scenarios: List[Dict] = []
+    grid = None
+    if args.input:
+        try:
+            kind, data = load_input(args.input, args.tank_liters)
+        except ValueError as e:
+            parser.error(str(e))
+        if kind == "grid":
+            grid = data
+        else:
+            scenarios = data
+    if args.scenario:
+        tank = DEFAULT_TANK_LITERS if args.tank_liters is None else args.tank_liters
+        scenarios += registry_scenarios(args.scenario, tank)
+    if grid is not None and (scenarios or args.pdf):
+        parser.error("a grid cannot be combined with --scenario or --pdf")
+
+    columns = grid_table(grid) if grid is not None else scenario_table(scenarios)
+    write_table(columns, args.output, _format_for(args.output, args.format))
+    if args.pdf:
+        from report_pipeline import generate_reports
+
+        summary = generate_reports(scenarios, args.pdf, args.workers)
+        print(f"{summary['reports']} reports in {summary['seconds']:.2f} s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
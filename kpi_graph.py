@@ -0,0 +1,107 @@
+# kpi_graph.py
+# The dashboard KPIs as a small dependency graph with memoized nodes.
+#
+#   tank_liters ─────────────────────────────┐
+#   appliances ─> daily_demand_wh ─> methanol_per_day ─> autonomy_days
+#                        │                  └──────────┐
+#                        ├─> battery_energy_wh ───> efficiency_pct
+#                        ├─> fuel_cell_energy_wh ─┘ └> charge_time
+#                        └─> battery_hours
+#
+# A node is recomputed only when the value of one of its inputs changed, so a new
+# tank size recomputes autonomy_days and nothing else, and a node that comes out
+# unchanged stops the update from spreading further. daily_demand_wh is kept as a
+# running sum: changing one appliance subtracts its old power × hours and adds the
+# new one instead of summing every device again. Appliances are matched by position,
+# so devices with the same name stay separate; a list with other devices (added,
+# removed or reordered) and a total near zero are summed again from scratch.
+#
+# One graph per Streamlit session (st.session_state) lives across reruns:
+#   graph = st.session_state.setdefault("kpi_graph", KpiGraph())
+#   kpis = graph.update(custom_appliances, tank_liters)   # same keys as compute_kpis
+from typing import Callable, Dict, List, Tuple
+
+from kpi_calculator_version2 import (
+    BATTERY_CAPACITY_WH,
+    battery_charge_time_needed,
+    battery_discharge_time,
+    calculate_daily_energy_demand,
+    calculate_methanol_consumption,
+    calculate_tank_autonomy,
+    global_system_efficiency,
+)
+
+INPUTS = ("daily_demand_wh", "tank_liters")
+KPI_KEYS = ("daily_demand_wh", "methanol_per_day", "autonomy_days", "battery_hours", "efficiency_pct", "charge_time")
+RESUM_EVERY = 1000  # re-sum the demand from scratch now and then so float drift cannot build up
+RESUM_BELOW_WH = 1e-6  # a running total this close to 0 may be float residue: re-sum it exactly
+
+# (node, inputs, function of the input values), in dependency order
+KPI_NODES: List[Tuple[str, Tuple[str, ...], Callable]] = [
+    ("methanol_per_day", ("daily_demand_wh",), calculate_methanol_consumption),
+    ("autonomy_days", ("tank_liters", "methanol_per_day"), calculate_tank_autonomy),
+    ("battery_hours", ("daily_demand_wh",), battery_discharge_time),
+    ("battery_energy_wh", ("daily_demand_wh",), lambda demand: min(BATTERY_CAPACITY_WH, demand)),
+    # the fuel cell covers exactly the battery deficit, so this is also the energy to recharge
+    ("fuel_cell_energy_wh", ("daily_demand_wh",), lambda demand: max(0, demand - BATTERY_CAPACITY_WH)),
+    ("efficiency_pct", ("battery_energy_wh", "fuel_cell_energy_wh", "methanol_per_day"), global_system_efficiency),
+    ("charge_time", ("fuel_cell_energy_wh",), battery_charge_time_needed),
+]
+
+
+class KpiGraph:
+    def __init__(self, nodes: List[Tuple[str, Tuple[str, ...], Callable]] = KPI_NODES):
+        self.nodes = {name: (deps, fn) for name, deps, fn in nodes}
+        self.values: Dict[str, object] = {"daily_demand_wh": 0.0, "tank_liters": 0.0}
+        self._seen: Dict[str, tuple] = {}  # input values each node was last computed from
+        self._contributions: List[float] = []  # power × hours per appliance position
+        self._appliances: List[Dict] = []
+        self._updates = 0
+        self.recomputed: Dict[str, int] = {name: 0 for name in self.nodes}
+
+    def set_input(self, name: str, value) -> None:
+        if name not in INPUTS:
+            raise KeyError(f"{name} is not a graph input, expected one of {INPUTS}")
+        self.values[name] = value
+
+    def set_appliances(self, appliances: List[Dict]) -> int:
+        """Apply the difference to the previous appliance list; returns how many appliances changed."""
+        previous = self._appliances
+        structural = [app["name"] for app in appliances] != [app["name"] for app in previous]
+        changed = [i for i, app in enumerate(appliances) if structural or app != previous[i]]
+        if structural:
+            changed += range(len(appliances), len(previous))  # removed devices changed too
+        demand = self.values["daily_demand_wh"]
+        if not structural:
+            for i in changed:
+                contribution = appliances[i]["power"] * appliances[i]["hours"]
+                demand += contribution - self._contributions[i]
+                self._contributions[i] = contribution
+        self._updates += len(changed)
+        if structural or self._updates >= RESUM_EVERY or abs(demand) < RESUM_BELOW_WH:
+            self._contributions = [app["power"] * app["hours"] for app in appliances]
+            demand = calculate_daily_energy_demand(appliances)
+            self._updates = 0
+        self._appliances = [dict(app) for app in appliances]
+        if changed:
+            self.values["daily_demand_wh"] = demand
+        return len(changed)
+
+    def value(self, name: str):
+        if name in INPUTS:
+            return self.values[name]
+        deps, fn = self.nodes[name]
+        args = tuple(self.value(dep) for dep in deps)
+        if self._seen.get(name) != args:
+            self.values[name] = fn(*args)
+            self._seen[name] = args
+            self.recomputed[name] += 1
+        return self.values[name]
+
+    def kpis(self) -> Dict:
+        return {key: self.value(key) for key in KPI_KEYS}
+
+    def update(self, appliances: List[Dict], tank_liters: float) -> Dict:
+        self.set_appliances(appliances)
+        self.set_input("tank_liters", tank_liters)
+        return self.kpis()
@@ -0,0 +1,230 @@
+# load_generator.py
+# Synthetic day-by-day load profiles from per-appliance usage distributions.
+# The scenario profiles describe one typical day; this draws many different days from them:
+#   - daily on-time:  normal around 'hours' with sd = 'hours_sd' × hours (default
+#                     monte_carlo.HOURS_REL_SD), clipped to 0..24 h; always-on devices stay on
+#   - schedule shift: the device's windows move by normal(0, 'start_sd_h') hours (default START_SD_H)
+#   - use:            the device is used at all on a day with probability 'use_probability' (default 1)
+# Daily on-times of different devices are correlated through a Gaussian copula, e.g.
+# longer evening lighting goes with longer heater use on cold days (DEFAULT_CORRELATIONS;
+# pairs whose devices are not in the list are ignored). The schedules themselves
+# (windows, duty cycles) come from load_model.
+#
+# generate_profiles() is a generator: it yields the profiles batch by batch as dense
+# (days, steps) arrays, so month- or year-long fleet runs never hold all days at once.
+# Each batch draws from its own child of `seed`, so a run is reproducible for the
+# same seed and batch_days. The batches feed kpi_batch directly (profile_kpis) and
+# the time-step SOC simulation (simulate_stream carries the SOC from batch to batch).
+#
+# Usage: python load_generator.py --scenario Winter --days 3650 [--batch-days 365] [--simulate]
+#        python load_generator.py appliances.json --days 30 --output profiles.npy
+#        python load_generator.py --scenario Winter --days 60 --check
+import argparse
+import json
+import sys
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from kpi_batch import calculate_kpis_batch
+from load_model import device_curve
+from monte_carlo import HOURS_REL_SD
+from soc_simulation import MINUTES_PER_DAY, simulate_soc
+
+START_SD_H = 0.5
+DEFAULT_BATCH_DAYS = 250
+# (device, device, correlation of their daily on-times)
+DEFAULT_CORRELATIONS: List[Tuple[str, str, float]] = [
+    ("Fan Heater (12 V)", "Led Lighting (12 V)", 0.7),
+    ("Bed warmer (12 V)", "Led Lighting (12 V)", 0.6),
+    ("Fan Heater (12 V)", "Bed warmer (12 V)", 0.5),
+    ("Diesel Heating Controller", "Lights", 0.7),
+]
+
+
+def correlation_matrix(appliances: List[Dict], correlations: Sequence[Tuple[str, str, float]]) -> np.ndarray:
+    """Device × device correlation of the daily on-times, made positive semi-definite if needed."""
+    index = {app["name"]: i for i, app in enumerate(appliances)}
+    corr = np.eye(len(appliances))
+    for a, b, rho in correlations:
+        if a in index and b in index:
+            corr[index[a], index[b]] = corr[index[b], index[a]] = rho
+    values, vectors = np.linalg.eigh(corr)
+    if values.min() < 0:
+        corr = vectors @ np.diag(np.maximum(values, 1e-9)) @ vectors.T
+        d = np.sqrt(np.diag(corr))
+        corr = corr / d[:, None] / d[None, :]
+    return corr
+
+
+def sample_usage(appliances: List[Dict], days: int, rng: np.random.Generator,
+                 corr: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Daily on-time [h] and schedule shift [min] of every device, each shape (days, devices)."""
+    n = len(appliances)
+    z = rng.standard_normal((days, n))
+    if corr is not None and n > 1:
+        z = z @ np.linalg.cholesky(corr + 1e-12 * np.eye(n)).T
+    hours = np.array([app["hours"] for app in appliances], dtype=float)
+    rel_sd = np.array([0.0 if app["hours"] >= 24 else app.get("hours_sd", HOURS_REL_SD) for app in appliances])
+    daily_hours = np.clip(hours * (1 + rel_sd * z), 0.0, 24.0)
+    used = rng.random((days, n)) < np.array([app.get("use_probability", 1.0) for app in appliances])
+    shift_sd = np.array([0.0 if app["hours"] >= 24 else app.get("start_sd_h", START_SD_H) for app in appliances])
+    shift_min = rng.standard_normal((days, n)) * shift_sd * 60
+    return np.where(used, daily_hours, 0.0), shift_min
+
+
+def generate_profiles(appliances: List[Dict],
+                      days: int,
+                      batch_days: int = DEFAULT_BATCH_DAYS,
+                      step_min: float = 1.0,
+                      seed: int = 0,
+                      start_weekday: int = 0,
+                      correlations: Sequence[Tuple[str, str, float]] = DEFAULT_CORRELATIONS,
+                      dtype=np.float64) -> Iterator[np.ndarray]:
+    """
+    Yield synthetic load profiles [W] as (batch, steps_per_day) arrays, `days` in total.
+
+    step_min must divide a day into whole minutes (1, 5, 15, ...); each step holds
+    the mean power over its minutes, so the energy of every day is exact.
+    """
+    per_step = int(round(step_min))
+    if per_step < 1 or MINUTES_PER_DAY % per_step:
+        raise ValueError(f"step_min must divide {MINUTES_PER_DAY} minutes, got {step_min}")
+    power = np.array([app["power"] for app in appliances], dtype=float)
+    corr = correlation_matrix(appliances, correlations)
+    sizes = [min(batch_days, days - start) for start in range(0, days, batch_days)]
+    for b, (n, child) in enumerate(zip(sizes, np.random.SeedSequence(seed).spawn(len(sizes)))):
+        hours, shift_min = sample_usage(appliances, n, np.random.default_rng(child), corr)
+        weekday = (start_weekday + b * batch_days) % 7
+        load = np.zeros((n, MINUTES_PER_DAY))
+        for d, app in enumerate(appliances):
+            load += power[d] * device_curve(app, n, weekday, hours[:, d], shift_min[:, d])
+        if per_step > 1:
+            load = load.reshape(n, -1, per_step).mean(axis=2)
+        yield load.astype(dtype, copy=False)
+
+
+def profile_kpis(profiles: np.ndarray, step_min: float = 1.0, tank_liters: float = 10.0) -> Dict[str, np.ndarray]:
+    """kpi_batch KPIs of every day (row), plus its peak load 'peak_w'."""
+    # each step acts as one 'device' running step_min of the day
+    kpis = calculate_kpis_batch(profiles, step_min / 60, tank_liters)
+    kpis["peak_w"] = profiles.max(axis=1)
+    return kpis
+
+
+def simulate_stream(stream: Iterator[np.ndarray], step_min: float = 1.0, initial_soc: float = 1.0,
+                    counter=None, **kwargs) -> Dict:
+    """
+    Run soc_simulation.simulate_soc over consecutive batches, carrying the SOC and the
+    fuel cell's on/off state across, so the result does not depend on the batch size.
+
+    Returns totals over all days: 'days', 'demand_wh', 'methanol_l', 'fc_runtime_h',
+    'unserved_wh', 'min_soc', 'final_soc' and the per-day 'daily_demand_wh' array.
+    Each batch's SOC trajectory is also passed to counter.update() if a
+    battery_degradation.RainflowCounter is given.
+    """
+    totals = {"days": 0, "demand_wh": 0.0, "methanol_l": 0.0, "fc_runtime_h": 0.0, "unserved_wh": 0.0,
+              "min_soc": initial_soc}
+    daily = []
+    soc, fc_on = initial_soc, None
+    for profiles in stream:
+        result = simulate_soc(profiles.ravel(), step_min=step_min, initial_soc=soc, initial_fc_on=fc_on, **kwargs)
+        kpis = result["kpis"]
+        totals["days"] += len(profiles)
+        totals["demand_wh"] += kpis["daily_demand_wh"] * len(profiles)
+        totals["methanol_l"] += kpis["methanol_total_l"]
+        totals["fc_runtime_h"] += kpis["fc_runtime_h"]
+        totals["unserved_wh"] += kpis["unserved_wh"]
+        totals["min_soc"] = min(totals["min_soc"], kpis["min_soc"])
+        soc, fc_on = kpis["final_soc"], result["final_fc_on"]
+        if counter is not None:
+            counter.update(result["soc"])
+        daily.append(profiles.sum(axis=1) * step_min / 60)
+    totals["final_soc"] = soc
+    totals["daily_demand_wh"] = np.concatenate(daily) if daily else np.zeros(0)
+    return totals
+
+
+def check_batching(profiles: np.ndarray, step_min: float = 1.0, batch_days: Sequence[int] = (1, 7),
+                   **kwargs) -> Dict[int, float]:
+    """
+    Largest absolute difference of any simulate_stream total when the same (days, steps)
+    profiles are streamed in batches of each size instead of all at once (should be ~0).
+    """
+    def totals(size: int) -> Dict:
+        batches = (profiles[start:start + size] for start in range(0, len(profiles), size))
+        return simulate_stream(batches, step_min, **kwargs)
+
+    reference = totals(len(profiles))
+    diffs = {}
+    for size in batch_days:
+        result = totals(size)
+        diffs[size] = max(float(np.max(np.abs(np.asarray(result[key]) - np.asarray(reference[key]))))
+                          for key in reference)
+    return diffs
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate synthetic daily load profiles.")
+    parser.add_argument("appliances", nargs="?", help="JSON file with a list of appliance dicts")
+    parser.add_argument("--scenario", help="scenario from the registry instead of a file")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--batch-days", type=int, default=DEFAULT_BATCH_DAYS)
+    parser.add_argument("--step-min", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tank-liters", type=float, default=10.0)
+    parser.add_argument("--simulate", action="store_true", help="also run the SOC simulation over all days")
+    parser.add_argument("--output", help="write all profiles to this .npy file (days × steps)")
+    parser.add_argument("--check", action="store_true",
+                        help="check that the SOC simulation gives the same totals in batches of 1 and 7 days")
+    args = parser.parse_args(argv)
+
+    if args.scenario:
+        from scenario_registry import default_registry
+
+        appliances = default_registry().profile(args.scenario)
+    elif args.appliances:
+        with open(args.appliances, encoding="utf-8") as f:
+            appliances = json.load(f)
+    else:
+        parser.error("give an appliance file or --scenario")
+
+    stream = generate_profiles(appliances, args.days, args.batch_days, args.step_min, args.seed)
+    if args.check:
+        diffs = check_batching(np.concatenate(list(stream)), args.step_min)
+        for size, diff in diffs.items():
+            print(f"batches of {size} days: max difference {diff:.3g}")
+        return 0 if max(diffs.values()) < 1e-6 else 1
+    if args.simulate:
+        result = simulate_stream(stream, args.step_min)
+        demand = result.pop("daily_demand_wh")
+        result["daily_demand_wh_p10_p50_p90"] = np.percentile(demand, [10, 50, 90]).tolist()
+        json.dump(result, sys.stdout, indent=2)
+        print()
+        return 0
+
+    out = None
+    if args.output:
+        steps = int(MINUTES_PER_DAY // round(args.step_min))
+        out = np.lib.format.open_memmap(args.output, mode="w+", dtype=np.float64, shape=(args.days, steps))
+    demand, peak, row = [], [], 0
+    for profiles in stream:
+        kpis = profile_kpis(profiles, args.step_min, args.tank_liters)
+        demand.append(kpis["daily_demand_wh"])
+        peak.append(kpis["peak_w"])
+        if out is not None:
+            out[row:row + len(profiles)] = profiles
+        row += len(profiles)
+    if out is not None:
+        out.flush()
+    demand, peak = np.concatenate(demand), np.concatenate(peak)
+    summary = {"days": row,
+               "daily_demand_wh": dict(zip(("p10", "p50", "p90"), np.percentile(demand, [10, 50, 90]).tolist())),
+               "peak_w": dict(zip(("p10", "p50", "p90"), np.percentile(peak, [10, 50, 90]).tolist()))}
+    json.dump(summary, sys.stdout, indent=2)
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+# load_model.py
+# Minute-resolution appliance load curves with duty cycles and time windows.
+# Besides 'name', 'power' [W] and 'hours' (daily on-time, so the energy stays
+# power × hours as everywhere else) an appliance may have
+#   'windows':    [[start_h, end_h], ...] hours of the day it may run (wrapping past midnight);
+#                 default one window from 'start' (soc_simulation.DEFAULT_START_HOUR) round the clock
+#   'duty_cycle': share of each cycle it actually draws power, e.g. 0.33 for a cool box compressor
+#   'cycle_min':  length of one on/off cycle (default DEFAULT_CYCLE_MIN), 'phase_min' its offset
+#   'weekdays':   days it is used, 0 = Monday (default every day)
+# Each day the on-time is laid into the windows' on-phases from the start of the first
+# window onwards until 'hours' are used up, so the appliances overlap where they really would.
+#
+# The curves are built per device with array operations over all minutes of the
+# horizon (cumulative sums per day instead of a loop over minutes); a week for 20
+# devices takes a few ms. analyze_load() gives the coincident peak, the load-duration
+# curve and the peak current against the battery's MAX_BATTERY_CURRENT_A.
+#
+# Usage: python load_model.py appliances.json [--days 7]
+import argparse
+import json
+import sys
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from kpi_calculator_version2 import BATTERY_VOLTAGE
+from soc_simulation import DEFAULT_START_HOUR, MINUTES_PER_DAY
+
+MAX_BATTERY_CURRENT_A = 200.0  # peak discharge current of the Li 105
+DEFAULT_CYCLE_MIN = 30.0
+DEFAULT_DAYS = 7
+
+
+def _windows(app: Dict) -> List[List[float]]:
+    if "windows" in app:
+        return app["windows"]
+    start = app.get("start", DEFAULT_START_HOUR)
+    return [[start, start + 24]]
+
+
+def _used_days(app: Dict, days: int, start_weekday: int) -> np.ndarray:
+    weekday = (start_weekday + np.arange(days)) % 7
+    return np.isin(weekday, app.get("weekdays", range(7)))
+
+
+def availability(app: Dict, days: int = DEFAULT_DAYS, start_weekday: int = 0) -> np.ndarray:
+    """Share of every minute (days, MINUTES_PER_DAY) in which the appliance may draw power."""
+    minute = np.arange(MINUTES_PER_DAY)
+    in_window = np.zeros(MINUTES_PER_DAY)
+    for start_h, end_h in _windows(app):
+        if end_h == start_h:  # [h, h] is empty, only [h, h + 24] is the whole day
+            continue
+        start = int(round(start_h * 60)) % MINUTES_PER_DAY
+        length = (end_h - start_h) % 24 * 60 or MINUTES_PER_DAY
+        in_window = np.maximum(in_window, np.clip(length - (minute - start) % MINUTES_PER_DAY, 0.0, 1.0))
+    duty = app.get("duty_cycle", 1.0)
+    on_phase = np.ones((days, MINUTES_PER_DAY))
+    if duty < 1.0:
+        cycle = app.get("cycle_min", DEFAULT_CYCLE_MIN)
+        phase = (np.arange(days * MINUTES_PER_DAY) - app.get("phase_min", 0.0)) % cycle
+        on_phase = np.clip(duty * cycle - phase, 0.0, 1.0).reshape(days, MINUTES_PER_DAY)
+    return in_window * on_phase * _used_days(app, days, start_weekday)[:, None]
+
+
+def device_curve(app: Dict, days: int = DEFAULT_DAYS, start_weekday: int = 0,
+                 hours: Optional[np.ndarray] = None, shift_min: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    On-share of one appliance per minute, shape (days, MINUTES_PER_DAY).
+
+    hours (default app['hours']) and shift_min (the whole schedule moved by this
+    many minutes) may be given per day, e.g. sampled by load_generator.
+    """
+    on_time_min = app["hours"] * 60 if hours is None else np.asarray(hours, dtype=float)[:, None] * 60
+    # a day is counted from the start of the first window, so on-time may run past midnight
+    anchor = int(round(_windows(app)[0][0] * 60)) % MINUTES_PER_DAY
+    avail = np.roll(availability(app, days, start_weekday), -anchor, axis=1)
+    # fill the first 'hours' of available minutes of each day: on = min(avail, what is left)
+    used_before = np.cumsum(avail, axis=1) - avail
+    curve = np.roll(np.clip(on_time_min - used_before, 0.0, avail), anchor, axis=1)
+    if shift_min is not None:
+        source = (np.arange(MINUTES_PER_DAY) - np.rint(shift_min).astype(int)[:, None]) % MINUTES_PER_DAY
+        curve = np.take_along_axis(curve, source, axis=1)
+    return curve
+
+
+def appliance_curves(appliances: List[Dict], days: int = DEFAULT_DAYS, start_weekday: int = 0) -> np.ndarray:
+    """On-share of every appliance per minute, shape (devices, days × MINUTES_PER_DAY)."""
+    curves = np.zeros((len(appliances), days * MINUTES_PER_DAY))
+    for d, app in enumerate(appliances):
+        curves[d] = device_curve(app, days, start_weekday).ravel()
+    return curves
+
+
+def analyze_load(appliances: List[Dict],
+                 days: int = DEFAULT_DAYS,
+                 step_min: float = 1.0,
+                 start_weekday: int = 0,
+                 battery_voltage: float = BATTERY_VOLTAGE,
+                 max_current_a: float = MAX_BATTERY_CURRENT_A) -> Dict:
+    """
+    Aggregate load curve and peak-load KPIs.
+
+    'load_w' is the mean power per step of step_min minutes (energy-exact). The peak
+    counts every device that runs at any time within a minute, so two devices that
+    meet within the same minute are taken as coincident. Returns 'load_w',
+    'duration_w' (the load sorted from highest to lowest, per minute), 'peak_w',
+    'peak_minute', 'peak_devices', 'peak_current_a', 'peak_current_share' (of
+    max_current_a), 'peak_coverage_pct', 'minutes_over_limit', 'energy_wh_per_day',
+    'unplaced_h' (on-time per device that did not fit its windows) and 'load_factor'.
+    """
+    power = np.array([app["power"] for app in appliances], dtype=float)
+    curves = appliance_curves(appliances, days, start_weekday)
+    minute_w = power @ curves
+    running_w = power @ (curves > 0)
+    peak_minute = int(np.argmax(running_w)) if running_w.size else 0
+    peak_w = float(running_w[peak_minute]) if running_w.size else 0.0
+    limit_w = max_current_a * battery_voltage
+
+    per_step = int(round(step_min))
+    if per_step > 1 and minute_w.size % per_step == 0:
+        load_w = minute_w.reshape(-1, per_step).mean(axis=1)
+    else:
+        load_w = minute_w
+    placed_h = curves.reshape(len(appliances), days, MINUTES_PER_DAY).sum(axis=2) / 60
+    unplaced_h = {}
+    for d, app in enumerate(appliances):
+        used = _used_days(app, days, start_weekday)
+        unplaced_h[app["name"]] = float(np.maximum(app["hours"] - placed_h[d, used], 0.0).mean()) if used.any() else 0.0
+    mean_w = float(minute_w.mean()) if minute_w.size else 0.0
+    return {
+        "load_w": load_w,
+        "duration_w": np.sort(minute_w)[::-1],
+        "peak_w": peak_w,
+        "peak_minute": peak_minute,
+        "peak_devices": [app["name"] for app, on in zip(appliances, curves[:, peak_minute] > 0) if on]
+        if running_w.size else [],
+        "peak_current_a": peak_w / battery_voltage,
+        "peak_current_share": peak_w / limit_w,
+        "peak_coverage_pct": 100.0 if peak_w <= limit_w else round(limit_w / peak_w * 100, 1),
+        "minutes_over_limit": int(np.count_nonzero(running_w > limit_w)),
+        "energy_wh_per_day": float(minute_w.sum() / 60 / days),
+        "unplaced_h": unplaced_h,
+        "load_factor": mean_w / float(minute_w.max()) if minute_w.size and minute_w.max() > 0 else 0.0,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Coincident peak load and load-duration curve of an appliance list.")
+    parser.add_argument("appliances", help="JSON file with a list of appliance dicts (optional windows / duty_cycle)")
+    parser.add_argument("--days", type=int, default=DEFAULT_DAYS)
+    args = parser.parse_args(argv)
+
+    with open(args.appliances, encoding="utf-8") as f:
+        appliances = json.load(f)
+    result = analyze_load(appliances, args.days)
+    duration = result.pop("duration_w")
+    result.pop("load_w")
+    result["duration_percentiles_w"] = {f"p{q}": float(np.percentile(duration, 100 - q)) for q in (1, 10, 50, 90)}
+    json.dump(result, sys.stdout, indent=2)
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+# monte_carlo.py
+# Monte Carlo uncertainty for the dashboard KPIs.
+# Instead of one point estimate, every sample draws
+#   - each appliance's hours: normal around the set value, sd = hours_rel_sd × hours, clipped to 0..24 h
+#   - METHANOL_CONSUMPTION_PER_KWH: normal(nominal, consumption_sd), at least 0.1 L/kWh
+#   - BATTERY_EFFICIENCY: triangular(efficiency_low, nominal, efficiency_high)
+# and evaluates the KPIs with kpi_batch, all samples of a chunk in one call.
+# Samples are drawn in fixed-size chunks, each with its own child seed of `seed`,
+# so the percentiles are the same whether the chunks run in one process or on a pool.
+#
+# Usage: python monte_carlo.py appliances.json --tank-liters 10 [--samples 100000] [--seed 0] [--workers 4]
+import argparse
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from kpi_batch import appliances_to_arrays, calculate_kpis_batch
+from kpi_calculator_version2 import BATTERY_EFFICIENCY, METHANOL_CONSUMPTION_PER_KWH
+
+DEFAULT_SAMPLES = 100_000
+CHUNK_SAMPLES = 25_000
+PERCENTILES = (10, 50, 90)
+HOURS_REL_SD = 0.3
+CONSUMPTION_SD = 0.05      # L/kWh
+EFFICIENCY_LOW = 0.85
+EFFICIENCY_HIGH = 0.95
+KPIS = ("autonomy_days", "methanol_per_day", "daily_demand_wh", "battery_hours", "efficiency")
+
+
+def _run_chunk(power: np.ndarray, hours: np.ndarray, tank_liters: float, n: int,
+               seed: np.random.SeedSequence, params: Dict) -> Dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    sampled_hours = np.clip(rng.normal(hours, params["hours_rel_sd"] * hours, size=(n, hours.size)), 0.0, 24.0)
+    consumption = np.maximum(rng.normal(METHANOL_CONSUMPTION_PER_KWH, params["consumption_sd"], size=n), 0.1)
+    efficiency = rng.triangular(params["efficiency_low"], BATTERY_EFFICIENCY, params["efficiency_high"], size=n)
+    kpis = calculate_kpis_batch(power, sampled_hours, tank_liters,
+                                consumption_per_kwh=consumption, battery_efficiency=efficiency)
+    return {k: kpis[k] for k in KPIS}
+
+
+def run_monte_carlo(appliances: List[Dict], tank_liters: float,
+                    samples: int = DEFAULT_SAMPLES,
+                    seed: int = 0,
+                    workers: int = 1,
+                    hours_rel_sd: float = HOURS_REL_SD,
+                    consumption_sd: float = CONSUMPTION_SD,
+                    efficiency_low: float = EFFICIENCY_LOW,
+                    efficiency_high: float = EFFICIENCY_HIGH,
+                    keep_samples: bool = False) -> Dict:
+    """
+    P10/P50/P90 (and mean) of each KPI under the sampled uncertainty.
+
+    Returns {'percentiles': {kpi: {'p10', 'p50', 'p90', 'mean'}}, 'samples': n} and,
+    with keep_samples, 'values': {kpi: array of every sample}. workers > 1 evaluates
+    the chunks on a process pool; the result does not depend on it.
+    """
+    power, hours = appliances_to_arrays(appliances)
+    params = {"hours_rel_sd": hours_rel_sd, "consumption_sd": consumption_sd,
+              "efficiency_low": efficiency_low, "efficiency_high": efficiency_high}
+    sizes = [min(CHUNK_SAMPLES, samples - start) for start in range(0, samples, CHUNK_SAMPLES)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [(power, hours, tank_liters, n, s, params) for n, s in zip(sizes, seeds)]
+    if workers > 1 and len(args) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = list(pool.map(_run_chunk, *zip(*args)))
+    else:
+        chunks = [_run_chunk(*a) for a in args]
+
+    values = {k: np.concatenate([c[k] for c in chunks]) for k in KPIS}
+    percentiles = {}
+    for k, v in values.items():
+        p = np.percentile(v, PERCENTILES)
+        percentiles[k] = dict({f"p{q}": float(x) for q, x in zip(PERCENTILES, p)}, mean=float(np.mean(v)))
+    result = {"percentiles": percentiles, "samples": samples}
+    if keep_samples:
+        result["values"] = values
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Monte Carlo P10/P50/P90 of the dashboard KPIs.")
+    parser.add_argument("appliances", help="JSON file with a list of {'name', 'power', 'hours'} dicts")
+    parser.add_argument("--tank-liters", type=float, required=True)
+    parser.add_argument("--samples", type=int, default=DEFAULT_SAMPLES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--hours-rel-sd", type=float, default=HOURS_REL_SD)
+    args = parser.parse_args(argv)
+
+    with open(args.appliances, encoding="utf-8") as f:
+        appliances = json.load(f)
+    result = run_monte_carlo(appliances, args.tank_liters, args.samples, args.seed, args.workers,
+                             hours_rel_sd=args.hours_rel_sd)
+    json.dump(result, sys.stdout, indent=2)
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+# report_assets.py
+# Images used by the PDF reports (logo, wiring diagram).
+# They ship with the repo, so they are read from the package directory first;
+# the GitHub raw URL is only a fallback for deployments without the files, with a
+# timeout and an on-disk copy so the download happens at most once per machine.
+# Each asset is read and validated once per process and then kept in memory.
+import os
+import struct
+import threading
+from typing import Dict, Optional
+
+from result_cache import DEFAULT_CACHE_DIR
+
+ASSET_DIR = os.path.dirname(os.path.abspath(__file__))
+REMOTE_BASE_URL = "https://raw.githubusercontent.com/Victor1492Alvarez/Fuel_Cell-Battery_kpi-dashboard/main/"
+DOWNLOAD_DIR = os.path.join(DEFAULT_CACHE_DIR, "assets")
+DOWNLOAD_TIMEOUT_S = 5
+
+LOGO = "dashboard_logo.PNG"
+WIRING_DIAGRAM = "wiring_diagram_1.png"
+
+_assets: Dict[str, Dict] = {}
+_lock = threading.Lock()
+
+
+def _image_info(data: bytes) -> Dict:
+    """Format and pixel size of a PNG or JPEG; raises ValueError for anything else."""
+    if data[:8] == b"\x89PNG\r\n\x1a\n" and data[12:16] == b"IHDR":
+        width, height = struct.unpack(">II", data[16:24])
+        return {"format": "png", "width": width, "height": height}
+    if data[:2] == b"\xff\xd8":
+        pos = 2
+        while pos + 9 < len(data):
+            if data[pos] != 0xFF:
+                break
+            marker = data[pos + 1]
+            length = struct.unpack(">H", data[pos + 2:pos + 4])[0]
+            if marker in (0xC0, 0xC1, 0xC2):  # start of frame
+                height, width = struct.unpack(">HH", data[pos + 5:pos + 9])
+                return {"format": "jpg", "width": width, "height": height}
+            pos += 2 + length
+    raise ValueError("not a valid PNG/JPEG image")
+
+
+def _download(name: str) -> str:
+    import requests
+
+    path = os.path.join(DOWNLOAD_DIR, name)
+    if not os.path.exists(path):
+        response = requests.get(REMOTE_BASE_URL + name, timeout=DOWNLOAD_TIMEOUT_S)
+        response.raise_for_status()
+        _image_info(response.content)
+        os.makedirs(DOWNLOAD_DIR, exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(response.content)
+        os.replace(tmp, path)
+    return path
+
+
+def load_asset(name: str, allow_download: bool = True) -> Dict:
+    """
+    Return {'path', 'data', 'format', 'width', 'height'} for a report image.
+
+    The path always points to a complete local file, so it can be passed to
+    FPDF.image directly. Raises OSError/ValueError if the image is unavailable.
+    """
+    with _lock:
+        if name in _assets:
+            return _assets[name]
+    path = os.path.join(ASSET_DIR, name)
+    if not os.path.exists(path):
+        if not allow_download:
+            raise FileNotFoundError(path)
+        path = _download(name)
+    with open(path, "rb") as f:
+        data = f.read()
+    asset = dict(_image_info(data), path=path, data=data)
+    with _lock:
+        _assets[name] = asset
+    return asset
+
+
+def asset_path(name: str, allow_download: bool = True) -> Optional[str]:
+    """Local path of a report image, or None if it cannot be found or fetched."""
+    try:
+        return load_asset(name, allow_download)["path"]
+    except Exception:
+        return None
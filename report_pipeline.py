@@ -0,0 +1,402 @@
+# report_pipeline.py
+# PDF performance reports outside of Streamlit.
+# render_report() lays out the same one-page report as the REV5 dashboard;
+# generate_reports() renders a whole batch of vehicles on a process pool.
+# The parts every report shares (constants table, footer, parsed logo and wiring
+# diagram) are built once per process and only copied into each document; the
+# parsed images rely on FPDF internals, so an FPDF release other than those in
+# PARSED_IMAGE_FPDF_VERSIONS places every image through the public FPDF.image.
+#
+# Usage: python report_pipeline.py scenarios.json reports/ [--workers N]
+#        python report_pipeline.py scenarios.json reports.zip
+#        python report_pipeline.py scenarios.json - > reports.zip
+# scenarios.json is a list of {"name": ..., "appliances": [...], "tank_liters": ...}.
+import argparse
+import hashlib
+import json
+import os
+import re
+import struct
+import sys
+import time
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from kpi_calculator_version2 import *
+from report_assets import LOGO, WIRING_DIAGRAM, load_asset
+
+FOOTER_LINES = [
+    "Coder: Victor Alvarez Melendez",
+    "Master Student in Hydrogen Technology",
+    "Technische Hochschule Rosenheim - Campus Burghausen",
+]
+GAUGE_NOTE = "The gauges show key metrics for system autonomy and energy conversion efficiency."
+THANKS_LINE = "Thanks for using our App. Servus and enjoy your camping days in the Alps!."
+
+GAUGE_IMAGE_CACHE_SIZE = 64
+# FPDF releases whose private image API (FPDF.images, _parsepng/_parsejpg, pdf_version)
+# the parsed-image cache relies on; any other release goes through the public FPDF.image
+PARSED_IMAGE_FPDF_VERSIONS = ("1.7.2",)
+
+_statics: Optional[Dict] = None
+_gauge_images: Dict[str, Dict] = {}
+
+
+def compute_kpis(appliances: List[Dict], tank_liters: float) -> Dict:
+    """The six dashboard KPIs for one appliance list and tank size."""
+    daily_demand_wh = calculate_daily_energy_demand(appliances)
+    methanol_per_day = calculate_methanol_consumption(daily_demand_wh)
+    battery_energy_wh = min(BATTERY_CAPACITY_WH, daily_demand_wh)
+    fuel_cell_energy_wh = max(0, daily_demand_wh - BATTERY_CAPACITY_WH)
+    battery_deficit = max(0, daily_demand_wh - BATTERY_CAPACITY_WH)
+    return {
+        "daily_demand_wh": daily_demand_wh,
+        "methanol_per_day": methanol_per_day,
+        "autonomy_days": calculate_tank_autonomy(tank_liters, methanol_per_day),
+        "battery_hours": battery_discharge_time(daily_demand_wh),
+        "efficiency_pct": global_system_efficiency(battery_energy_wh, fuel_cell_energy_wh, methanol_per_day),
+        "charge_time": battery_charge_time_needed(battery_deficit),
+    }
+
+
+def constants_table() -> List[Tuple[str, str]]:
+    return [
+        ("Battery Capacity", f"{BATTERY_CAPACITY_AH} Ah"),
+        ("Battery Voltage", f"{BATTERY_VOLTAGE} V"),
+        ("Battery Energy", f"{BATTERY_CAPACITY_WH} Wh"),
+        ("Fuel Cell Output", f"{FUEL_CELL_OUTPUT_W} W"),
+        ("Fuel Cell Efficiency", f"{FUEL_CELL_EFFICIENCY*100:.1f}%"),
+        ("Methanol Energy Density", f"{METHANOL_ENERGY_DENSITY:.2f} kWh/L"),
+        ("Methanol Consumption", f"{METHANOL_CONSUMPTION_PER_KWH} L/kWh"),
+    ]
+
+
+def appliance_summary(appliances: List[Dict]):
+    """Per-device energy table with a **TOTAL** row, as shown in the dashboard."""
+    import pandas as pd
+
+    df = pd.DataFrame(appliances)
+    df['Energy (Wh)'] = df['power'] * df['hours']
+    df['Battery Capacity Used (Ah)'] = df['Energy (Wh)'] / BATTERY_VOLTAGE
+
+    total_row = pd.DataFrame({
+        "name": ["**TOTAL**"],
+        "power": [df['power'].sum()],
+        "hours": ["-"],
+        "Energy (Wh)": [df['Energy (Wh)'].sum()],
+        "Battery Capacity Used (Ah)": [df['Battery Capacity Used (Ah)'].sum()]
+    })
+
+    return pd.concat([df, total_row], ignore_index=True)
+
+
+def build_gauges(battery_hours: float, efficiency_pct: float):
+    import plotly.graph_objects as go
+
+    fig_batt = go.Figure(go.Indicator(
+        mode="gauge+number",
+        value=battery_hours,
+        title={'text': "Battery Autonomy (h)",'font': {'size': 22,'color': "black"}},
+        gauge={
+            'axis': {'range': [0, 24]},
+            'bar': {'color': "black"},
+            'steps': [
+                {'range': [0, 2.4], 'color': "gray"},
+                {'range': [2.4, 7.2], 'color': "red"},
+                {'range': [7.2, 12], 'color': "orange"},
+                {'range': [12, 19.2], 'color': "yellow"},
+                {'range': [19.2, 24], 'color': "green"},
+            ]
+        }))
+    fig_eff = go.Figure(go.Indicator(
+        mode="gauge+number",
+        value=efficiency_pct * 100,
+        title={'text': "System Efficiency (%)",'font': {'size': 22,'color': "black"}},
+        gauge={
+            'axis': {'range': [0, 100]},
+            'bar': {'color': "black"},
+            'steps': [
+                {'range': [0, 20], 'color': "red"},
+                {'range': [20, 50], 'color': "orange"},
+                {'range': [50, 80], 'color': "yellow"},
+                {'range': [80, 100], 'color': "green"},
+            ]
+        }))
+    return fig_batt, fig_eff
+
+
+def _reuses_parsed_images() -> bool:
+    """Whether the installed FPDF is one whose image internals the parsed-image cache knows."""
+    import fpdf
+
+    return getattr(fpdf, "FPDF_VERSION", None) in PARSED_IMAGE_FPDF_VERSIONS
+
+
+def _parse_image(path: str) -> Dict:
+    from fpdf import FPDF
+
+    parser = FPDF()
+    return parser._parsepng(path) if path.lower().endswith(".png") else parser._parsejpg(path)
+
+
+def _parse_alpha_png(data: bytes) -> Optional[Dict]:
+    """
+    FPDF image info for an 8-bit RGBA/gray+alpha PNG (what kaleido produces).
+
+    FPDF 1.7.2 splits the alpha channel with a regex per row, ~1 s for a gauge;
+    this does the same split with NumPy. Returns None for anything else, which
+    is left to FPDF's own parser.
+    """
+    import numpy as np
+
+    if data[:8] != b"\x89PNG\r\n\x1a\n":
+        return None
+    w, h, bpc, ct, _, _, interlace = struct.unpack(">IIBBBBB", data[16:29])
+    if bpc != 8 or ct not in (4, 6) or interlace:
+        return None
+    idat = []
+    pos = 8
+    while pos < len(data):
+        length, chunk = struct.unpack(">I4s", data[pos:pos + 8])
+        if chunk == b"IDAT":
+            idat.append(data[pos + 8:pos + 8 + length])
+        elif chunk == b"IEND":
+            break
+        pos += 12 + length
+    channels = 4 if ct == 6 else 2
+    rows = np.frombuffer(zlib.decompress(b"".join(idat)), dtype=np.uint8).reshape(h, 1 + w * channels)
+    pixels = rows[:, 1:].reshape(h, w, channels)
+    # each row keeps its filter byte; PNG filters work per channel, so the split streams stay valid
+    color = np.concatenate([rows[:, :1], pixels[:, :, :-1].reshape(h, -1)], axis=1)
+    alpha = np.concatenate([rows[:, :1], pixels[:, :, -1]], axis=1)
+    colors = 3 if ct == 6 else 1
+    return {
+        'w': w, 'h': h, 'cs': 'DeviceRGB' if ct == 6 else 'DeviceGray', 'bpc': bpc, 'f': 'FlateDecode',
+        'dp': f'/Predictor 15 /Colors {colors} /BitsPerComponent {bpc} /Columns {w}', 'pal': '', 'trns': '',
+        'data': zlib.compress(color.tobytes()), 'smask': zlib.compress(alpha.tobytes()),
+    }
+
+
+def _gauge_image(data: bytes) -> Tuple[str, Dict]:
+    """(image name, FPDF info) for gauge PNG bytes, parsed once per distinct image."""
+    name = "gauge-" + hashlib.sha1(data).hexdigest() + ".png"
+    if name not in _gauge_images:
+        info = _parse_alpha_png(data)
+        if info is None:
+            from gauge_render import png_files
+
+            with png_files(data) as (path,):
+                info = _parse_image(path)
+        if len(_gauge_images) >= GAUGE_IMAGE_CACHE_SIZE:
+            _gauge_images.pop(next(iter(_gauge_images)))
+        _gauge_images[name] = info
+    return name, _gauge_images[name]
+
+
+def report_statics(warn: Optional[Callable[[str], None]] = None) -> Dict:
+    """Shared report parts, built on first use and kept for the life of the process."""
+    global _statics
+    if _statics is not None:
+        return _statics
+    statics = {"constants": constants_table(), "images": {}}
+    for name in (LOGO, WIRING_DIAGRAM):
+        try:
+            path = load_asset(name)["path"]
+            statics["images"][name] = (path, _parse_image(path) if _reuses_parsed_images() else None)
+        except Exception as e:
+            if warn:
+                warn(f"⚠️ No se pudo cargar {name}: {e}")
+    if len(statics["images"]) == 2:
+        _statics = statics  # keep retrying while an asset is missing
+    return statics
+
+
+def _place_parsed(pdf, name: str, info: Optional[Dict], **kwargs) -> None:
+    if info is None:
+        pdf.image(name, **kwargs)  # no parsed info for this FPDF: it parses the file itself
+        return
+    if name not in pdf.images:
+        # FPDF drops the image data once written, so every document gets its own copy
+        pdf.images[name] = dict(info, i=len(pdf.images) + 1)
+        if 'smask' in info and pdf.pdf_version < '1.4':
+            pdf.pdf_version = '1.4'
+    pdf.image(name, **kwargs)
+
+
+def _place_image(pdf, statics: Dict, name: str, **kwargs) -> bool:
+    if name not in statics["images"]:
+        return False
+    path, info = statics["images"][name]
+    _place_parsed(pdf, path, info, **kwargs)
+    return True
+
+
+def _place_png(pdf, data: bytes, **kwargs) -> None:
+    """Place PNG bytes, reusing the parsed image when the installed FPDF allows it."""
+    if not _reuses_parsed_images():
+        from gauge_render import png_files
+
+        with png_files(data) as (path,):
+            pdf.image(path, **kwargs)
+        return
+    name, info = _gauge_image(data)
+    _place_parsed(pdf, name, info, **kwargs)
+
+
+def render_report(kpis: Dict, appliances: List[Dict], gauge_pngs: Tuple[bytes, bytes],
+                  warn: Optional[Callable[[str], None]] = None,
+                  generated_on: Optional[datetime] = None) -> bytes:
+    """One-page PDF report as bytes; warn() receives messages about images that could not be placed."""
+    from fpdf import FPDF
+
+    statics = report_statics(warn)
+    generated_on = generated_on or datetime.now()
+
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_auto_page_break(auto=False, margin=5)
+    pdf.set_font("Arial", "B", 16)
+    pdf.cell(10, 10, "Fuel Cell & Battery System Performance Report", ln=0)
+    try:
+        _place_image(pdf, statics, LOGO, x=166, y=5, w=40)
+    except Exception as e:
+        if warn:
+            warn(f"⚠️ No se pudo insertar el logo: {e}")
+    pdf.ln(12)
+
+    pdf.set_font("Arial", "B", 11)
+    pdf.cell(200, 6, "System KPIs", ln=True)
+    pdf.set_font("Arial", size=10)
+    pdf.cell(200, 6, f"Daily Energy Demand: {kpis['daily_demand_wh']:.0f} Wh", ln=True)
+    pdf.cell(200, 6, f"Methanol Needed/Day: {kpis['methanol_per_day']:.2f} L", ln=True)
+    pdf.cell(200, 6, f"Tank Autonomy: {kpis['autonomy_days']:.1f} days", ln=True)
+    pdf.cell(200, 6, f"Battery Autonomy: {kpis['battery_hours']:.1f} h", ln=True)
+    pdf.cell(200, 6, f"System Efficiency: {kpis['efficiency_pct']*100:.1f}%", ln=True)
+    pdf.cell(200, 6, f"Battery Charge Time: {kpis['charge_time']:.1f} h", ln=True)
+
+    pdf.ln(4)
+    pdf.set_font("Arial", "B", 11)
+    pdf.cell(200, 6, "Equipments Energy Summary", ln=True)
+    pdf.set_font("Arial", size=10)
+    for app in appliances:
+        energy = app['power'] * app['hours']
+        pdf.cell(200, 6, f"{app['name']}: {app['power']}W x {app['hours']}h = {energy:.0f}Wh | {energy / BATTERY_VOLTAGE:.1f}Ah", ln=True)
+
+    pdf.ln(4)
+    pdf.set_font("Arial", "B", 11)
+    pdf.cell(200, 6, "System Constants", ln=True)
+    pdf.set_font("Arial", size=10)
+    for parameter, value in statics["constants"]:
+        pdf.cell(200, 6, f"{parameter}: {value}", ln=True)
+
+    pdf.ln(4)
+    y = pdf.get_y()
+    for png, x in zip(gauge_pngs, (0, 103)):
+        _place_png(pdf, png, x=x, y=y, w=110)
+
+    pdf.ln(62)
+    pdf.set_font("Arial", size=8)
+    pdf.cell(200, 6, GAUGE_NOTE, ln=True)
+
+    try:
+        pdf.ln(10)
+        _place_image(pdf, statics, WIRING_DIAGRAM, x=110, y=110, w=90)
+    except Exception as e:
+        if warn:
+            warn(f"⚠️ No se pudo insertar el wiring diagram en el PDF: {e}")
+
+    pdf.ln(12)
+    pdf.set_font("Arial","B", size=8)
+    pdf.cell(200, 3, f"Generated on: {generated_on.strftime('%Y-%m-%d %H:%M:%S')}. Values strictly estimated for academic purposes", ln=True)
+    for line in FOOTER_LINES:
+        pdf.cell(200, 3, line, ln=True)
+    pdf.cell(200, 35, THANKS_LINE, ln=True)
+
+    return pdf.output(dest='S').encode('latin1')
+
+
+def report_for_scenario(scenario: Dict) -> Tuple[str, bytes]:
+    """(name, PDF bytes) for one {"name", "appliances", "tank_liters"} scenario."""
+    from gauge_render import render_png_async
+
+    kpis = compute_kpis(scenario["appliances"], scenario["tank_liters"])
+    fig_batt, fig_eff = build_gauges(kpis["battery_hours"], kpis["efficiency_pct"])
+    pngs = (render_png_async(fig_batt), render_png_async(fig_eff))
+    return scenario["name"], render_report(kpis, scenario["appliances"], (pngs[0].result(), pngs[1].result()))
+
+
+def _safe_filename(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", name).strip("_") or "report"
+
+
+def _unique_filename(name: str, used: Set[str]) -> str:
+    """_safe_filename(name) + ".pdf", with -2, -3, ... if another scenario already took it."""
+    base = _safe_filename(name)
+    filename, n = base + ".pdf", 1
+    while filename.lower() in used:  # case-insensitive, like the file systems on Windows and macOS
+        n += 1
+        filename = f"{base}-{n}.pdf"
+    used.add(filename.lower())
+    return filename
+
+
+def iter_reports(scenarios: List[Dict], workers: Optional[int] = None) -> Iterator[Tuple[str, bytes]]:
+    """Yield (name, PDF bytes) in input order, rendered on a process pool."""
+    if workers == 1:
+        yield from map(report_for_scenario, scenarios)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=report_statics) as pool:
+        yield from pool.map(report_for_scenario, scenarios, chunksize=4)
+
+
+def generate_reports(scenarios: List[Dict], out: str, workers: Optional[int] = None) -> Dict:
+    """
+    Render every scenario and write the PDFs to a directory, a .zip file or,
+    for out == "-", a zip stream on stdout. Returns count, seconds and reports/s.
+    """
+    t0 = time.perf_counter()
+    count = 0
+    used: Set[str] = set()
+    reports = iter_reports(scenarios, workers)
+    if out == "-" or out.endswith(".zip"):
+        target = sys.stdout.buffer if out == "-" else open(out, "wb")
+        try:
+            with zipfile.ZipFile(target, "w", compression=zipfile.ZIP_STORED) as zf:
+                for name, data in reports:
+                    zf.writestr(_unique_filename(name, used), data)
+                    count += 1
+        finally:
+            if target is not sys.stdout.buffer:
+                target.close()
+    else:
+        os.makedirs(out, exist_ok=True)
+        for name, data in reports:
+            with open(os.path.join(out, _unique_filename(name, used)), "wb") as f:
+                f.write(data)
+            count += 1
+    seconds = time.perf_counter() - t0
+    return {"reports": count, "seconds": seconds, "reports_per_s": count / seconds if seconds > 0 else 0.0}
+
+
+def load_scenarios(path: str) -> List[Dict]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Render PDF performance reports for a batch of scenarios.")
+    parser.add_argument("scenarios", help="JSON list of {name, appliances, tank_liters}")
+    parser.add_argument("out", help="output directory, .zip file, or - for a zip stream on stdout")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    args = parser.parse_args(argv)
+
+    summary = generate_reports(load_scenarios(args.scenarios), args.out, args.workers)
+    print(f"{summary['reports']} reports in {summary['seconds']:.2f} s "
+          f"({summary['reports_per_s']:.1f} reports/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
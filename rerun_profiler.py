@@ -0,0 +1,129 @@
+# rerun_profiler.py
+# Lightweight per-rerun timing of named sections of a dashboard script.
+#
+#   with start_profiler(__file__) as prof:  # enabled by FC_PROFILE=1 or ?profile=1
+#       ...KPI math...
+#       prof.lap("KPI math")                # time since the previous lap
+#       ...
+#       prof.finish()                       # timing table in the app + one JSON line in the log
+#
+# When disabled every call returns immediately, so the laps can stay in the scripts.
+# FC_PROFILE=mem (or ?profile=mem) also records allocation deltas with tracemalloc,
+# which makes allocation-heavy sections (kaleido, matplotlib) several times slower;
+# tracing is stopped again by the profiler that started it when the with block ends,
+# also when the rerun is cut short (st.stop(), a newer rerun, an exception), so it
+# does not stay on for later reruns and sessions.
+# Records go to FC_PROFILE_LOG (default ~/.cache/fc_battery_dashboard/reruns.jsonl),
+# one JSON object per rerun, for later aggregation with pandas.read_json(lines=True).
+import json
+import os
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from result_cache import DEFAULT_CACHE_DIR
+
+PROFILE_ENV = "FC_PROFILE"
+PROFILE_QUERY_PARAM = "profile"
+DEFAULT_LOG = os.environ.get("FC_PROFILE_LOG", os.path.join(DEFAULT_CACHE_DIR, "reruns.jsonl"))
+
+
+class RerunProfiler:
+    def __init__(self, script: str, enabled: bool, track_memory: bool = False,
+                 log_path: Optional[str] = DEFAULT_LOG):
+        self.script = os.path.basename(script)
+        self.enabled = enabled
+        self.track_memory = enabled and track_memory
+        self.log_path = log_path
+        self.sections: List[Dict] = []
+        self._started_tracing = self.track_memory and not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start()
+        self._t_start = self._t_last = time.perf_counter()
+        self._mem_last = self._traced()
+
+    def __enter__(self) -> "RerunProfiler":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._stop_tracing()
+
+    def _stop_tracing(self) -> None:
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def _traced(self) -> int:
+        return tracemalloc.get_traced_memory()[0] if self.track_memory and tracemalloc.is_tracing() else 0
+
+    def lap(self, name: str) -> None:
+        """Close the section that started at the previous lap (or at start) under this name."""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        section = {"section": name, "ms": (now - self._t_last) * 1000}
+        if self.track_memory:
+            mem = self._traced()
+            section["mem_kb"] = (mem - self._mem_last) / 1024
+            self._mem_last = mem
+        self.sections.append(section)
+        self._t_last = time.perf_counter()  # leave our own bookkeeping out of the next section
+
+    def record(self) -> Dict:
+        record = {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "script": self.script,
+            "total_ms": (time.perf_counter() - self._t_start) * 1000,
+            "sections": self.sections,
+        }
+        if self.track_memory and tracemalloc.is_tracing():
+            record["peak_kb"] = tracemalloc.get_traced_memory()[1] / 1024
+        return record
+
+    def finish(self, show: bool = True) -> Optional[Dict]:
+        """Show the timing table (collapsed) and append the record to the log."""
+        if not self.enabled:
+            return None
+        record = self.record()
+        if self._started_tracing:
+            self._stop_tracing()
+        elif self.track_memory and tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        if show:
+            import streamlit as st
+
+            rows = []
+            for s in self.sections:
+                row = {"Section": s["section"], "Time (ms)": f"{s['ms']:.1f}"}
+                if "mem_kb" in s:
+                    row["Memory Δ (kB)"] = f"{s['mem_kb']:.0f}"
+                rows.append(row)
+            with st.expander(f"⏱️ Rerun timing: {record['total_ms']:.0f} ms"):
+                st.table(rows)
+        if self.log_path:
+            try:
+                os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record) + "\n")
+            except OSError:
+                pass
+        return record
+
+
+def profiling_requested() -> Tuple[bool, bool]:
+    """(enabled, track_memory) from FC_PROFILE or the ?profile= query parameter."""
+    value = os.environ.get(PROFILE_ENV, "")
+    if value in ("", "0"):
+        try:
+            import streamlit as st
+
+            value = st.query_params.get(PROFILE_QUERY_PARAM, "")
+        except Exception:  # not running inside Streamlit
+            value = ""
+    return value not in ("", "0"), value == "mem"
+
+
+def start_profiler(script: str, enabled: Optional[bool] = None) -> RerunProfiler:
+    requested, track_memory = profiling_requested()
+    return RerunProfiler(script, requested if enabled is None else enabled, track_memory)
@@ -0,0 +1,208 @@
+# result_cache.py
+# Content-addressed result cache for KPI results, simulations and figures.
+# Keys are a SHA-256 over the inputs (appliance list, tank size, ...) plus
+# cache_version(): the CACHE_FORMAT, the constants in kpi_calculator_version2 and the
+# source of the repo's modules, so changing a constant or the simulation code
+# invalidates every stored result. Two tiers:
+#   - in-memory LRU of the pickled values, evicted by total size; every get() unpickles
+#     a fresh copy, so callers may mutate what they get without touching the cache
+#   - on-disk pickles that survive restarts (FC_BATTERY_CACHE_DIR, default ~/.cache/fc_battery_dashboard),
+#     least recently used first removed once they exceed FC_BATTERY_CACHE_MAX_BYTES (default 512 MB);
+#     entries of older versions are never read again and age out the same way
+import glob
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import kpi_calculator_version2
+
+CACHE_FORMAT = 2  # bump when the layout of cached values changes
+DEFAULT_MEMORY_BYTES = 64 * 1024 * 1024
+DEFAULT_DISK_BYTES = int(os.environ.get("FC_BATTERY_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+DISK_PRUNE_SHARE = 0.9  # pruning goes down to this share of the disk limit
+DEFAULT_CACHE_DIR = os.environ.get(
+    "FC_BATTERY_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "fc_battery_dashboard"))
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_MISSING = object()
+
+
+def _json_default(obj):
+    # NumPy scalars/arrays and anything else with a tolist()/item() end up as plain JSON
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    return repr(obj)
+
+
+def constants_version() -> str:
+    """Short hash of all UPPER_CASE constants of kpi_calculator_version2."""
+    constants = {k: v for k, v in vars(kpi_calculator_version2).items() if k.isupper()}
+    return stable_hash(constants, versioned=False)[:12]
+
+
+@lru_cache(maxsize=None)
+def code_version() -> str:
+    """Short hash of the source of every module in the repo, read once per process."""
+    digest = hashlib.sha256()
+    for path in sorted(glob.glob(os.path.join(REPO_DIR, "*.py"))):
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+
+def cache_version() -> str:
+    return f"{CACHE_FORMAT}:{constants_version()}:{code_version()}"
+
+
+def stable_hash(*parts, versioned: bool = True) -> str:
+    """Stable hex digest of JSON-serialisable parts (dict order does not matter), plus cache_version()."""
+    payload = list(parts)
+    if versioned:
+        payload.append(cache_version())
+    blob = json.dumps(payload, sort_keys=True, default=_json_default, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """Two-tier (memory LRU + disk) cache. Thread safe; Streamlit runs sessions in threads."""
+
+    def __init__(self, cache_dir: Optional[str] = DEFAULT_CACHE_DIR, max_memory_bytes: int = DEFAULT_MEMORY_BYTES,
+                 max_disk_bytes: int = DEFAULT_DISK_BYTES):
+        self.cache_dir = cache_dir
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes: Optional[int] = None  # scanned on the first write
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "disk_evictions": 0}
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + ".pkl")
+
+    def _remember(self, key: str, blob: bytes) -> None:
+        # caller holds the lock
+        if key in self._memory:
+            self._memory_bytes -= len(self._memory.pop(key))
+        if len(blob) > self.max_memory_bytes:
+            return
+        self._memory[key] = blob
+        self._memory_bytes += len(blob)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self.stats["evictions"] += 1
+
+    def _disk_entries(self) -> List[Tuple[float, int, str]]:
+        """(last use, size, path) of every stored pickle."""
+        entries = []
+        for path in glob.glob(os.path.join(self.cache_dir, "*", "*.pkl")):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def _account_disk(self, added: int) -> None:
+        # caller holds the lock; the total is an upper bound until the next scan
+        if self._disk_bytes is None:
+            self._disk_bytes = sum(size for _, size, _ in self._disk_entries())
+        else:
+            self._disk_bytes += added
+        if self._disk_bytes <= self.max_disk_bytes:
+            return
+        entries = sorted(self._disk_entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_disk_bytes * DISK_PRUNE_SHARE:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.stats["disk_evictions"] += 1
+        self._disk_bytes = total
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            blob = self._memory.get(key)
+            if blob is not None:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+        if blob is not None:
+            return pickle.loads(blob)
+        if self.cache_dir:
+            path = self._disk_path(key)
+            try:
+                with open(path, "rb") as f:
+                    blob = f.read()
+                value = pickle.loads(blob)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                pass
+            else:
+                try:
+                    os.utime(path)  # the mtime is the last use for the disk LRU
+                except OSError:
+                    pass
+                with self._lock:
+                    self.stats["disk_hits"] += 1
+                    self._remember(key, blob)
+                return value
+        with self._lock:
+            self.stats["misses"] += 1
+        return default
+
+    def put(self, key: str, value: Any) -> None:
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._remember(key, blob)
+        if self.cache_dir:
+            path = self._disk_path(key)
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+                with os.fdopen(fd, "wb") as f:
+                    f.write(blob)
+                os.replace(tmp, path)
+            except OSError:
+                return  # a read-only or full disk only costs us the persistent tier
+            with self._lock:
+                self._account_disk(len(blob))
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear_memory(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+
+    def info(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.stats, memory_entries=len(self._memory), memory_bytes=self._memory_bytes,
+                        disk_bytes=self._disk_bytes)
+
+
+_default_cache: Optional[ResultCache] = None
+_default_lock = threading.Lock()
+
+
+def default_cache() -> ResultCache:
+    """Process-wide cache instance shared by every dashboard session."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ResultCache()
+        return _default_cache
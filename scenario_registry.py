@@ -0,0 +1,122 @@
+# scenario_registry.py
+# Appliance scenarios shared by all dashboards and batch tools, loaded from scenarios.json.
+#
+#   {"groups": {"load": ["Base 500 W", ...], "season": ["Summer", "Winter"]},
+#    "profiles": {"Base 500 W": [{"name": "Laptop (230 V)", "power": 95, "hours": 4}, ...], ...}}
+#
+# The file is parsed once per process (default_registry is cached). Profiles are kept
+# as a name index plus (profiles × devices) power / hours arrays padded with zeros,
+# with the daily energy of every profile precomputed, so switching scenario is a dict
+# lookup and batch tools can take all profiles as arrays at once. Any further appliance
+# keys (load_model schedules: 'windows', 'duty_cycle', ...) are kept per device and
+# returned by profile().
+#
+#   registry = default_registry()
+#   appliances = registry.profile("Peak 1000 W")      # list of {'name', 'power', 'hours'}
+#   power, hours = registry.arrays(registry.group("season"))
+#
+# Usage: python scenario_registry.py [--scenarios scenarios.json]
+import argparse
+import copy
+import json
+import os
+import sys
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SCENARIOS = os.path.join(REPO_DIR, "scenarios.json")
+
+
+def _number(value: float):
+    """Array values back to the int/float they were written as."""
+    return int(value) if float(value).is_integer() else float(value)
+
+
+class ScenarioRegistry:
+    def __init__(self, profiles: Dict[str, List[Dict]], groups: Optional[Dict[str, List[str]]] = None):
+        self.names: List[str] = list(profiles)
+        self.index: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+        self.device_names: List[Tuple[str, ...]] = [tuple(app["name"] for app in apps) for apps in profiles.values()]
+        self.schedules: List[Tuple[Dict, ...]] = [
+            tuple({k: v for k, v in app.items() if k not in ("name", "power", "hours")} for app in apps)
+            for apps in profiles.values()]
+        self.n_devices = np.array([len(devices) for devices in self.device_names], dtype=int)
+        width = int(self.n_devices.max(initial=0))
+        self.power = np.zeros((len(self.names), width))
+        self.hours = np.zeros((len(self.names), width))
+        for p, apps in enumerate(profiles.values()):
+            self.power[p, :len(apps)] = [app["power"] for app in apps]
+            self.hours[p, :len(apps)] = [app["hours"] for app in apps]
+        self.energy_wh = (self.power * self.hours).sum(axis=1)
+        self.groups: Dict[str, List[str]] = dict(groups or {})
+        for group, names in self.groups.items():
+            missing = [name for name in names if name not in self.index]
+            if missing:
+                raise KeyError(f"group {group!r} refers to unknown profiles {missing}")
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.index
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _row(self, name: str) -> int:
+        try:
+            return self.index[name]
+        except KeyError:
+            raise KeyError(f"unknown scenario {name!r}, expected one of {self.names}") from None
+
+    def group(self, group: str) -> List[str]:
+        return list(self.groups[group])
+
+    def profile(self, name: str) -> List[Dict]:
+        """A fresh appliance list for the scenario, safe to modify."""
+        p = self._row(name)
+        return [dict({"name": device, "power": _number(self.power[p, d]), "hours": _number(self.hours[p, d])},
+                     **copy.deepcopy(self.schedules[p][d]))
+                for d, device in enumerate(self.device_names[p])]
+
+    def daily_energy_wh(self, name: str) -> float:
+        return float(self.energy_wh[self._row(name)])
+
+    def arrays(self, names: Optional[Sequence[str]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(power, hours) rows for `names` (all profiles by default), padded to a common width."""
+        if names is None:
+            return self.power, self.hours
+        rows = [self._row(name) for name in names]
+        width = int(self.n_devices[rows].max(initial=0))
+        return self.power[rows, :width], self.hours[rows, :width]
+
+    def profiles(self, names: Optional[Sequence[str]] = None) -> Dict[str, List[Dict]]:
+        return {name: self.profile(name) for name in (self.names if names is None else names)}
+
+
+def load_registry(path: str = DEFAULT_SCENARIOS) -> ScenarioRegistry:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return ScenarioRegistry(data["profiles"], data.get("groups"))
+
+
+@lru_cache(maxsize=None)
+def default_registry(path: str = DEFAULT_SCENARIOS) -> ScenarioRegistry:
+    """The registry for `path`, parsed on first use and shared for the rest of the process."""
+    return load_registry(path)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="List the appliance scenarios.")
+    parser.add_argument("--scenarios", default=DEFAULT_SCENARIOS)
+    args = parser.parse_args(argv)
+
+    registry = load_registry(args.scenarios)
+    for name, devices, energy in zip(registry.names, registry.n_devices, registry.energy_wh):
+        groups = ", ".join(g for g, names in registry.groups.items() if name in names)
+        print(f"{name:<20} {devices:>3} devices {energy:>9.1f} Wh/day  {groups}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
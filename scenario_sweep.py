@@ -0,0 +1,215 @@
+# scenario_sweep.py
+# Headless scenario sweep runner built on kpi_batch / kpi_calculator_version2.
+#
+# A grid is a JSON file like:
+#   {
+#     "profiles": {"Summer": [{"name": "Fridge", "power": 45, "hours": 24}, ...],
+#                  "Winter": [...]},
+#     "tank_liters": [5, 10, 20],
+#     "hours": {"Laptop": [2, 4, 6], "Fan Heater (12 V)": [0, 1, 2]}
+#   }
+# "profiles" may also be a list of scenario names from scenarios.json, e.g. ["Summer", "Winter"].
+# Every combination profile × tank × hour overrides is one scenario; an hours axis
+# only multiplies the profiles that have its device (elsewhere its column is NaN).
+# Scenarios are numbered profile by profile and evaluated in chunks on a process
+# pool; each chunk is written as its own Parquet part file, so an interrupted run
+# picks up where it stopped.
+#
+# Usage: python scenario_sweep.py grid.json results/ [--workers N] [--chunk-size N]
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from kpi_batch import calculate_kpis_batch
+from scenario_registry import default_registry
+
+MANIFEST_FILE = "manifest.json"
+SWEEP_LAYOUT = 2  # scenario numbering; results of another layout are not resumed
+DEFAULT_CHUNK_SIZE = 50_000
+
+
+def load_grid(path: str) -> Dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def grid_hash(grid: Dict) -> str:
+    if isinstance(grid["profiles"], list):  # hash the profiles themselves, not just their names
+        grid = dict(grid, profiles=default_registry().profiles(grid["profiles"]))
+    return hashlib.sha256(json.dumps(grid, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def compile_grid(grid: Dict) -> Dict:
+    """
+    Turn a grid definition into arrays the workers can index directly.
+
+    Profiles are padded to the same number of devices (power 0), and every hour
+    override axis stores, per profile, the device column it replaces (-1 if the
+    profile does not have that device). Each profile owns a block of scenario ids
+    of size tanks × the lengths of its own axes ('axis_lengths', 1 for axes it
+    does not have), starting at 'offsets'.
+    """
+    grid_profiles = grid["profiles"]
+    if isinstance(grid_profiles, list):
+        grid_profiles = default_registry().profiles(grid_profiles)
+    profile_names = list(grid_profiles)
+    profiles = [grid_profiles[name] for name in profile_names]
+    n_devices = max(len(apps) for apps in profiles)
+    power = np.zeros((len(profiles), n_devices))
+    hours = np.zeros((len(profiles), n_devices))
+    for p, apps in enumerate(profiles):
+        power[p, :len(apps)] = [app["power"] for app in apps]
+        hours[p, :len(apps)] = [app["hours"] for app in apps]
+
+    axis_names = list(grid.get("hours", {}))
+    axis_values = [np.asarray(grid["hours"][name], dtype=float) for name in axis_names]
+    axis_columns = np.full((len(axis_names), len(profiles)), -1)
+    for a, device in enumerate(axis_names):
+        for p, apps in enumerate(profiles):
+            for d, app in enumerate(apps):
+                if app["name"] == device:
+                    axis_columns[a, p] = d
+
+    tanks = np.asarray(grid.get("tank_liters", [10]), dtype=float)
+    axis_lengths = np.ones((len(profiles), len(axis_names)), dtype=np.int64)
+    for a, values in enumerate(axis_values):
+        axis_lengths[axis_columns[a] >= 0, a] = len(values)
+    block_sizes = len(tanks) * axis_lengths.prod(axis=1)
+    offsets = np.concatenate(([0], np.cumsum(block_sizes)))
+    return {
+        "profile_names": profile_names,
+        "power": power,
+        "hours": hours,
+        "tank_liters": tanks,
+        "axis_names": axis_names,
+        "axis_values": axis_values,
+        "axis_columns": axis_columns,
+        "axis_lengths": axis_lengths,
+        "offsets": offsets,
+        "size": int(offsets[-1]),
+    }
+
+
+def evaluate_range(compiled: Dict, start: int, stop: int) -> Dict[str, np.ndarray]:
+    """KPIs for scenario ids [start, stop) as a dict of columns."""
+    ids = np.arange(start, stop)
+    profile_idx = np.searchsorted(compiled["offsets"], ids, side="right") - 1
+    # mixed-radix split of the id within its profile's block, last axis fastest
+    rest = ids - compiled["offsets"][profile_idx]
+    lengths = compiled["axis_lengths"][profile_idx]
+    axis_idx = np.empty_like(lengths)
+    for a in range(lengths.shape[1] - 1, -1, -1):
+        rest, axis_idx[:, a] = np.divmod(rest, lengths[:, a])
+    tank_idx = rest
+    power = compiled["power"][profile_idx]
+    hours = compiled["hours"][profile_idx].copy()
+    rows = np.arange(ids.size)
+    columns = {"scenario_id": ids, "profile": profile_idx.astype(np.int32),
+               "tank_liters": compiled["tank_liters"][tank_idx]}
+    for a, name in enumerate(compiled["axis_names"]):
+        values = compiled["axis_values"][a][axis_idx[:, a]]
+        col = compiled["axis_columns"][a][profile_idx]
+        has = col >= 0
+        hours[rows[has], col[has]] = values[has]
+        columns[f"hours:{name}"] = np.where(has, values, np.nan)
+    columns.update(calculate_kpis_batch(power, hours, columns["tank_liters"]))
+    return columns
+
+
+def _part_path(out_dir: str, chunk: int) -> str:
+    return os.path.join(out_dir, f"part-{chunk:05d}.parquet")
+
+
+def _run_chunk(compiled: Dict, out_dir: str, chunk: int, start: int, stop: int) -> int:
+    import pandas as pd
+
+    columns = evaluate_range(compiled, start, stop)
+    df = pd.DataFrame(columns)
+    df["profile"] = pd.Categorical.from_codes(df["profile"], categories=compiled["profile_names"])
+    path = _part_path(out_dir, chunk)
+    tmp = path + ".tmp"
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, path)  # a part file only exists once it is complete
+    return stop - start
+
+
+def _print_progress(done: int, total: int, rate: float) -> None:
+    print(f"\r{done}/{total} scenarios ({done / total * 100:.1f}%) - {rate:,.0f} scenarios/s",
+          end="", file=sys.stderr, flush=True)
+
+
+def run_sweep(grid: Dict, out_dir: str, workers: Optional[int] = None,
+              chunk_size: int = DEFAULT_CHUNK_SIZE,
+              progress: Optional[Callable[[int, int, float], None]] = _print_progress) -> Dict:
+    """
+    Evaluate every scenario of the grid and write the results to out_dir.
+
+    Chunks whose part file already exists are skipped, so calling this again
+    after an interrupted run resumes it. progress(done, total, scenarios_per_s)
+    is called after every chunk. Returns a small summary dict.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, MANIFEST_FILE)
+    manifest = {"grid_hash": grid_hash(grid), "chunk_size": chunk_size, "layout": SWEEP_LAYOUT}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            previous = json.load(f)
+        if previous != manifest:
+            raise ValueError(f"{out_dir} holds results of a different grid, chunk size or layout; "
+                             "use an empty directory")
+    else:
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+
+    compiled = compile_grid(grid)
+    total = compiled["size"]
+    chunks = [(c, start, min(start + chunk_size, total))
+              for c, start in enumerate(range(0, total, chunk_size))]
+    pending = [c for c in chunks if not os.path.exists(_part_path(out_dir, c[0]))]
+    done = resumed = total - sum(stop - start for _, start, stop in pending)
+
+    t0 = time.perf_counter()
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_run_chunk, compiled, out_dir, *c) for c in pending]
+            for future in as_completed(futures):
+                done += future.result()
+                if progress:
+                    progress(done, total, (done - resumed) / (time.perf_counter() - t0))
+        if progress:
+            print(file=sys.stderr)
+    return {"scenarios": total, "chunks": len(chunks), "computed_chunks": len(pending),
+            "seconds": time.perf_counter() - t0}
+
+
+def load_results(out_dir: str):
+    """All part files of a sweep as one DataFrame, ordered by scenario_id."""
+    import pandas as pd
+
+    parts = sorted(p for p in os.listdir(out_dir) if p.startswith("part-") and p.endswith(".parquet"))
+    df = pd.concat([pd.read_parquet(os.path.join(out_dir, p)) for p in parts], ignore_index=True)
+    return df.sort_values("scenario_id", ignore_index=True)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run a KPI scenario sweep over a grid definition.")
+    parser.add_argument("grid", help="grid definition (JSON)")
+    parser.add_argument("out_dir", help="directory for the Parquet part files")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    summary = run_sweep(load_grid(args.grid), args.out_dir, args.workers, args.chunk_size)
+    print(f"{summary['scenarios']} scenarios in {summary['chunks']} chunks "
+          f"({summary['computed_chunks']} computed) in {summary['seconds']:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+# sensitivity.py
+# Global sensitivity of the dashboard KPIs to appliance hours/powers and system constants.
+#   - tornado: one-at-a-time swing of each parameter between its low and high bound
+#   - Morris elementary effects (mu*, sigma): cheap screening, r × (k + 1) model runs
+#   - Sobol first-order (S1) and total (ST) indices: Saltelli sampling with the
+#     Saltelli 2010 / Jansen estimators, N × (k + 2) model runs
+# Every design is evaluated with kpi_batch in batches (optionally on a process pool),
+# so the thousands of model runs take milliseconds. Parameters are varied within
+# ± rel_range of their nominal value (hours capped at 24 h, efficiency at 100 %).
+#
+# Usage: python sensitivity.py appliances.json --tank-liters 10 [--kpi efficiency] [--workers 4]
+import argparse
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from kpi_batch import calculate_kpis_batch
+from kpi_calculator_version2 import (
+    BATTERY_CAPACITY_WH,
+    BATTERY_EFFICIENCY,
+    FUEL_CELL_OUTPUT_W,
+    METHANOL_CONSUMPTION_PER_KWH,
+)
+
+REL_RANGE = 0.5            # appliance hours and powers
+CONSTANT_REL_RANGE = 0.2   # system constants and tank size
+ZERO_HOURS_RANGE = 1.0     # appliances set to 0 h may still run up to this long
+MORRIS_TRAJECTORIES = 50
+MORRIS_LEVELS = 4
+SOBOL_SAMPLES = 4096
+CHUNK_ROWS = 50_000
+KPIS = ("autonomy_days", "efficiency", "methanol_per_day", "battery_hours", "charge_time")
+
+
+def parameter_space(appliances: List[Dict], tank_liters: float,
+                    rel_range: float = REL_RANGE, constant_rel_range: float = CONSTANT_REL_RANGE) -> List[Dict]:
+    """[{'name', 'kind', 'index', 'nominal', 'low', 'high'}] for every uncertain input."""
+    space = []
+    for i, app in enumerate(appliances):
+        h = app["hours"]
+        low, high = (h * (1 - rel_range), min(24.0, h * (1 + rel_range))) if h > 0 else (0.0, ZERO_HOURS_RANGE)
+        space.append({"name": f"{app['name']} hours", "kind": "hours", "index": i, "nominal": h, "low": low, "high": high})
+        p = app["power"]
+        space.append({"name": f"{app['name']} power", "kind": "power", "index": i, "nominal": p,
+                      "low": p * (1 - rel_range), "high": p * (1 + rel_range)})
+    constants = [("tank_liters", tank_liters), ("battery_capacity_wh", BATTERY_CAPACITY_WH),
+                 ("consumption_per_kwh", METHANOL_CONSUMPTION_PER_KWH),
+                 ("battery_efficiency", BATTERY_EFFICIENCY), ("fuel_cell_output_w", FUEL_CELL_OUTPUT_W)]
+    for name, nominal in constants:
+        high = nominal * (1 + constant_rel_range)
+        if name == "battery_efficiency":
+            high = min(high, 1.0)
+        space.append({"name": name, "kind": name, "index": -1, "nominal": nominal,
+                      "low": nominal * (1 - constant_rel_range), "high": high})
+    return space
+
+
+def _evaluate_rows(appliances: List[Dict], space: List[Dict], x: np.ndarray) -> Dict[str, np.ndarray]:
+    n = len(x)
+    power = np.tile([float(a["power"]) for a in appliances], (n, 1))
+    hours = np.tile([float(a["hours"]) for a in appliances], (n, 1))
+    kwargs = {p["kind"]: np.full(n, float(p["nominal"])) for p in space if p["index"] < 0}
+    for j, p in enumerate(space):
+        if p["kind"] == "hours":
+            hours[:, p["index"]] = x[:, j]
+        elif p["kind"] == "power":
+            power[:, p["index"]] = x[:, j]
+        else:
+            kwargs[p["kind"]] = x[:, j]
+    tank = kwargs.pop("tank_liters")
+    kpis = calculate_kpis_batch(power, hours, tank, **kwargs)
+    return {k: np.broadcast_to(kpis[k], (n,)) for k in KPIS}
+
+
+def evaluate(appliances: List[Dict], space: List[Dict], unit: np.ndarray, workers: int = 1) -> Dict[str, np.ndarray]:
+    """KPIs for design points given in unit coordinates (rows of [0, 1]^k)."""
+    low = np.array([p["low"] for p in space])
+    high = np.array([p["high"] for p in space])
+    x = low + unit * (high - low)
+    chunks = [x[i:i + CHUNK_ROWS] for i in range(0, len(x), CHUNK_ROWS)]
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_evaluate_rows, [appliances] * len(chunks), [space] * len(chunks), chunks))
+    else:
+        parts = [_evaluate_rows(appliances, space, c) for c in chunks]
+    return {k: np.concatenate([p[k] for p in parts]) for k in KPIS}
+
+
+def tornado(appliances: List[Dict], tank_liters: float, kpi: str = "autonomy_days", **space_kwargs) -> pd.DataFrame:
+    """Each parameter at its low and high bound with all others nominal, sorted by swing."""
+    space = parameter_space(appliances, tank_liters, **space_kwargs)
+    k = len(space)
+    nominal = np.array([(p["nominal"] - p["low"]) / (p["high"] - p["low"]) if p["high"] > p["low"] else 0.0
+                        for p in space])
+    unit = np.tile(nominal, (2 * k + 1, 1))
+    unit[1:k + 1][np.arange(k), np.arange(k)] = 0.0
+    unit[k + 1:][np.arange(k), np.arange(k)] = 1.0
+    y = evaluate(appliances, space, unit)[kpi]
+    table = pd.DataFrame({"parameter": [p["name"] for p in space], "low": y[1:k + 1], "high": y[k + 1:]})
+    table["base"] = y[0]
+    table["swing"] = (table["high"] - table["low"]).abs()
+    return table.sort_values("swing", ascending=False, ignore_index=True)
+
+
+def morris(appliances: List[Dict], tank_liters: float, kpi: str = "autonomy_days",
+           trajectories: int = MORRIS_TRAJECTORIES, levels: int = MORRIS_LEVELS, seed: int = 0,
+           workers: int = 1, **space_kwargs) -> pd.DataFrame:
+    """Morris elementary effects (in KPI units per full parameter range): mu, mu_star, sigma."""
+    space = parameter_space(appliances, tank_liters, **space_kwargs)
+    k = len(space)
+    rng = np.random.default_rng(seed)
+    delta = levels / (2 * (levels - 1))
+    grid = np.arange(levels // 2) / (levels - 1)  # starting levels that leave room for +delta
+    start = rng.choice(grid, size=(trajectories, k))
+    order = np.argsort(rng.random((trajectories, k)), axis=1)
+    flip = rng.random((trajectories, k)) < 0.5  # walk the factor downwards instead (from x + delta)
+    start = np.where(flip, start + delta, start)
+    step = np.where(flip, -delta, delta)
+
+    points = np.repeat(start[:, None, :], k + 1, axis=1)
+    rows = np.arange(trajectories)
+    for s in range(k):
+        points[:, s + 1:, :][rows, :, order[:, s]] += step[rows, order[:, s]][:, None]
+    y = evaluate(appliances, space, points.reshape(-1, k), workers)[kpi].reshape(trajectories, k + 1)
+
+    effects = np.empty((trajectories, k))
+    effects[rows[:, None], order] = np.diff(y, axis=1) / step[rows[:, None], order]
+    return pd.DataFrame({
+        "parameter": [p["name"] for p in space],
+        "mu": effects.mean(axis=0),
+        "mu_star": np.abs(effects).mean(axis=0),
+        "sigma": effects.std(axis=0, ddof=1),
+    }).sort_values("mu_star", ascending=False, ignore_index=True)
+
+
+def sobol(appliances: List[Dict], tank_liters: float, kpi: str = "autonomy_days",
+          samples: int = SOBOL_SAMPLES, seed: int = 0, workers: int = 1, **space_kwargs) -> pd.DataFrame:
+    """First-order (S1) and total (ST) Sobol indices."""
+    space = parameter_space(appliances, tank_liters, **space_kwargs)
+    k = len(space)
+    rng = np.random.default_rng(seed)
+    a, b = rng.random((samples, k)), rng.random((samples, k))
+    ab = np.repeat(a[None, :, :], k, axis=0)
+    ab[np.arange(k), :, np.arange(k)] = b[:, np.arange(k)].T
+    y = evaluate(appliances, space, np.concatenate([a, b, ab.reshape(-1, k)]), workers)[kpi]
+    y_a, y_b, y_ab = y[:samples], y[samples:2 * samples], y[2 * samples:].reshape(k, samples)
+    variance = np.var(np.concatenate([y_a, y_b]))
+    if not np.isfinite(variance) or variance == 0:
+        s1 = st = np.zeros(k)
+    else:
+        s1 = np.mean(y_b * (y_ab - y_a), axis=1) / variance
+        st = 0.5 * np.mean((y_a - y_ab) ** 2, axis=1) / variance
+    return pd.DataFrame({"parameter": [p["name"] for p in space], "S1": s1, "ST": st}
+                        ).sort_values("ST", ascending=False, ignore_index=True)
+
+
+def rank_parameters(appliances: List[Dict], tank_liters: float, kpi: str = "autonomy_days",
+                    seed: int = 0, workers: int = 1, **space_kwargs) -> pd.DataFrame:
+    """Morris and Sobol results in one table, ranked by total Sobol index."""
+    m = morris(appliances, tank_liters, kpi, seed=seed, workers=workers, **space_kwargs)
+    s = sobol(appliances, tank_liters, kpi, seed=seed, workers=workers, **space_kwargs)
+    table = s.merge(m, on="parameter")
+    table.insert(0, "rank", np.arange(1, len(table) + 1))
+    return table
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Morris / Sobol sensitivity of a dashboard KPI.")
+    parser.add_argument("appliances", help="JSON file with a list of {'name', 'power', 'hours'} dicts")
+    parser.add_argument("--tank-liters", type=float, required=True)
+    parser.add_argument("--kpi", choices=KPIS, default="autonomy_days")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    with open(args.appliances, encoding="utf-8") as f:
+        appliances = json.load(f)
+    table = rank_parameters(appliances, args.tank_liters, args.kpi, args.seed, args.workers)
+    print(table.to_string(index=False, float_format=lambda v: f"{v:.4g}"))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
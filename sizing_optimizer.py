@@ -0,0 +1,195 @@
+# sizing_optimizer.py
+# Battery / fuel cell / methanol tank sizing over the component catalog.
+# For one appliance profile and a target tank autonomy it searches
+# battery model × count, fuel cell model × count and tank model × count and returns
+# the configurations on the cost/weight Pareto front (no other feasible
+# configuration is both cheaper and lighter).
+#
+# The search is split along what the constraints depend on, so most of the
+# catalog is pruned before any full combination is formed:
+#   1. battery × fuel cell: charge time, battery autonomy and peak current only
+#      depend on this pair (vectorized with kpi_batch over the whole grid);
+#      feasible pairs are reduced to their cost/weight/consumption Pareto set
+#   2. tanks: only the cost/weight/liters Pareto set of tank options can ever win
+#   3. the surviving pairs × tanks are checked for the autonomy target
+#
+# Usage: python sizing_optimizer.py appliances.json --target-days 7 [--objective weight_kg]
+import argparse
+import json
+import os
+import sys
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from kpi_batch import appliances_to_arrays, calculate_kpis_batch
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CATALOG = os.path.join(REPO_DIR, "component_catalog.json")
+OBJECTIVES = ("cost_eur", "weight_kg")
+MAX_BATTERIES = 4
+MAX_FUEL_CELLS = 2
+MAX_TANKS = 4
+MAX_CHARGE_H = 24.0  # the fuel cell(s) must make up the daily battery deficit within a day
+
+
+def load_catalog(path: str = DEFAULT_CATALOG) -> Dict[str, List[Dict]]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _options(items: List[Dict], max_count: int, scaled: List[str]) -> Dict[str, np.ndarray]:
+    """Every catalog item × count 1..max_count, with the `scaled` fields multiplied by the count."""
+    item = np.repeat(np.arange(len(items)), max_count)
+    count = np.tile(np.arange(1, max_count + 1), len(items))
+    options = {"item": item, "count": count}
+    for key in items[0]:
+        if key == "name":
+            continue
+        values = np.array([it[key] for it in items], dtype=float)[item]
+        options[key] = values * count if key in scaled else values
+    return options
+
+
+def pareto_mask(points: np.ndarray) -> np.ndarray:
+    """Rows of points (n, k) not dominated by any other row (all objectives minimized)."""
+    n = len(points)
+    if n == 0:
+        return np.zeros(0, dtype=bool)
+    # sorting by the objectives first means a row can only be dominated by earlier rows
+    order = np.lexsort(points.T[::-1])
+    if points.shape[1] == 2:
+        # two objectives: a row survives if it is lighter than everything cheaper
+        y = points[order, 1]
+        best_before = np.minimum.accumulate(np.concatenate([[np.inf], y[:-1]]))
+        keep = np.zeros(n, dtype=bool)
+        keep[order[y < best_before]] = True
+        return keep
+    keep = np.zeros(n, dtype=bool)
+    front = np.empty((0, points.shape[1]))
+    for i in order:
+        p = points[i]
+        if front.size and np.any(np.all(front <= p, axis=1)):
+            continue
+        keep[i] = True
+        front = np.vstack([front, p])
+    return keep
+
+
+def optimize(appliances: List[Dict], target_autonomy_days: float,
+             catalog: Optional[Dict[str, List[Dict]]] = None,
+             objective: str = "cost_eur",
+             max_charge_h: float = MAX_CHARGE_H,
+             min_battery_hours: float = 0.0,
+             peak_power_w: Optional[float] = None,
+             max_batteries: int = MAX_BATTERIES,
+             max_fuel_cells: int = MAX_FUEL_CELLS,
+             max_tanks: int = MAX_TANKS) -> Dict:
+    """
+    Pareto-optimal (cost, weight) configurations for an appliance profile.
+
+    Returns {'front': DataFrame sorted by `objective`, 'best': first row as a dict
+    (None if nothing is feasible), 'stats': search/pruning counts}.
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"unknown objective {objective!r}, expected one of {OBJECTIVES}")
+    catalog = catalog or load_catalog()
+    batteries = _options(catalog["batteries"], max_batteries, ["capacity_ah", "max_current_a", "cost_eur", "weight_kg"])
+    fuel_cells = _options(catalog["fuel_cells"], max_fuel_cells, ["output_w", "cost_eur", "weight_kg"])
+    tanks = _options(catalog["tanks"], max_tanks, ["liters", "cost_eur", "weight_kg"])
+    power, hours = appliances_to_arrays(appliances)
+    stats = {"combinations": len(batteries["item"]) * len(fuel_cells["item"]) * len(tanks["item"])}
+
+    # 1. battery × fuel cell grid, (B, 1) against (1, F)
+    capacity_wh = (batteries["capacity_ah"] * batteries["voltage"])[:, None]
+    pair = calculate_kpis_batch(power, hours, 0.0, battery_capacity_wh=capacity_wh,
+                                consumption_per_kwh=fuel_cells["consumption_l_per_kwh"][None, :],
+                                fuel_cell_output_w=fuel_cells["output_w"][None, :])
+    feasible = (pair["charge_time"] <= max_charge_h) & (pair["battery_hours"] >= min_battery_hours)
+    if peak_power_w is not None:
+        feasible &= (peak_power_w / batteries["voltage"] <= batteries["max_current_a"])[:, None]
+    b_idx, f_idx = np.nonzero(feasible)
+    required_l = target_autonomy_days * np.broadcast_to(pair["methanol_per_day"], feasible.shape)[b_idx, f_idx]
+    pair_cost = batteries["cost_eur"][b_idx] + fuel_cells["cost_eur"][f_idx]
+    pair_weight = batteries["weight_kg"][b_idx] + fuel_cells["weight_kg"][f_idx]
+    stats["feasible_pairs"] = len(b_idx)
+    # pairs needing the same methanol (same fuel cell consumption) only compete on cost and weight
+    kept = np.zeros(len(b_idx), dtype=bool)
+    for liters in np.unique(required_l):
+        group = np.nonzero(required_l == liters)[0]
+        kept[group[pareto_mask(np.column_stack([pair_cost[group], pair_weight[group]]))]] = True
+    candidates = np.nonzero(kept)[0]
+    kept[candidates] = pareto_mask(np.column_stack([pair_cost, pair_weight, required_l])[candidates])
+    b_idx, f_idx, required_l = b_idx[kept], f_idx[kept], required_l[kept]
+    pair_cost, pair_weight = pair_cost[kept], pair_weight[kept]
+    stats["pareto_pairs"] = len(b_idx)
+
+    # 2. tank options that are not beaten on cost, weight and liters at once
+    t_idx = np.nonzero(pareto_mask(np.column_stack([tanks["cost_eur"], tanks["weight_kg"], -tanks["liters"]])))[0]
+    stats["pareto_tanks"] = len(t_idx)
+
+    # 3. surviving pairs × tanks against the autonomy target
+    ok = tanks["liters"][t_idx][None, :] >= required_l[:, None] - 1e-9
+    p_sel, t_sel = np.nonzero(ok)
+    t_sel = t_idx[t_sel]
+    cost = pair_cost[p_sel] + tanks["cost_eur"][t_sel]
+    weight = pair_weight[p_sel] + tanks["weight_kg"][t_sel]
+    stats["evaluated"] = int(ok.size)
+    front = pareto_mask(np.column_stack([cost, weight]))
+    p_sel, t_sel = p_sel[front], t_sel[front]
+    b_sel, f_sel = b_idx[p_sel], f_idx[p_sel]
+
+    kpis = calculate_kpis_batch(power, hours, tanks["liters"][t_sel],
+                                battery_capacity_wh=batteries["capacity_ah"][b_sel] * batteries["voltage"][b_sel],
+                                consumption_per_kwh=fuel_cells["consumption_l_per_kwh"][f_sel],
+                                fuel_cell_output_w=fuel_cells["output_w"][f_sel])
+    n = len(b_sel)
+    result = pd.DataFrame({
+        "battery": [catalog["batteries"][i]["name"] for i in batteries["item"][b_sel]],
+        "n_batteries": batteries["count"][b_sel],
+        "capacity_wh": batteries["capacity_ah"][b_sel] * batteries["voltage"][b_sel],
+        "fuel_cell": [catalog["fuel_cells"][i]["name"] for i in fuel_cells["item"][f_sel]],
+        "n_fuel_cells": fuel_cells["count"][f_sel],
+        "fuel_cell_output_w": fuel_cells["output_w"][f_sel],
+        "tank": [catalog["tanks"][i]["name"] for i in tanks["item"][t_sel]],
+        "n_tanks": tanks["count"][t_sel],
+        "tank_liters": tanks["liters"][t_sel],
+        "cost_eur": cost[front],
+        "weight_kg": weight[front],
+        "autonomy_days": np.broadcast_to(kpis["autonomy_days"], (n,)),
+        "battery_hours": np.broadcast_to(kpis["battery_hours"], (n,)),
+        "charge_time": np.broadcast_to(kpis["charge_time"], (n,)),
+    })
+    other = OBJECTIVES[1 - OBJECTIVES.index(objective)]
+    result = result.sort_values([objective, other], ignore_index=True)
+    stats["front"] = len(result)
+    return {"front": result, "best": result.iloc[0].to_dict() if len(result) else None, "stats": stats}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Find Pareto-optimal battery/fuel cell/tank configurations.")
+    parser.add_argument("appliances", help="JSON file with a list of {'name', 'power', 'hours'} dicts")
+    parser.add_argument("--target-days", type=float, required=True, help="required tank autonomy in days")
+    parser.add_argument("--catalog", default=DEFAULT_CATALOG)
+    parser.add_argument("--objective", choices=OBJECTIVES, default="cost_eur")
+    parser.add_argument("--max-charge-h", type=float, default=MAX_CHARGE_H)
+    parser.add_argument("--min-battery-hours", type=float, default=0.0)
+    parser.add_argument("--peak-power-w", type=float, default=None)
+    parser.add_argument("--output", help="write the Pareto front to this CSV file")
+    args = parser.parse_args(argv)
+
+    with open(args.appliances, encoding="utf-8") as f:
+        appliances = json.load(f)
+    result = optimize(appliances, args.target_days, load_catalog(args.catalog), args.objective,
+                      args.max_charge_h, args.min_battery_hours, args.peak_power_w)
+    print(json.dumps(result["stats"]), file=sys.stderr)
+    if args.output:
+        result["front"].to_csv(args.output, index=False)
+    else:
+        print(result["front"].to_string(index=False))
+    return 0 if result["best"] is not None else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+# soc_simulation.py
+# Time-stepped state-of-charge simulation for the EFOY Pro 2800 + Li 105 system.
+# The day is split into fixed steps (1 min by default); the battery covers the load
+# and the fuel cell switches on below FC_ON_SOC and off again at FC_OFF_SOC.
+# Between two switching events the SOC is a plain cumulative sum, so each segment
+# is computed with NumPy in one go instead of looping minute by minute.
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from kpi_calculator_version2 import (
+    BATTERY_CAPACITY_WH,
+    BATTERY_EFFICIENCY,
+    FUEL_CELL_OUTPUT_W,
+    METHANOL_CONSUMPTION_PER_KWH,
+    calculate_tank_autonomy,
+    global_system_efficiency,
+)
+
+FC_ON_SOC = 0.30   # fuel cell starts charging below this SOC
+FC_OFF_SOC = 0.95  # and stops once the battery is back at this SOC
+DEFAULT_START_HOUR = 18.0  # appliances without a 'start' key run from the evening on
+MINUTES_PER_DAY = 24 * 60
+
+
+def load_profile_from_appliances(appliances: List[Dict], days: int = 1, step_min: float = 1.0) -> np.ndarray:
+    """
+    Power demand [W] per time step for a list of appliance dicts.
+
+    Each appliance runs its 'hours' as one block starting at 'start' (hour of the day,
+    wraps past midnight). The last partial step gets a fractional share, so the
+    profile energy equals calculate_daily_energy_demand() exactly.
+    """
+    steps_per_day = int(round(MINUTES_PER_DAY / step_min))
+    idx = np.arange(steps_per_day)
+    day = np.zeros(steps_per_day)
+    for app in appliances:
+        duration = app['hours'] * 60 / step_min
+        start = int(round(app.get('start', DEFAULT_START_HOUR) * 60 / step_min)) % steps_per_day
+        offset = (idx - start) % steps_per_day
+        day += app['power'] * np.clip(duration - offset, 0.0, 1.0)
+    return np.tile(day, days)
+
+
+def simulate_soc(load_w: np.ndarray,
+                 step_min: float = 1.0,
+                 initial_soc: float = 1.0,
+                 battery_capacity_wh: float = BATTERY_CAPACITY_WH,
+                 fuel_cell_output_w: float = FUEL_CELL_OUTPUT_W,
+                 battery_efficiency: float = BATTERY_EFFICIENCY,
+                 fc_on_soc: float = FC_ON_SOC,
+                 fc_off_soc: float = FC_OFF_SOC,
+                 tank_liters: Optional[float] = None,
+                 initial_fc_on: Optional[bool] = None) -> Dict:
+    """
+    Step the battery/fuel-cell system through a load profile.
+
+    Returns a dict with the trajectories ('soc', 'fc_on', 'load_w', 'unserved_wh'),
+    the fuel cell state for the next step ('final_fc_on') and a 'kpis' dict with the
+    same KPIs the dashboards show, taken from the trajectory instead of the daily totals.
+    initial_fc_on continues a previous run's hysteresis state; by default the fuel
+    cell starts on only if initial_soc is below fc_on_soc.
+    """
+    load_w = np.asarray(load_w, dtype=float)
+    n = load_w.size
+    dt_h = step_min / 60
+    soc = np.empty(n)
+    fc_on = np.zeros(n, dtype=bool)
+    unserved_wh = np.zeros(n)
+
+    # SOC change per step for both fuel cell states; surplus is stored with battery losses
+    net_off = -load_w * dt_h
+    net_on = (fuel_cell_output_w - load_w) * dt_h
+    net_on = np.where(net_on > 0, net_on * battery_efficiency, net_on)
+    delta = {False: net_off / battery_capacity_wh, True: net_on / battery_capacity_wh}
+
+    state = initial_soc < fc_on_soc if initial_fc_on is None else bool(initial_fc_on)
+    level = initial_soc
+    pos = 0
+    window = 2 * int(round(MINUTES_PER_DAY / step_min))
+    while pos < n:
+        end = min(n, pos + window)
+        x = level + np.cumsum(delta[state][pos:end])
+        # the battery cannot go below empty: whatever is missing is unserved load
+        floor = np.minimum(0.0, np.minimum.accumulate(x))
+        s = x - floor
+        if state:
+            hits = np.flatnonzero(s >= fc_off_soc)
+        else:
+            hits = np.flatnonzero(s < fc_on_soc)
+        stop = pos + hits[0] + 1 if hits.size else end
+        seg = stop - pos
+        soc[pos:stop] = s[:seg]
+        fc_on[pos:stop] = state
+        unserved_wh[pos:stop] = -np.diff(floor[:seg], prepend=0.0) * battery_capacity_wh
+        level = s[seg - 1]
+        if hits.size:
+            state = not state
+        pos = stop
+
+    kpis = trajectory_kpis(load_w, soc, fc_on, unserved_wh, step_min, fuel_cell_output_w, initial_soc, tank_liters)
+    return {"soc": soc, "fc_on": fc_on, "load_w": load_w, "unserved_wh": unserved_wh, "final_fc_on": state,
+            "kpis": kpis}
+
+
+def trajectory_kpis(load_w: np.ndarray, soc: np.ndarray, fc_on: np.ndarray, unserved_wh: np.ndarray,
+                    step_min: float, fuel_cell_output_w: float = FUEL_CELL_OUTPUT_W,
+                    initial_soc: float = 1.0, tank_liters: Optional[float] = None) -> Dict:
+    """Dashboard KPIs of a simulated or planned SOC / fuel-cell trajectory."""
+    n = load_w.size
+    dt_h = step_min / 60
+    days = n * step_min / MINUTES_PER_DAY
+    demand_wh = load_w.sum() * dt_h
+    fuel_cell_energy_wh = fc_on.sum() * fuel_cell_output_w * dt_h
+    methanol_l = fuel_cell_energy_wh / 1000 * METHANOL_CONSUMPTION_PER_KWH
+    battery_draw_w = np.where(fc_on, np.maximum(load_w - fuel_cell_output_w, 0.0), load_w)
+    battery_energy_wh = battery_draw_w.sum() * dt_h - unserved_wh.sum()
+    daily_demand_wh = demand_wh / days
+    methanol_per_day = methanol_l / days
+    kpis = {
+        "daily_demand_wh": daily_demand_wh,
+        "methanol_per_day": methanol_per_day,
+        "methanol_total_l": methanol_l,
+        "battery_energy_wh": battery_energy_wh,
+        "fuel_cell_energy_wh": fuel_cell_energy_wh,
+        "efficiency": global_system_efficiency(battery_energy_wh, fuel_cell_energy_wh, methanol_l),
+        "fc_runtime_h": fc_on.sum() * dt_h,
+        "fc_starts": int(np.count_nonzero(np.diff(fc_on.astype(np.int8)) == 1) + fc_on[:1].sum()),
+        "min_soc": float(soc.min()) if n else initial_soc,
+        "final_soc": float(soc[-1]) if n else initial_soc,
+        "unserved_wh": float(unserved_wh.sum()),
+    }
+    if tank_liters is not None:
+        kpis["autonomy_days"] = calculate_tank_autonomy(tank_liters, methanol_per_day)
+    return kpis
+
+
+def simulate_appliances(appliances: List[Dict], days: int = 1, step_min: float = 1.0, **kwargs) -> Dict:
+    """Shortcut: build the load profile from an appliance list and simulate it."""
+    return simulate_soc(load_profile_from_appliances(appliances, days, step_min), step_min=step_min, **kwargs)
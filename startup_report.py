@@ -0,0 +1,111 @@
+# startup_report.py
+# Import-time report for the dashboard entry points.
+# Collects the module-level imports of each dashboard script, imports them in a
+# fresh interpreter with `python -X importtime` and prints the cumulative cost per
+# import. With --check it fails (exit code 1) when a dependency that should be
+# deferred (fpdf, requests, ...) is imported at startup or a time budget is exceeded.
+#
+# Usage: python startup_report.py [script ...] [--check] [--budget-ms MS]
+import argparse
+import ast
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# modules each entry point must not load before the user asks for them
+DEFERRED_MODULES = {
+    "FC&battery_dashboard_REV5.py": ["fpdf", "requests", "matplotlib", "kaleido"],
+    "FC_battery_dashboard_Clean.py": ["fpdf", "requests", "matplotlib", "kaleido"],
+    "FC&Battery_dashboard_REV4.py": ["fpdf", "requests", "kaleido"],
+    "kpi_cli.py": ["streamlit", "plotly", "matplotlib", "fpdf", "pandas", "numpy"],
+}
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def top_level_imports(script: str) -> List[str]:
+    """Modules imported at module level (not inside functions or if-blocks) of a script."""
+    with open(script, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=script)
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            modules.append(node.module)
+    return modules
+
+
+def _importtime(code: str) -> str:
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          cwd=REPO_DIR, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr else "import failed")
+    return proc.stderr
+
+
+def measure_imports(modules: List[str]) -> Dict:
+    """
+    Import the modules in a fresh interpreter and parse `-X importtime`.
+
+    Modules the bare interpreter loads anyway (site, encodings, ...) are left out.
+    Returns {'total_us', 'per_import': {module: cumulative_us}, 'loaded': set of every module name}.
+    """
+    interpreter = {m.group(4) for m in map(_LINE.match, _importtime("pass").splitlines()) if m}
+    per_import, loaded = {}, set()
+    for line in _importtime("\n".join(f"import {m}" for m in modules)).splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        cumulative, indent, name = int(match.group(2)), match.group(3), match.group(4)
+        if name in interpreter:
+            continue
+        loaded.add(name)
+        if len(indent) <= 1:  # top-level entry of the import tree
+            per_import[name] = per_import.get(name, 0) + cumulative
+    return {"total_us": sum(per_import.values()), "per_import": per_import, "loaded": loaded}
+
+
+def startup_report(script: str) -> Dict:
+    modules = top_level_imports(os.path.join(REPO_DIR, script))
+    result = measure_imports(modules)
+    deferred = DEFERRED_MODULES.get(os.path.basename(script), [])
+    result["script"] = script
+    result["violations"] = sorted(m for m in deferred if m in result["loaded"])
+    return result
+
+
+def print_report(result: Dict, top: int = 10) -> None:
+    print(f"{result['script']}: {result['total_us'] / 1000:.0f} ms")
+    ranked = sorted(result["per_import"].items(), key=lambda item: item[1], reverse=True)
+    for name, us in ranked[:top]:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+    for name in result["violations"]:
+        print(f"  !! {name} is imported at startup but should be deferred")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Report and check the import time of the dashboards.")
+    parser.add_argument("scripts", nargs="*", default=list(DEFERRED_MODULES))
+    parser.add_argument("--check", action="store_true", help="exit with 1 on deferred-module violations")
+    parser.add_argument("--budget-ms", type=float, default=None, help="also fail above this startup time")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for script in args.scripts:
+        result = startup_report(script)
+        print_report(result)
+        if result["violations"]:
+            failed = True
+        if args.budget_ms is not None and result["total_us"] / 1000 > args.budget_ms:
+            print(f"  !! startup {result['total_us'] / 1000:.0f} ms exceeds the {args.budget_ms:.0f} ms budget")
+            failed = True
+    return 1 if args.check and failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,10 @@
 # app.py
 import streamlit as st
 from kpi_calculator import *
+from scenario_registry import default_registry
 
 # Sample appliance dataset
-appliance_defaults = [
-    {"name": "Fridge", "power": 45, "hours": 24},
-    {"name": "Lights", "power": 10, "hours": 6},
-    {"name": "Laptop", "power": 60, "hours": 4},
-    {"name": "Heater Fan", "power": 250, "hours": 2},
-    {"name": "Water Pump", "power": 50, "hours": 0.5}
-]
+appliance_defaults = default_registry().profile("Default")
 
 st.set_page_config(page_title="EFOY Hybrid Power System Dashboard", layout="wide")
 st.title("🔋 EFOY Hybrid System KPI Dashboard")
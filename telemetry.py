@@ -0,0 +1,247 @@
+# telemetry.py
+# Measured KPIs from logged truck telemetry (battery voltage/current/SOC, fuel-cell output).
+# Log files can be several GB, so they are read in fixed-size chunks and folded into
+# per-day energy totals; only one chunk and one row per logged day are ever in memory.
+#
+#   result = ingest("truck_2024.csv", tank_liters=20)
+#   result["kpis"]    # same keys as report_pipeline.compute_kpis, plus coverage info
+#   result["daily"]   # DataFrame, one row per calendar day
+#
+# Expected columns (rename with column_map={canonical: column in the file}):
+#   timestamp   ISO date/time or epoch seconds; ISO times with a UTC offset are converted to UTC
+#   voltage_v   battery voltage [V]
+#   current_a   battery current [A], positive = discharging into the loads
+#   soc         battery state of charge, 0..1 or 0..100 % (decided once from the first chunk
+#               with SOC values, or set with soc_percent=)
+#   fc_power_w  fuel-cell output [W]
+#   methanol_l  optional cumulative methanol counter [L]; estimated from fc energy if absent
+# Each sample holds until the next one; gaps longer than MAX_GAP_S are not integrated.
+import argparse
+import hashlib
+import json
+import os
+import sys
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from kpi_calculator_version2 import (
+    METHANOL_CONSUMPTION_PER_KWH,
+    battery_discharge_time,
+    calculate_tank_autonomy,
+    global_system_efficiency,
+)
+
+CHUNK_ROWS = 200_000
+MAX_GAP_S = 15 * 60
+REQUIRED_COLUMNS = ["timestamp", "voltage_v", "current_a", "fc_power_w"]
+OPTIONAL_COLUMNS = ["soc", "methanol_l"]
+SOC_UNITS = {"auto": None, "fraction": False, "percent": True}  # --soc-unit -> soc_percent
+DAILY_COLUMNS = ["hours", "load_wh", "battery_discharge_wh", "battery_charge_wh", "fc_wh", "methanol_l"]
+
+
+def _read_raw(source, chunk_rows: int, columns: List[str]) -> Iterator[pd.DataFrame]:
+    name = source if isinstance(source, str) else getattr(source, "name", "")
+    if str(name).lower().endswith((".parquet", ".pq")):
+        import pyarrow.parquet as pq
+
+        parquet = pq.ParquetFile(source)
+        present = [c for c in columns if c in parquet.schema_arrow.names]
+        for batch in parquet.iter_batches(batch_size=chunk_rows, columns=present):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(source, chunksize=chunk_rows, usecols=lambda c: c in columns)
+
+
+def iter_chunks(source, chunk_rows: int = CHUNK_ROWS, column_map: Optional[Dict[str, str]] = None,
+                soc_percent: Optional[bool] = None) -> Iterator[pd.DataFrame]:
+    """
+    Yield the log in chunks of at most chunk_rows rows with canonical column names.
+
+    source is a path or a binary file object (e.g. a Streamlit upload) of a CSV or
+    Parquet file; only the columns listed in the header comment are read. SOC is
+    returned as a fraction: soc_percent=None takes percent if the first chunk with
+    SOC values goes above 1, and that unit then holds for the whole log.
+    """
+    column_map = column_map or {}
+    to_file = {c: column_map.get(c, c) for c in REQUIRED_COLUMNS + OPTIONAL_COLUMNS}
+    to_canonical = {v: k for k, v in to_file.items()}
+    for raw in _read_raw(source, chunk_rows, list(to_file.values())):
+        chunk = raw.rename(columns=to_canonical)
+        missing = [c for c in REQUIRED_COLUMNS if c not in chunk]
+        if missing:
+            raise ValueError(f"telemetry log is missing the column(s) {', '.join(to_file[c] for c in missing)}")
+        ts = chunk["timestamp"]
+        if pd.api.types.is_numeric_dtype(ts):
+            chunk["timestamp"] = pd.to_datetime(ts, unit="s")
+        else:
+            # naive times are kept as they are, times with an offset become naive UTC
+            chunk["timestamp"] = pd.to_datetime(ts, format="ISO8601", utc=True).dt.tz_convert(None)
+        if "soc" in chunk:
+            if soc_percent is None and chunk["soc"].notna().any():
+                soc_percent = bool(chunk["soc"].max() > 1.0)
+            if soc_percent:
+                chunk["soc"] = chunk["soc"] / 100
+        yield chunk
+
+
+def interval_energy(t, voltage_v: np.ndarray, current_a: np.ndarray, fc_power_w: np.ndarray,
+                    methanol_l: Optional[np.ndarray] = None, max_gap_s: float = MAX_GAP_S):
+    """
+    Energy per sample interval (len(t) - 1 values per DAILY_COLUMNS entry) and the gap count.
+
+    t is a datetime64 array or Series (tz-aware ones too) or int64 nanoseconds.
+    Sample-and-hold: each interval uses the values of the sample that opens it.
+    """
+    if isinstance(t, (pd.Series, pd.Index)) and t.dtype.kind == "M":
+        t = t.to_numpy("datetime64[ns]")
+    t = np.asarray(t)
+    if t.dtype.kind == "M":
+        t = t.astype("datetime64[ns]", copy=False).view("int64")
+    dt_s = np.diff(t) / 1e9
+    valid = (dt_s > 0) & (dt_s <= max_gap_s)
+    hours = np.where(valid, dt_s, 0.0) / 3600
+    battery_w = np.multiply(voltage_v[:-1], current_a[:-1], dtype=float)
+    fc_w = np.maximum(np.asarray(fc_power_w[:-1], dtype=float), 0.0)
+    energy = {
+        "hours": hours,
+        "load_wh": np.maximum(battery_w + fc_w, 0.0) * hours,
+        "battery_discharge_wh": np.maximum(battery_w, 0.0) * hours,
+        "battery_charge_wh": np.maximum(-battery_w, 0.0) * hours,
+        "fc_wh": fc_w * hours,
+    }
+    if methanol_l is not None:
+        # counter increments only; a drop means the counter was reset or the cartridge swapped
+        energy["methanol_l"] = np.maximum(np.diff(np.asarray(methanol_l, dtype=float)), 0.0)
+    else:
+        energy["methanol_l"] = energy["fc_wh"] / 1000 * METHANOL_CONSUMPTION_PER_KWH
+    return energy, int(np.count_nonzero(dt_s > max_gap_s))
+
+
+def measured_kpis(totals: Dict[str, float], min_soc: float, samples: int, gaps: int,
+                  tank_liters: Optional[float] = None) -> Dict:
+    """Measured KPIs from energy totals (DAILY_COLUMNS), averaged per 24 h of covered log time."""
+    covered_days = totals["hours"] / 24
+    per_day = {k: v / covered_days if covered_days > 0 else 0.0 for k, v in totals.items()}
+    kpis = {
+        "daily_demand_wh": per_day["load_wh"],
+        "methanol_per_day": per_day["methanol_l"],
+        "battery_hours": battery_discharge_time(per_day["load_wh"]),
+        "efficiency_pct": global_system_efficiency(
+            totals["battery_discharge_wh"], totals["fc_wh"], totals["methanol_l"]),
+        "battery_energy_wh": per_day["battery_discharge_wh"],
+        "fuel_cell_energy_wh": per_day["fc_wh"],
+        "methanol_total_l": totals["methanol_l"],
+        "covered_days": covered_days,
+        "min_soc": min_soc,
+        "samples": samples,
+        "gaps": gaps,
+    }
+    if tank_liters is not None:
+        kpis["autonomy_days"] = calculate_tank_autonomy(tank_liters, per_day["methanol_l"])
+    return {k: float(v) for k, v in kpis.items()}
+
+
+class TelemetryAccumulator:
+    """Fold log chunks (in time order) into per-day energy totals."""
+
+    def __init__(self, max_gap_s: float = MAX_GAP_S):
+        self.max_gap_s = max_gap_s
+        self.samples = 0
+        self.gaps = 0
+        self.min_soc = np.nan
+        self._daily = pd.DataFrame(columns=DAILY_COLUMNS, dtype=float)
+        self._carry: Optional[pd.DataFrame] = None  # last row of the previous chunk
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        if chunk.empty:
+            return
+        self.samples += len(chunk)
+        if "soc" in chunk:
+            self.min_soc = np.fmin(self.min_soc, chunk["soc"].min())
+        rows = chunk if self._carry is None else pd.concat([self._carry, chunk], ignore_index=True)
+        self._carry = chunk.iloc[[-1]]
+
+        t = rows["timestamp"].to_numpy()
+        energy, gaps = interval_energy(
+            t, rows["voltage_v"].to_numpy(float), rows["current_a"].to_numpy(float),
+            rows["fc_power_w"].to_numpy(float),
+            rows["methanol_l"].to_numpy(float) if "methanol_l" in rows else None, self.max_gap_s)
+        self.gaps += gaps
+        part = pd.DataFrame(energy, index=pd.DatetimeIndex(t[:-1]).normalize())
+        self._daily = self._daily.add(part.groupby(level=0).sum(), fill_value=0.0)
+
+    def daily(self) -> pd.DataFrame:
+        """One row per calendar day with energy totals and the measured efficiency."""
+        daily = self._daily.copy()
+        daily.index.name = "date"
+        daily["efficiency_pct"] = [
+            global_system_efficiency(b, f, m)
+            for b, f, m in zip(daily["battery_discharge_wh"], daily["fc_wh"], daily["methanol_l"])
+        ]
+        return daily
+
+    def kpis(self, tank_liters: Optional[float] = None) -> Dict:
+        return measured_kpis(self._daily.sum().to_dict(), self.min_soc, self.samples, self.gaps, tank_liters)
+
+
+def ingest(source, tank_liters: Optional[float] = None, chunk_rows: int = CHUNK_ROWS,
+           column_map: Optional[Dict[str, str]] = None, max_gap_s: float = MAX_GAP_S,
+           soc_percent: Optional[bool] = None) -> Dict:
+    """Stream a log file through TelemetryAccumulator; returns {'kpis', 'daily'}."""
+    acc = TelemetryAccumulator(max_gap_s)
+    for chunk in iter_chunks(source, chunk_rows, column_map, soc_percent):
+        acc.update(chunk)
+    return {"kpis": acc.kpis(tank_liters), "daily": acc.daily()}
+
+
+def source_key(source) -> str:
+    """Cache key for a log: path, size and mtime for files on disk, content hash for uploads."""
+    if isinstance(source, str):
+        st = os.stat(source)
+        return f"{os.path.abspath(source)}:{st.st_size}:{st.st_mtime_ns}"
+    return hashlib.sha256(source.getbuffer()).hexdigest()
+
+
+def compare_kpis(simulated: Dict, measured: Dict) -> pd.DataFrame:
+    """Side-by-side table of the KPIs both the simulation and the log provide."""
+    rows = [
+        ("Daily Energy Demand (Wh)", "daily_demand_wh", "{:.0f}"),
+        ("Methanol Needed/Day (L)", "methanol_per_day", "{:.2f}"),
+        ("Tank Autonomy (days)", "autonomy_days", "{:.1f}"),
+        ("Battery Autonomy (h)", "battery_hours", "{:.1f}"),
+        ("System Efficiency (%)", "efficiency_pct", "{:.1%}"),
+    ]
+    table = [{"KPI": label,
+              "Simulated": fmt.format(simulated[key]) if key in simulated else "-",
+              "Measured": fmt.format(measured[key]) if key in measured else "-"}
+             for label, key, fmt in rows]
+    return pd.DataFrame(table)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compute measured KPIs from a telemetry log (CSV/Parquet).")
+    parser.add_argument("log")
+    parser.add_argument("--tank-liters", type=float, default=None)
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--max-gap-s", type=float, default=MAX_GAP_S)
+    parser.add_argument("--columns", type=json.loads, default=None,
+                        help='JSON column map, e.g. \'{"current_a": "I_batt"}\'')
+    parser.add_argument("--soc-unit", choices=list(SOC_UNITS), default="auto")
+    parser.add_argument("--daily", help="also write the per-day table to this CSV file")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.log):
+        parser.error(f"{args.log} does not exist")
+    result = ingest(args.log, args.tank_liters, args.chunk_rows, args.columns, args.max_gap_s,
+                    SOC_UNITS[args.soc_unit])
+    if args.daily:
+        result["daily"].to_csv(args.daily)
+    json.dump(result["kpis"], sys.stdout, indent=2)
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
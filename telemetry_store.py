@@ -0,0 +1,189 @@
+# telemetry_store.py
+# On-disk columnar store for telemetry logs, opened with memory mapping.
+# Layout, one directory per vehicle:
+#   <root>/<vehicle>/meta.json        rows, channel dtypes, first/last timestamp
+#   <root>/<vehicle>/timestamp.bin    int64 ns since epoch, sorted (the time index)
+#   <root>/<vehicle>/<channel>.bin    one fixed-dtype array per channel
+# A range query binary-searches the time index and returns memmap slices, so only
+# the pages of the requested window are read and nothing is copied. Logs are
+# imported once with telemetry.iter_chunks and appended chunk by chunk.
+#
+#   store = TelemetryStore()
+#   store.import_log("truck-1", "truck_2024.csv")
+#   week = store.open("truck-1").range("2024-06-01", "2024-06-08")
+#   range_kpis(week, tank_liters=20)
+#
+# Usage: python telemetry_store.py import VEHICLE LOG [--root DIR]
+#        python telemetry_store.py kpis VEHICLE [--start ISO] [--end ISO] [--tank-liters L]
+#        python telemetry_store.py list
+import argparse
+import json
+import os
+import sys
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from result_cache import DEFAULT_CACHE_DIR
+from telemetry import CHUNK_ROWS, MAX_GAP_S, SOC_UNITS, interval_energy, iter_chunks, measured_kpis
+
+DEFAULT_ROOT = os.environ.get("FC_TELEMETRY_STORE", os.path.join(DEFAULT_CACHE_DIR, "telemetry"))
+CHANNEL_DTYPES = {
+    "voltage_v": "float32",
+    "current_a": "float32",
+    "fc_power_w": "float32",
+    "soc": "float32",
+    "methanol_l": "float64",  # cumulative counter, needs the extra precision
+}
+
+
+def _to_ns(value) -> int:
+    return int(pd.Timestamp(value).value)
+
+
+class VehicleTelemetry:
+    """Read-only, memory-mapped view of one vehicle's telemetry."""
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        rows = self.meta["rows"]
+        self.timestamp = self._map(path, "timestamp", "int64", rows)
+        self.channels = {name: self._map(path, name, dtype, rows)
+                         for name, dtype in self.meta["channels"].items()}
+
+    @staticmethod
+    def _map(path: str, name: str, dtype: str, rows: int) -> np.ndarray:
+        if rows == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(os.path.join(path, name + ".bin"), dtype=dtype, mode="r", shape=(rows,))
+
+    def __len__(self) -> int:
+        return self.meta["rows"]
+
+    def range(self, start=None, end=None) -> Dict[str, np.ndarray]:
+        """
+        Views of all channels for start <= timestamp < end (anything pandas.Timestamp accepts).
+
+        The 'timestamp' entry is int64 nanoseconds; use .view("datetime64[ns]") to get dates.
+        """
+        lo = 0 if start is None else int(np.searchsorted(self.timestamp, _to_ns(start), side="left"))
+        hi = len(self) if end is None else int(np.searchsorted(self.timestamp, _to_ns(end), side="left"))
+        view = {"timestamp": self.timestamp[lo:hi]}
+        view.update({name: values[lo:hi] for name, values in self.channels.items()})
+        return view
+
+
+class TelemetryStore:
+    def __init__(self, root: str = DEFAULT_ROOT):
+        self.root = root
+
+    def vehicles(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(d for d in os.listdir(self.root) if os.path.exists(os.path.join(self.root, d, "meta.json")))
+
+    def open(self, vehicle: str) -> VehicleTelemetry:
+        return VehicleTelemetry(os.path.join(self.root, vehicle))
+
+    def append(self, vehicle: str, chunk: pd.DataFrame) -> None:
+        """
+        Append a chunk with canonical columns (see telemetry.py) to a vehicle.
+
+        Rows must be newer than everything already stored; the chunk itself is
+        sorted by timestamp. meta.json is written last, so a crash mid-append only
+        leaves unreferenced bytes that the next append truncates.
+        """
+        path = os.path.join(self.root, vehicle)
+        meta_path = os.path.join(path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+        else:
+            os.makedirs(path, exist_ok=True)
+            meta = {"rows": 0, "channels": {c: d for c, d in CHANNEL_DTYPES.items() if c in chunk},
+                    "first_ns": None, "last_ns": None}
+        missing = [c for c in meta["channels"] if c not in chunk]
+        if missing:
+            raise ValueError(f"chunk for {vehicle} is missing the channel(s) {', '.join(missing)}")
+        if chunk.empty:
+            return
+
+        chunk = chunk.sort_values("timestamp", kind="stable")
+        ts = chunk["timestamp"].to_numpy().astype("datetime64[ns]").view("int64")
+        if meta["last_ns"] is not None and ts[0] < meta["last_ns"]:
+            raise ValueError(f"chunk for {vehicle} starts before the last stored sample; "
+                             "import logs in time order")
+
+        columns = {"timestamp": (ts, "int64")}
+        columns.update({c: (chunk[c].to_numpy(), d) for c, d in meta["channels"].items()})
+        for name, (values, dtype) in columns.items():
+            with open(os.path.join(path, name + ".bin"), "ab") as f:
+                f.truncate(meta["rows"] * np.dtype(dtype).itemsize)
+                f.write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+
+        meta["rows"] += len(ts)
+        meta["first_ns"] = int(ts[0]) if meta["first_ns"] is None else meta["first_ns"]
+        meta["last_ns"] = int(ts[-1])
+        tmp = meta_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, meta_path)
+
+    def import_log(self, vehicle: str, source, chunk_rows: int = CHUNK_ROWS,
+                   column_map: Optional[Dict[str, str]] = None, soc_percent: Optional[bool] = None) -> int:
+        """Stream a CSV/Parquet log into the store; returns the number of rows added."""
+        added = 0
+        for chunk in iter_chunks(source, chunk_rows, column_map, soc_percent):
+            self.append(vehicle, chunk)
+            added += len(chunk)
+        return added
+
+
+def range_kpis(view: Dict[str, np.ndarray], tank_liters: Optional[float] = None,
+               max_gap_s: float = MAX_GAP_S) -> Dict:
+    """Measured KPIs (same keys as telemetry.ingest) straight from mapped arrays."""
+    energy, gaps = interval_energy(view["timestamp"], view["voltage_v"], view["current_a"],
+                                   view["fc_power_w"], view.get("methanol_l"), max_gap_s)
+    totals = {k: float(v.sum()) for k, v in energy.items()}
+    min_soc = float(view["soc"].min()) if "soc" in view and view["soc"].size else float("nan")
+    return measured_kpis(totals, min_soc, view["timestamp"].size, gaps, tank_liters)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Import telemetry logs into the mapped store and query it.")
+    parser.add_argument("--root", default=DEFAULT_ROOT)
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import")
+    imp.add_argument("vehicle")
+    imp.add_argument("log")
+    imp.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    imp.add_argument("--columns", type=json.loads, default=None, help="JSON column map")
+    imp.add_argument("--soc-unit", choices=list(SOC_UNITS), default="auto")
+    kpis = sub.add_parser("kpis")
+    kpis.add_argument("vehicle")
+    kpis.add_argument("--start")
+    kpis.add_argument("--end")
+    kpis.add_argument("--tank-liters", type=float, default=None)
+    sub.add_parser("list")
+    args = parser.parse_args(argv)
+
+    store = TelemetryStore(args.root)
+    if args.command == "import":
+        rows = store.import_log(args.vehicle, args.log, args.chunk_rows, args.columns, SOC_UNITS[args.soc_unit])
+        print(f"{args.vehicle}: {rows} rows imported, {len(store.open(args.vehicle))} stored")
+    elif args.command == "kpis":
+        view = store.open(args.vehicle).range(args.start, args.end)
+        json.dump(range_kpis(view, args.tank_liters), sys.stdout, indent=2)
+        print()
+    else:
+        for vehicle in store.vehicles():
+            meta = store.open(vehicle).meta
+            first, last = (pd.Timestamp(meta[k]) if meta[k] is not None else None for k in ("first_ns", "last_ns"))
+            print(f"{vehicle}: {meta['rows']} rows, {first} .. {last}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+# temperature_model.py
+# Ambient-temperature dependence of the heating load, the battery and the fuel cell.
+# From an hourly temperature series (a local CSV/Parquet file or synthetic_temperatures):
+#   - heaters ('heater': true, or "heater"/"heating"/"warmer" in the name) run a duty
+#     HEATER_DUTY_TABLE(T) of every hour inside their load_model windows (or of their
+#     configured 'hours' from their start without windows); the windows are scaled
+#     down so a full-duty day never exceeds the configured 'hours'
+#   - BATTERY_EFFICIENCY is derated by BATTERY_EFFICIENCY_FACTOR_TABLE(T)
+#   - METHANOL_CONSUMPTION_PER_KWH rises by METHANOL_CONSUMPTION_FACTOR_TABLE(T)
+#     (freeze protection and warm-up of the fuel cell in the cold)
+# The tables are resampled once on a uniform TABLE_STEP_C grid: every temperature is
+# turned into a grid index once (nearest 0.1 °C, within 0.002 of the exact linear
+# value) and each table is then a single take(), so a year of hours for thousands of
+# vehicles (vehicles × hours) is evaluated in one pass. The daily KPIs come from
+# kpi_batch with per-day battery efficiency and methanol consumption.
+#
+# Usage: python temperature_model.py [temperatures.csv] [--scenario Winter] [--vehicles 1000] [--spread-c 3]
+import argparse
+import sys
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from kpi_batch import calculate_kpis_batch
+from kpi_calculator_version2 import BATTERY_EFFICIENCY, METHANOL_CONSUMPTION_PER_KWH
+from load_model import availability
+from soc_simulation import DEFAULT_START_HOUR
+
+# (°C, value) breakpoints, linear in between and constant outside
+HEATER_DUTY_TABLE = ((-20, 1.0), (-10, 0.9), (-5, 0.8), (0, 0.65), (5, 0.5), (10, 0.35), (15, 0.15), (20, 0.0))
+BATTERY_EFFICIENCY_FACTOR_TABLE = ((-20, 0.75), (-10, 0.85), (0, 0.92), (10, 0.97), (25, 1.0), (35, 1.0), (45, 0.96))
+METHANOL_CONSUMPTION_FACTOR_TABLE = ((-20, 1.25), (-10, 1.15), (0, 1.08), (10, 1.02), (20, 1.0), (35, 1.0), (45, 1.05))
+TABLE_RANGE_C = (-40.0, 60.0)   # temperatures outside are clipped to the range
+TABLE_STEP_C = 0.1
+HEATER_KEYWORDS = ("heater", "heating", "warmer")
+HOURS_PER_DAY = 24
+
+
+def resample_table(points: Sequence[Tuple[float, float]]) -> np.ndarray:
+    """(°C, value) breakpoints as values on the TABLE_STEP_C grid over TABLE_RANGE_C."""
+    x, y = np.array(points, dtype=float).T
+    lo, hi = TABLE_RANGE_C
+    return np.interp(np.linspace(lo, hi, int(round((hi - lo) / TABLE_STEP_C)) + 1), x, y)
+
+
+HEATER_DUTY = resample_table(HEATER_DUTY_TABLE)
+BATTERY_EFFICIENCY_FACTOR = resample_table(BATTERY_EFFICIENCY_FACTOR_TABLE)
+METHANOL_CONSUMPTION_FACTOR = resample_table(METHANOL_CONSUMPTION_FACTOR_TABLE)
+
+
+def table_index(temperature_c) -> np.ndarray:
+    """Index of the nearest grid point for every temperature, for table.take(index)."""
+    pos = (np.asarray(temperature_c, dtype=float) - TABLE_RANGE_C[0] + TABLE_STEP_C / 2) / TABLE_STEP_C
+    return np.clip(pos.astype(np.int32), 0, HEATER_DUTY.size - 1)
+
+
+def is_heater(app: Dict) -> bool:
+    return app.get("heater", any(k in app["name"].lower() for k in HEATER_KEYWORDS))
+
+
+def load_temperatures(path, column: str = "temperature_c") -> np.ndarray:
+    """
+    Hourly mean temperatures from a CSV/Parquet file (path or uploaded file object)
+    with a 'timestamp' and a temperature column.
+    """
+    import pandas as pd
+
+    parquet = str(getattr(path, "name", path)).endswith(".parquet")
+    df = pd.read_parquet(path) if parquet else pd.read_csv(path)
+    series = df.set_index(pd.to_datetime(df["timestamp"]))[column].sort_index()
+    return series.resample("h").mean().interpolate(limit_direction="both").to_numpy()
+
+
+def synthetic_temperatures(days: int = 365, mean_c: float = 8.0, seasonal_amplitude_c: float = 10.0,
+                           daily_amplitude_c: float = 4.0, coldest_day: int = 15) -> np.ndarray:
+    """Hourly temperatures of a plain seasonal + day/night cycle (coldest at 05:00, warmest at 17:00)."""
+    hours = np.arange(days * HOURS_PER_DAY)
+    season = -np.cos(2 * np.pi * (hours / HOURS_PER_DAY - coldest_day) / 365)
+    day = -np.cos(2 * np.pi * (hours % HOURS_PER_DAY - 5) / HOURS_PER_DAY)
+    return mean_c + seasonal_amplitude_c * season + daily_amplitude_c * day
+
+
+def heater_window_hours(app: Dict) -> np.ndarray:
+    """
+    Share of each hour of the day (24,) the heater may run, from its load_model windows /
+    duty cycle. Without windows it may run its configured 'hours' from its start hour.
+    The shares add up to at most 'hours' (none for hours <= 0): that is the run time
+    of a day at full duty.
+    """
+    if app["hours"] <= 0:
+        return np.zeros(HOURS_PER_DAY)
+    if "windows" not in app:
+        start = app.get("start", DEFAULT_START_HOUR)
+        app = dict(app, windows=[[start, start + app["hours"]]])
+    share = availability(dict(app, weekdays=range(7)), days=1)[0].reshape(HOURS_PER_DAY, -1).mean(axis=1)
+    total = share.sum()
+    return share * (app["hours"] / total) if total > app["hours"] else share
+
+
+def daily_temperature_kpis(temperatures_c, appliances: List[Dict], tank_liters: float = 10.0) -> Dict[str, np.ndarray]:
+    """
+    Daily KPIs under hourly temperatures of shape (..., days × 24), e.g. (vehicles, 8760).
+
+    Returns the kpi_batch KPIs per day (shape (..., days)) plus 'heater_hours',
+    'heater_wh', 'battery_efficiency', 'consumption_per_kwh' and 'mean_temperature_c'.
+    """
+    t = np.asarray(temperatures_c, dtype=float)
+    days = t.shape[-1] // HOURS_PER_DAY
+    t = t[..., :days * HOURS_PER_DAY].reshape(t.shape[:-1] + (days, HOURS_PER_DAY))
+    heaters = [app for app in appliances if is_heater(app)]
+    base_wh = sum(app["power"] * app["hours"] for app in appliances if not is_heater(app))
+
+    index = table_index(t)
+    duty = HEATER_DUTY.take(index)
+    heater_wh = np.zeros(t.shape[:-1])
+    heater_hours = np.zeros(t.shape[:-1])
+    for app in heaters:
+        hours = duty @ heater_window_hours(app)  # (..., days)
+        heater_hours += hours
+        heater_wh += app["power"] * hours
+    battery_efficiency = BATTERY_EFFICIENCY * BATTERY_EFFICIENCY_FACTOR.take(index).mean(axis=-1)
+    consumption = METHANOL_CONSUMPTION_PER_KWH * METHANOL_CONSUMPTION_FACTOR.take(index).mean(axis=-1)
+
+    demand_wh = base_wh + heater_wh
+    kpis = calculate_kpis_batch(demand_wh[..., None], 1.0, tank_liters,
+                                consumption_per_kwh=consumption, battery_efficiency=battery_efficiency)
+    kpis.update(heater_hours=heater_hours, heater_wh=heater_wh, battery_efficiency=battery_efficiency,
+                consumption_per_kwh=consumption, mean_temperature_c=t.mean(axis=-1))
+    return kpis
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import time
+
+    from scenario_registry import default_registry
+
+    parser = argparse.ArgumentParser(description="Temperature-dependent heating load and derated KPIs.")
+    parser.add_argument("temperatures", nargs="?", help="CSV/Parquet with timestamp and temperature_c (default: synthetic)")
+    parser.add_argument("--scenario", default="Winter")
+    parser.add_argument("--tank-liters", type=float, default=10.0)
+    parser.add_argument("--vehicles", type=int, default=1, help="vehicles with randomly offset temperatures")
+    parser.add_argument("--spread-c", type=float, default=3.0, help="sd of the per-vehicle temperature offset")
+    args = parser.parse_args(argv)
+
+    temps = load_temperatures(args.temperatures) if args.temperatures else synthetic_temperatures()
+    if args.vehicles > 1:
+        offsets = np.random.default_rng(0).normal(0.0, args.spread_c, size=(args.vehicles, 1))
+        temps = temps[None, :] + offsets
+    t0 = time.perf_counter()
+    kpis = daily_temperature_kpis(temps, default_registry().profile(args.scenario), args.tank_liters)
+    seconds = time.perf_counter() - t0
+    for key in ("mean_temperature_c", "heater_hours", "daily_demand_wh", "methanol_per_day", "battery_efficiency"):
+        p10, p50, p90 = np.percentile(kpis[key], [10, 50, 90])
+        print(f"{key:<20} p10 {p10:9.2f}  p50 {p50:9.2f}  p90 {p90:9.2f}")
+    print(f"{kpis['daily_demand_wh'].size} vehicle-days in {seconds * 1000:.0f} ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
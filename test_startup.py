@@ -0,0 +1,14 @@
+# test_startup.py
+# Guards the startup budget of the entry points: the modules listed in
+# startup_report.DEFERRED_MODULES must not be imported when a script starts.
+#
+# Usage: python -m pytest test_startup.py
+import pytest
+
+from startup_report import DEFERRED_MODULES, startup_report
+
+
+@pytest.mark.parametrize("script", sorted(DEFERRED_MODULES))
+def test_no_deferred_imports_at_startup(script):
+    result = startup_report(script)
+    assert result["violations"] == [], f"{script} imports {result['violations']} at startup"
@@ -0,0 +1,111 @@
+# year_simulation.py
+# A calendar year on the road with the summer and winter profiles chained.
+# Each day's demand blends the summer and winter profile energy by the winter share
+# of its date, interpolated between the monthly WINTER_SHARE values (1 = pure winter
+# profile, 0 = pure summer), so spring and autumn move gradually between the two.
+# With days_per_week < 7 only the last days of each week (Sunday, Saturday, ...) are on
+# the road; the other days draw nothing.
+#
+# The methanol comes from tanks/cartridges of tank_liters each: a new one is started
+# whenever the previous is empty, which gives the refill days, the fuel level and a
+# monthly purchase plan (tanks started in a month have to be bought before it). All
+# 365 days are computed in one vectorized pass over the calendar.
+#
+# Usage: python year_simulation.py [--summer Summer] [--winter Winter] [--tank-liters 10] [--days-per-week 7]
+import argparse
+import sys
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from kpi_batch import calculate_daily_energy_demand_batch, calculate_methanol_consumption_batch
+
+# winter share of the demand in the middle of each month, Jan..Dec
+WINTER_SHARE = (1.0, 1.0, 0.75, 0.5, 0.25, 0.0, 0.0, 0.0, 0.25, 0.5, 0.75, 1.0)
+DAYS_PER_YEAR = 365
+DEFAULT_YEAR = 2025
+
+
+def winter_share(dates: np.ndarray, monthly: tuple = WINTER_SHARE) -> np.ndarray:
+    """Winter share for each date, linear between the month midpoints (wrapping over New Year)."""
+    day_of_year = (dates - dates.astype("datetime64[Y]")).astype(int)
+    mid_month = np.arange(12) * DAYS_PER_YEAR / 12 + DAYS_PER_YEAR / 24
+    return np.interp(day_of_year, mid_month, monthly, period=DAYS_PER_YEAR)
+
+
+def simulate_year(summer_appliances: List[Dict],
+                  winter_appliances: List[Dict],
+                  tank_liters: float = 10.0,
+                  days_per_week: int = 7,
+                  year: int = DEFAULT_YEAR,
+                  monthly_winter_share: tuple = WINTER_SHARE) -> Dict:
+    """
+    Returns {'daily': one row per day, 'monthly': purchase plan per month,
+    'total_methanol_l', 'tanks_needed', 'refills'}.
+
+    daily columns: date, month, on_road, winter_share, demand_wh, methanol_l,
+    fuel_level_l (left in the current tank), refill (a new tank was started).
+    monthly columns: month, days_on_road, demand_kwh, methanol_l, tanks_to_buy, liters_to_buy.
+    """
+    dates = np.datetime64(f"{year}-01-01") + np.arange(DAYS_PER_YEAR)
+    share = winter_share(dates, monthly_winter_share)
+    weekday = (dates.astype("datetime64[D]").view("int64") - 4) % 7  # 0 = Monday (1970-01-01 was a Thursday)
+    on_road = weekday >= 7 - days_per_week
+
+    profile_wh = [float(calculate_daily_energy_demand_batch([a["power"] for a in apps], [a["hours"] for a in apps]))
+                  for apps in (summer_appliances, winter_appliances)]
+    demand_wh = np.where(on_road, (1 - share) * profile_wh[0] + share * profile_wh[1], 0.0)
+    methanol_l = calculate_methanol_consumption_batch(demand_wh)
+
+    used = np.cumsum(methanol_l)
+    tank_no = np.ceil(used / tank_liters - 1e-9).astype(int)  # tanks started so far
+    started = np.diff(tank_no, prepend=0)
+    daily = pd.DataFrame({
+        "date": dates,
+        "month": dates.astype("datetime64[M]"),
+        "on_road": on_road,
+        "winter_share": share,
+        "demand_wh": demand_wh,
+        "methanol_l": methanol_l,
+        "fuel_level_l": np.where(tank_no > 0, tank_no * tank_liters - used, tank_liters),
+        "refill": (started > 0) & (tank_no > 1),
+    })
+    daily["tanks_started"] = started
+    monthly = daily.groupby("month").agg(days_on_road=("on_road", "sum"), demand_wh=("demand_wh", "sum"),
+                                         methanol_l=("methanol_l", "sum"), tanks_to_buy=("tanks_started", "sum"))
+    monthly.insert(1, "demand_kwh", monthly.pop("demand_wh") / 1000)
+    monthly["liters_to_buy"] = monthly["tanks_to_buy"] * tank_liters
+    monthly = monthly.reset_index()
+    monthly["month"] = monthly["month"].dt.strftime("%b")
+    return {
+        "daily": daily.drop(columns="tanks_started"),
+        "monthly": monthly,
+        "total_methanol_l": float(used[-1]),
+        "tanks_needed": int(tank_no[-1]),
+        "refills": int(daily["refill"].sum()),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from scenario_registry import default_registry
+
+    parser = argparse.ArgumentParser(description="Year-long methanol plan with summer/winter profiles.")
+    parser.add_argument("--summer", default="Summer", help="registry scenario for summer days")
+    parser.add_argument("--winter", default="Winter", help="registry scenario for winter days")
+    parser.add_argument("--tank-liters", type=float, default=10.0)
+    parser.add_argument("--days-per-week", type=int, default=7)
+    parser.add_argument("--year", type=int, default=DEFAULT_YEAR)
+    args = parser.parse_args(argv)
+
+    registry = default_registry()
+    result = simulate_year(registry.profile(args.summer), registry.profile(args.winter),
+                           args.tank_liters, args.days_per_week, args.year)
+    print(result["monthly"].to_string(index=False, float_format=lambda v: f"{v:.1f}"))
+    print(f"\n{result['total_methanol_l']:.1f} L methanol, {result['tanks_needed']} tanks of "
+          f"{args.tank_liters:g} L, {result['refills']} refills")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())